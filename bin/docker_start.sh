@@ -5,6 +5,8 @@ set -ex
 uwsgi_port=${UWSGI_PORT:-8000}
 uwsgi_processes=${UWSGI_PROCESSES:-4}
 uwsgi_threads=${UWSGI_THREADS:-1}
+# "wsgi" (uwsgi) or "asgi" (uvicorn, with the async export views)
+server=${SERVER:-wsgi}
 
 # Wait for the databases to be up
 # See: https://docs.docker.com/compose/startup-order/
@@ -17,8 +19,27 @@ uwsgi_threads=${UWSGI_THREADS:-1}
 >&2 echo "Apply database migrations"
 python src/manage.py migrate
 
+# Start the render pool, sized independently of the web server processes
+if [ -n "$PTA_EXPORT_RENDER_SOCKET" ]; then
+    >&2 echo "Starting render pool"
+    python src/manage.py run_render_pool &
+fi
+
 # Start server
 >&2 echo "Starting server"
+if [ "$server" = "asgi" ]; then
+    # uvicorn does not serve /static and /media, put a reverse proxy in front
+    exec uvicorn pta_export.asgi:application \
+        --app-dir src \
+        --host 0.0.0.0 \
+        --port $uwsgi_port \
+        --workers $uwsgi_processes
+fi
+
+# Let the uwsgi offload threads send the archived exports, see the X-Sendfile
+# route below
+export PTA_EXPORT_SENDFILE_HEADER=${PTA_EXPORT_SENDFILE_HEADER-X-Sendfile}
+
 uwsgi \
     --http :$uwsgi_port \
     --http-keepalive \
@@ -32,4 +53,7 @@ uwsgi \
     --threads $uwsgi_threads \
     --post-buffering=8192 \
     --buffer-size=65535 \
+    --offload-threads ${UWSGI_OFFLOAD_THREADS:-2} \
+    --collect-header "X-Sendfile X_SENDFILE" \
+    --response-route-if-not "empty:\${X_SENDFILE} static:\${X_SENDFILE}" \
     --wsgi-disable-file-wrapper  # see https://github.com/unbit/uwsgi/issues/1126
@@ -0,0 +1,69 @@
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+# the user fields that are cached, i.e. what the API views use
+USER_FIELDS = (
+    "id",
+    "username",
+    "email",
+    "first_name",
+    "last_name",
+    "is_active",
+    "is_staff",
+    "is_superuser",
+)
+
+
+def get_cache():
+    return caches[settings.API_TOKEN_CACHE]
+
+
+def get_cache_key(key: str) -> str:
+    # don't store the token itself in the cache
+    return f"api_token:{hashlib.sha256(key.encode()).hexdigest()}"
+
+
+def invalidate_token(key: str) -> None:
+    get_cache().delete(get_cache_key(key))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication with the token to user resolution cached.
+
+    The cache entries expire after ``API_TOKEN_CACHE_TIMEOUT`` seconds, and are
+    invalidated when the token is deleted or the user is saved (e.g. deactivated).
+
+    Only a snapshot of the user fields the API needs is cached (not the password
+    hash). The user and token are rebuilt from it and are never saved.
+    """
+
+    def authenticate_credentials(self, key):
+        cache = get_cache()
+        cache_key = get_cache_key(key)
+        if (snapshot := cache.get(cache_key)) is None:
+            user, token = super().authenticate_credentials(key)
+            snapshot = {
+                "user": {field: getattr(user, field) for field in USER_FIELDS},
+                "created": token.created,
+            }
+            cache.set(cache_key, snapshot, timeout=settings.API_TOKEN_CACHE_TIMEOUT)
+            return user, token
+
+        # the same check as TokenAuthentication, for the case that the user was
+        # deactivated without going through the ORM
+        if not snapshot["user"]["is_active"]:
+            raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
+        user = get_user_model()(**snapshot["user"])
+        token = self.get_model()(key=key, user=user, created=snapshot["created"])
+        for instance in (user, token):
+            instance._state.adding = False
+            instance._state.db = "default"
+        return user, token
@@ -6,6 +6,8 @@ from passlib.hash import bcrypt
 
 from pta_export.core.models import User as OCPTAUser
 
+from .middleware import cache_pta_user
+
 
 class UserModelEmailBackend(ModelBackend):
     """
@@ -37,24 +39,41 @@ class OCPTABackend(ModelBackend):
         if not bcrypt.verify(password, ocpta_user.password):
             return None
 
-        defaults = {
-            "email": ocpta_user.email,
-            "is_active": bool(ocpta_user.actief),
-            "first_name": ocpta_user.naam[:255],
-            "is_staff": True,
-        }
+        # start the session with a fresh snapshot of the OCPTA user
+        if ocpta_user.email:
+            cache_pta_user(ocpta_user.email, ocpta_user)
 
+        defaults = get_user_defaults(ocpta_user)
         try:
             django_user = DjangoUser.objects.get(username=username)
-            for field, value in defaults.items():
-                setattr(django_user, field, value)
-
         except DjangoUser.DoesNotExist:
+            # create_user without password sets an unusable one
             django_user = DjangoUser.objects.create_user(username=username, **defaults)
-            django_user.set_unusable_password()
-        django_user.save()
+        else:
+            # logins come in bursts, only write when OCPTA has changed
+            changed = [
+                field
+                for field, value in defaults.items()
+                if getattr(django_user, field) != value
+            ]
+            if changed:
+                for field in changed:
+                    setattr(django_user, field, defaults[field])
+                django_user.save(update_fields=changed)
 
         if self.user_can_authenticate(django_user):
             return django_user
 
         return None
+
+
+def get_user_defaults(ocpta_user: OCPTAUser) -> dict:
+    """
+    Return the fields of the Django user that mirror the OCPTA user.
+    """
+    return {
+        "email": ocpta_user.email or "",
+        "is_active": bool(ocpta_user.actief),
+        "first_name": (ocpta_user.naam or "")[:255],
+        "is_staff": True,
+    }
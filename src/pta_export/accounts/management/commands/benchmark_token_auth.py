@@ -0,0 +1,91 @@
+import json
+from collections import defaultdict
+
+from django.core.management import BaseCommand, call_command
+from django.db import connections, transaction
+from django.test import RequestFactory
+
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.request import Request
+
+from pta_export.core.benchmarks.results import (
+    Measurement,
+    get_metadata,
+    measure,
+    write_results,
+)
+
+from ...authentication import CachedTokenAuthentication, get_cache
+from ...models import User
+
+AUTHENTICATORS = {
+    "token": TokenAuthentication,
+    "cached_token": CachedTokenAuthentication,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the overhead of API token authentication, with and without the "
+        "cache. Run this with the pta_export.conf.benchmark settings, or against a "
+        "scratch database: a temporary user and token are created and rolled back."
+    )
+
+    @staticmethod
+    def add_arguments(parser):
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=1000,
+            help="Number of authenticated requests per run (default: %(default)s).",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Number of runs per authentication class (default: %(default)s).",
+        )
+        parser.add_argument(
+            "--output",
+            help="Write the results as JSON to this file instead of stdout.",
+        )
+
+    def handle(self, **options):
+        connection = connections["default"]
+        if connection.settings_dict["NAME"] == ":memory:":
+            call_command("migrate", database="default", verbosity=0)
+
+        results = defaultdict(Measurement)
+        with transaction.atomic():
+            user = User.objects.create_user("benchmark-token-auth")
+            token = Token.objects.create(user=user)
+            factory = RequestFactory(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+            for name, authenticator_class in AUTHENTICATORS.items():
+                authenticator = authenticator_class()
+                get_cache().clear()
+                for _ in range(options["repeat"]):
+                    with measure(results[name], using="default"):
+                        for _ in range(options["requests"]):
+                            request = Request(factory.post("/api/export"))
+                            authenticator.authenticate(request)
+
+            transaction.set_rollback(True)
+
+        output = {
+            "metadata": get_metadata(using="default", requests=options["requests"]),
+            "results": [
+                {
+                    "authentication": name,
+                    "requests_per_second": options["requests"] / min(m.durations),
+                    "queries_per_request": m.queries / options["requests"],
+                    **m.as_dict(),
+                }
+                for name, m in results.items()
+            ],
+        }
+        if options["output"]:
+            write_results(options["output"], output)
+        else:
+            self.stdout.write(json.dumps(output, indent=2))
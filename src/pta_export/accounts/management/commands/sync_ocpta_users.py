@@ -0,0 +1,69 @@
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import BaseCommand, CommandError
+from django.db import connections, transaction
+
+from pta_export.core.models import User as OCPTAUser
+
+from ...backends import get_user_defaults
+
+UPDATE_FIELDS = ("email", "is_active", "first_name", "is_staff")
+
+
+class Command(BaseCommand):
+    help = (
+        "Mirror all OCPTA users into the Django users with batched upserts, so "
+        "that logging in does not need to write. Run this on a schedule, e.g. "
+        "from cron every night."
+    )
+
+    @staticmethod
+    def add_arguments(parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of users per upsert (default: %(default)s).",
+        )
+
+    def handle(self, **options):
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("The batch size must be at least 1.")
+
+        DjangoUser = get_user_model()
+        if not connections[DjangoUser.objects.db].features.supports_update_conflicts:
+            raise CommandError("The database does not support upserts.")
+
+        ocpta_users = (
+            OCPTAUser.objects.exclude(afkorting__isnull=True)
+            .exclude(afkorting="")
+            .only("afkorting", "email", "actief", "naam")
+            .order_by("id")
+            .iterator(chunk_size=batch_size)
+        )
+        # new users get an unusable password, existing passwords are left alone
+        password = make_password(None)
+
+        num_synced = 0
+        while batch := list(islice(ocpta_users, batch_size)):
+            users = [
+                DjangoUser(
+                    username=ocpta_user.afkorting,
+                    password=password,
+                    **get_user_defaults(ocpta_user),
+                )
+                for ocpta_user in batch
+            ]
+            with transaction.atomic():
+                DjangoUser.objects.bulk_create(
+                    users,
+                    update_conflicts=True,
+                    unique_fields=["username"],
+                    update_fields=UPDATE_FIELDS,
+                )
+            num_synced += len(users)
+
+        self.stdout.write(f"Synced {num_synced} OCPTA user(s).")
@@ -1,6 +1,8 @@
 import logging
 from typing import Callable
 
+from django.conf import settings
+from django.core.cache import caches
 from django.http.request import HttpRequest
 from django.utils.functional import SimpleLazyObject
 
@@ -8,14 +10,73 @@ from pta_export.core.models import User as PtaUser
 
 logger = logging.getLogger(__name__)
 
+# fields of the OCPTA user kept in the cache, enough for the views and permissions
+SNAPSHOT_FIELDS = (
+    "id",
+    "naam",
+    "afkorting",
+    "email",
+    "vak1",
+    "vak2",
+    "vak3",
+    "vak4",
+    "vak5",
+    "actief",
+    "access",
+    "sector",
+)
+
+# cached for emails without OCPTA user, to tell them apart from a cache miss
+MISSING = "missing"
+
+
+def get_cache():
+    return caches[settings.PTA_USER_CACHE]
+
+
+def get_cache_key(email: str) -> str:
+    return f"pta_user:{email.lower()}"
+
+
+def cache_pta_user(email: str, pta_user: PtaUser | None) -> None:
+    snapshot = (
+        {field: getattr(pta_user, field) for field in SNAPSHOT_FIELDS}
+        if pta_user is not None
+        else MISSING
+    )
+    get_cache().set(
+        get_cache_key(email), snapshot, timeout=settings.PTA_USER_CACHE_TIMEOUT
+    )
+
+
+def invalidate_pta_user(*emails: str | None) -> None:
+    get_cache().delete_many([get_cache_key(email) for email in emails if email])
+
 
 def get_pta_user(request):
+    """
+    Resolve the OCPTA user of the request, cached per email address.
+
+    The cached instance is rebuilt from a snapshot of its fields and is never
+    saved.
+    """
     if not hasattr(request, "_cached_pta_user"):
-        try:
-            pta_user = PtaUser.objects.get(email=(email := request.user.email))
-        except PtaUser.DoesNotExist:
+        email = request.user.email
+        snapshot = get_cache().get(get_cache_key(email)) if email else None
+        if snapshot == MISSING:
             pta_user = None
-            logger.info("Could not find PTA user for email: %s", email)
+        elif snapshot is not None:
+            pta_user = PtaUser(**snapshot)
+            pta_user._state.adding = False
+            pta_user._state.db = "ocpta"
+        else:
+            try:
+                pta_user = PtaUser.objects.get(email=email)
+            except PtaUser.DoesNotExist:
+                pta_user = None
+                logger.info("Could not find PTA user for email: %s", email)
+            if email:
+                cache_pta_user(email, pta_user)
         request._cached_pta_user = pta_user
     return request._cached_pta_user
 
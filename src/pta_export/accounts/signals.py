@@ -0,0 +1,47 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from rest_framework.authtoken.models import Token
+
+from pta_export.core.models import User as PtaUser
+
+from .authentication import invalidate_token
+from .middleware import invalidate_pta_user
+from .models import User
+
+# fields of the cached API user that affect what it may do
+AUTH_FIELDS = {"is_active", "is_staff", "is_superuser"}
+
+
+@receiver(pre_save, sender=PtaUser, dispatch_uid="accounts.remember_pta_user_email")
+def remember_email(sender, instance: PtaUser, **kwargs):
+    # the cache is keyed on the email address, which may be changed by this save
+    if instance.pk is None:
+        return
+    instance._previous_email = (
+        PtaUser.objects.filter(pk=instance.pk).values_list("email", flat=True).first()
+    )
+
+
+@receiver(post_save, sender=PtaUser, dispatch_uid="accounts.invalidate_pta_user")
+@receiver(post_delete, sender=PtaUser, dispatch_uid="accounts.invalidate_pta_user")
+def invalidate(sender, instance: PtaUser, **kwargs):
+    invalidate_pta_user(instance.email, getattr(instance, "_previous_email", None))
+
+
+@receiver(post_delete, sender=Token, dispatch_uid="accounts.invalidate_token")
+def invalidate_deleted_token(sender, instance: Token, **kwargs):
+    invalidate_token(instance.key)
+
+
+@receiver(post_save, sender=User, dispatch_uid="accounts.invalidate_user_tokens")
+def invalidate_user_tokens(
+    sender, instance: User, created: bool, update_fields=None, **kwargs
+):
+    if created:
+        return
+    # e.g. the last_login update on every login
+    if update_fields is not None and not (AUTH_FIELDS & set(update_fields)):
+        return
+    for key in Token.objects.filter(user=instance).values_list("key", flat=True):
+        invalidate_token(key)
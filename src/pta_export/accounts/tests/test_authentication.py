@@ -0,0 +1,73 @@
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.request import Request
+
+from ..authentication import CachedTokenAuthentication, get_cache, get_cache_key
+from ..models import User
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("api")
+        cls.token = Token.objects.create(user=cls.user)
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def authenticate(self, key=None):
+        request = RequestFactory().post(
+            "/api/export", HTTP_AUTHORIZATION=f"Token {key or self.token.key}"
+        )
+        return CachedTokenAuthentication().authenticate(Request(request))
+
+    def test_token_is_cached(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.authenticate()[0], self.user)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.authenticate()[0], self.user)
+
+    def test_deleted_token(self):
+        self.authenticate()
+
+        self.token.delete()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(self.token.key)
+
+    def test_deactivated_user(self):
+        self.authenticate()
+
+        self.user.is_active = False
+        self.user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_same_credentials_on_cache_hit(self):
+        with self.assertNumQueries(1):
+            user, token = self.authenticate()
+
+        with self.assertNumQueries(0):
+            cached_user, cached_token = self.authenticate()
+
+        self.assertIsInstance(cached_token, Token)
+        self.assertEqual(cached_token, token)
+        self.assertEqual(cached_token.user_id, token.user_id)
+        self.assertEqual(cached_user, user)
+        self.assertEqual(cached_user.email, user.email)
+        self.assertTrue(cached_user.is_authenticated)
+
+    def test_password_is_not_cached(self):
+        self.user.set_password("geheim")
+        self.user.save()
+        self.authenticate()
+
+        snapshot = get_cache().get(get_cache_key(self.token.key))
+        self.assertNotIn("password", snapshot["user"])
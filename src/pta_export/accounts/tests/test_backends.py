@@ -0,0 +1,85 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from passlib.hash import bcrypt
+
+from pta_export.core.models import User as OCPTAUser
+from pta_export.core.tests.utils import OCPTATablesMixin
+
+from ..backends import OCPTABackend
+from ..models import User
+
+
+class OCPTABackendTests(OCPTATablesMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.ocpta_user = OCPTAUser.objects.create(
+            naam="Docent",
+            afkorting="DOC",
+            email="docent@example.com",
+            password=bcrypt.hash("secret"),
+            actief=1,
+        )
+
+    def authenticate(self, password="secret"):
+        return OCPTABackend().authenticate(None, username="DOC", password=password)
+
+    def test_first_login_creates_user(self):
+        with self.assertNumQueries(2, using="default"):
+            user = self.authenticate()
+
+        self.assertEqual(user.email, "docent@example.com")
+        self.assertTrue(user.is_staff)
+        self.assertFalse(user.has_usable_password())
+
+    def test_unchanged_user_is_not_written(self):
+        self.authenticate()
+
+        # only the lookup of the django user
+        with self.assertNumQueries(1, using="default"):
+            self.authenticate()
+
+    def test_changed_fields_are_updated(self):
+        user = self.authenticate()
+        self.ocpta_user.naam = "Docente"
+        self.ocpta_user.save()
+
+        with self.assertNumQueries(2, using="default"):
+            self.authenticate()
+
+        user.refresh_from_db()
+        self.assertEqual(user.first_name, "Docente")
+
+    def test_wrong_password(self):
+        self.assertIsNone(self.authenticate(password="wrong"))
+        self.assertFalse(User.objects.exists())
+
+
+class SyncOCPTAUsersTests(OCPTATablesMixin, TestCase):
+    def test_sync(self):
+        OCPTAUser.objects.bulk_create(
+            [
+                OCPTAUser(
+                    naam="Een", afkorting="EEN", email="een@example.com", actief=1
+                ),
+                OCPTAUser(naam="Twee", afkorting="TWEE", actief=0),
+                OCPTAUser(naam="Geen afkorting", afkorting=None),
+            ]
+        )
+        existing = User.objects.create_user(
+            "EEN", email="oud@example.com", password="local"
+        )
+
+        stdout = StringIO()
+        call_command("sync_ocpta_users", "--batch-size", "1", stdout=stdout)
+
+        self.assertIn("Synced 2 OCPTA user(s)", stdout.getvalue())
+        existing.refresh_from_db()
+        self.assertEqual(existing.email, "een@example.com")
+        self.assertTrue(existing.is_staff)
+        self.assertTrue(existing.check_password("local"))
+        twee = User.objects.get(username="TWEE")
+        self.assertFalse(twee.is_active)
+        self.assertFalse(twee.has_usable_password())
@@ -0,0 +1,66 @@
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+
+from pta_export.core.constants import AccessModes, Leerjaren
+from pta_export.core.models import User as PtaUser
+from pta_export.core.permissions import get_allowed_leerjaren
+from pta_export.core.tests.utils import OCPTATablesMixin
+
+from ..middleware import PtaUserMiddleware
+from ..models import User
+
+
+class PtaUserMiddlewareTests(OCPTATablesMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.pta_user = PtaUser.objects.create(
+            naam="Docent", afkorting="DOC", email="docent@example.com", access=1
+        )
+        cls.user = User.objects.create_user("DOC", email="docent@example.com")
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def get_pta_user(self, user=None):
+        request = RequestFactory().get("/")
+        request.user = user or self.user
+        PtaUserMiddleware(lambda request: None)(request)
+        return request.pta_user
+
+    def test_pta_user_is_cached(self):
+        with self.assertNumQueries(1, using="ocpta"):
+            self.assertEqual(self.get_pta_user().naam, "Docent")
+
+        with self.assertNumQueries(0, using="ocpta"):
+            pta_user = self.get_pta_user()
+            self.assertEqual(pta_user.pk, self.pta_user.pk)
+            self.assertEqual(
+                get_allowed_leerjaren(pta_user),
+                [leerjaar for leerjaar in Leerjaren if leerjaar.value],
+            )
+
+    def test_missing_pta_user_is_cached(self):
+        user = User.objects.create_user("nobody", email="nobody@example.com")
+
+        with self.assertNumQueries(1, using="ocpta"):
+            self.assertFalse(self.get_pta_user(user))
+        with self.assertNumQueries(0, using="ocpta"):
+            self.assertFalse(self.get_pta_user(user))
+
+    def test_saving_the_pta_user_invalidates_the_cache(self):
+        self.get_pta_user()
+
+        self.pta_user.access = AccessModes.export_by_sector
+        self.pta_user.save()
+
+        self.assertEqual(self.get_pta_user().access, AccessModes.export_by_sector)
+
+    def test_changing_the_email_invalidates_the_cache(self):
+        self.get_pta_user()
+
+        self.pta_user.email = "elders@example.com"
+        self.pta_user.save()
+
+        self.assertFalse(self.get_pta_user())
@@ -0,0 +1,23 @@
+"""
+ASGI config for pta_export project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+The export views are served by their async versions, which render in a bounded
+thread pool (see ``pta_export.core.executor``).
+
+For more information on this file, see
+https://docs.djangoproject.com/en/4.1/howto/deployment/asgi/
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+from pta_export.setup import setup_env
+from pta_export.utils.startup import preload
+
+setup_env()
+os.environ.setdefault("PTA_EXPORT_ASYNC_VIEWS", "true")
+
+application = get_asgi_application()
+preload()
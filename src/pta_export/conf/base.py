@@ -2,13 +2,6 @@ import os
 
 from django.urls import reverse_lazy
 
-from sentry_sdk.integrations import DidNotEnable, django, redis
-
-try:
-    from sentry_sdk.integrations import celery
-except DidNotEnable:  # no celery in this proejct
-    celery = None
-
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 DJANGO_PROJECT_DIR = os.path.abspath(
     os.path.join(os.path.dirname(__file__), os.path.pardir)
@@ -71,10 +64,12 @@ INSTALLED_APPS = [
     # Project applications.
     "pta_export.accounts",
     "pta_export.core.apps.CoreConfig",
+    "pta_export.exports",
     "pta_export.utils",
 ]
 
 MIDDLEWARE = [
+    "pta_export.utils.query_budget.QueryBudgetMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     # 'django.middleware.locale.LocaleMiddleware',
@@ -178,6 +173,8 @@ STATICFILES_FINDERS = [
 
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 MEDIA_URL = "/media/"
+# Files that may not be served publicly, e.g. rendered exports.
+PRIVATE_MEDIA_ROOT = os.path.join(BASE_DIR, "private_media")
 FILE_UPLOAD_PERMISSIONS = 0o644
 
 FIXTURE_DIRS = (os.path.join(DJANGO_PROJECT_DIR, "fixtures"),)
@@ -259,6 +256,11 @@ LOGGING = {
             "level": "INFO",
             "propagate": True,
         },
+        "performance": {
+            "handlers": ["performance"],
+            "level": "INFO",
+            "propagate": False,
+        },
     },
 }
 
@@ -286,6 +288,118 @@ PROJECT_NAME = "pta_export"
 ENVIRONMENT = None
 SHOW_ALERT = True
 
+# Store rendered exports and serve them again as long as the OCPTA data is unchanged.
+PTA_EXPORT_ARCHIVE = True
+
+# Renderer used for exports: "legacy", "candidate" or "shadow". In shadow mode the
+# legacy document is served, and a sample of the exports is rendered again with the
+# candidate renderer in the background to compare the output.
+PTA_EXPORT_RENDERER = os.getenv("PTA_EXPORT_RENDERER", "legacy")
+# Dotted path to a callable with the signature of core.export.create_document
+PTA_EXPORT_CANDIDATE_RENDERER = os.getenv("PTA_EXPORT_CANDIDATE_RENDERER", "")
+PTA_EXPORT_SHADOW_SAMPLE_RATE = float(os.getenv("PTA_EXPORT_SHADOW_SAMPLE_RATE", "0.1"))
+
+# Serve the exports with async views, rendering in a pool of this many threads per
+# process. Enabled by default by pta_export.asgi.
+PTA_EXPORT_ASYNC_VIEWS = os.getenv("PTA_EXPORT_ASYNC_VIEWS", "").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+PTA_EXPORT_RENDER_THREADS = int(os.getenv("PTA_EXPORT_RENDER_THREADS", "2"))
+
+# Unix socket of the render pool started by the run_render_pool command. When set,
+# exports are rendered by the pool instead of the web server processes. The workers
+# of the pool are replaced after a number of exports, or when their memory grows
+# over the given number of MB.
+PTA_EXPORT_RENDER_SOCKET = os.getenv("PTA_EXPORT_RENDER_SOCKET", "")
+PTA_EXPORT_RENDER_WORKERS = int(os.getenv("PTA_EXPORT_RENDER_WORKERS", "2"))
+PTA_EXPORT_RENDER_MAX_EXPORTS = int(os.getenv("PTA_EXPORT_RENDER_MAX_EXPORTS", "50"))
+PTA_EXPORT_RENDER_MAX_RSS = int(os.getenv("PTA_EXPORT_RENDER_MAX_RSS", "512"))
+PTA_EXPORT_RENDER_TIMEOUT = 120
+
+# Zip compression of the exports: "stored", "fast", "default" or "max". Archived
+# exports use PTA_EXPORT_COMPRESSION, the endpoints can use their own profile for
+# the exports they render themselves (without the archive, or when profiling).
+PTA_EXPORT_COMPRESSION = os.getenv("PTA_EXPORT_COMPRESSION", "default")
+PTA_EXPORT_ENDPOINT_COMPRESSION = {
+    "view": os.getenv("PTA_EXPORT_VIEW_COMPRESSION", ""),
+    "api": os.getenv("PTA_EXPORT_API_COMPRESSION", ""),
+}
+
+# Read the toetsen of an export in chunks through a server-side cursor, one vak at
+# a time, instead of prefetching all of them, see core.export.stream_vakken.
+PTA_EXPORT_STREAM_TOETSEN = os.getenv("PTA_EXPORT_STREAM_TOETSEN", "").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+PTA_EXPORT_STREAM_CHUNK_SIZE = int(os.getenv("PTA_EXPORT_STREAM_CHUNK_SIZE", "500"))
+# mysqlclient reads the complete result into memory unless the connection uses
+# SSCursor, which can't run other queries while a result is open. The streamed
+# toetsen are read from this database alias, falling back to the ocpta alias when
+# it isn't configured.
+PTA_EXPORT_STREAM_DATABASE = "ocpta_stream"
+if os.getenv("OCPTA_DB_STREAM", "").lower() in ("1", "true", "yes"):
+    from MySQLdb.cursors import SSCursor
+
+    DATABASES["ocpta_stream"] = {
+        **DATABASES["ocpta"],
+        "OPTIONS": {**DATABASES["ocpta"]["OPTIONS"], "cursorclass": SSCursor},
+        "TEST": {"MIRROR": "ocpta"},
+    }
+
+# Exports are written to a temporary file, kept in memory up to this many bytes.
+PTA_EXPORT_SPOOL_MAX_SIZE = 2 * 1024 * 1024
+
+# Let the web server send archived exports from the private media storage, e.g.
+# "X-Sendfile" with the uwsgi configuration of bin/docker_start.sh, or
+# "X-Accel-Redirect" for nginx together with the internal location that serves
+# PRIVATE_MEDIA_ROOT as PTA_EXPORT_SENDFILE_URL.
+PTA_EXPORT_SENDFILE_HEADER = os.getenv("PTA_EXPORT_SENDFILE_HEADER", "")
+PTA_EXPORT_SENDFILE_URL = os.getenv("PTA_EXPORT_SENDFILE_URL", "")
+
+# Collect per-phase metrics of the exports, exposed at /metrics/ for Prometheus.
+# The cache must be shared between the web server processes to be meaningful.
+PTA_EXPORT_METRICS = True
+PTA_EXPORT_METRICS_CACHE = "default"
+PTA_EXPORT_METRICS_TOKEN = os.getenv("PTA_EXPORT_METRICS_TOKEN", "")
+
+# Queries on the OCPTA database taking longer than this many seconds are logged and
+# aggregated in the cache, see /admin/slow-queries/. None disables the capture.
+PTA_EXPORT_SLOW_QUERY_THRESHOLD = float(
+    os.getenv("PTA_EXPORT_SLOW_QUERY_THRESHOLD", "0.2")
+)
+PTA_EXPORT_SLOW_QUERY_CACHE = "default"
+
+# The OCPTA user of a logged in user is cached for this many seconds. Changes made
+# through the admin invalidate it, changes in OCPTA itself show up after the timeout.
+PTA_USER_CACHE = "default"
+PTA_USER_CACHE_TIMEOUT = 300
+
+# Small, hot OCPTA lookups (kalender, werken) are cached in process memory for
+# PTA_EXPORT_L1_TIMEOUT seconds, in front of the shared cache. Changes in OCPTA show
+# up after the timeouts, archiving an export with a new fingerprint drops them.
+PTA_EXPORT_L1_TIMEOUT = 30
+PTA_EXPORT_SHARED_CACHE = "default"
+PTA_EXPORT_SHARED_CACHE_TIMEOUT = 300
+
+# Cache alias for the content of archived exports, None to always read them from
+# the storage. Larger exports are not cached.
+PTA_EXPORT_ARTIFACT_CACHE = None
+PTA_EXPORT_ARTIFACT_CACHE_MAX_SIZE = 5 * 1024 * 1024
+
+# API tokens are resolved to their user from this cache, for this many seconds
+API_TOKEN_CACHE = "default"
+API_TOKEN_CACHE_TIMEOUT = 60
+
+# Raise instead of log when a view or export() exceeds its declared query budget,
+# see pta_export.utils.query_budget
+QUERY_BUDGET_ENFORCE = False
+# Queries on the key alias count towards the budget of the value alias, e.g. the
+# streamed toetsen read through PTA_EXPORT_STREAM_DATABASE
+QUERY_BUDGET_ALIASES = {PTA_EXPORT_STREAM_DATABASE: "ocpta"}
+
 #
 # Library settings
 #
@@ -295,7 +409,7 @@ SHOW_ALERT = True
 #
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework.authentication.TokenAuthentication",
+        "pta_export.accounts.authentication.CachedTokenAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
@@ -337,15 +451,22 @@ IPWARE_META_PRECEDENCE_ORDER = (
 # Sentry SDK
 SENTRY_DSN = os.getenv("SENTRY_DSN")
 
-SENTRY_SDK_INTEGRATIONS = [
-    django.DjangoIntegration(),
-    redis.RedisIntegration(),
-]
-if celery is not None:
-    SENTRY_SDK_INTEGRATIONS.append(celery.CeleryIntegration())
-
 if SENTRY_DSN:
+    # only import the SDK when it's used, it adds considerably to the startup time
     import sentry_sdk
+    from sentry_sdk.integrations import DidNotEnable, django, redis
+
+    try:
+        from sentry_sdk.integrations import celery
+    except DidNotEnable:  # no celery in this proejct
+        celery = None
+
+    SENTRY_SDK_INTEGRATIONS = [
+        django.DjangoIntegration(),
+        redis.RedisIntegration(),
+    ]
+    if celery is not None:
+        SENTRY_SDK_INTEGRATIONS.append(celery.CeleryIntegration())
 
     SENTRY_CONFIG = {
         "dsn": SENTRY_DSN,
@@ -0,0 +1,56 @@
+"""
+Settings for the benchmark harness.
+
+The OCPTA data is generated into a stand-in database, SQLite in memory by default.
+Point the ``BENCHMARK_DB_*`` environment variables to a scratch PostgreSQL
+database to benchmark against a real database server instead.
+"""
+
+import os
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from .base import *  # noqa isort:skip
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": ":memory:",
+    },
+    "ocpta": {
+        "ENGINE": os.getenv("BENCHMARK_DB_ENGINE", "django.db.backends.sqlite3"),
+        "NAME": os.getenv("BENCHMARK_DB_NAME", ":memory:"),
+        "USER": os.getenv("BENCHMARK_DB_USER", ""),
+        "PASSWORD": os.getenv("BENCHMARK_DB_PASSWORD", ""),
+        "HOST": os.getenv("BENCHMARK_DB_HOST", ""),
+        "PORT": os.getenv("BENCHMARK_DB_PORT", ""),
+    },
+}
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "axes_cache": {
+        "BACKEND": "django.core.cache.backends.dummy.DummyCache",
+    },
+}
+AXES_CACHE = "axes_cache"
+
+LOGGING["loggers"].update(
+    {
+        "pta_export": {
+            "handlers": ["console"],
+            "level": "WARNING",
+            "propagate": False,
+        },
+    }
+)
+
+#
+# Custom settings
+#
+ENVIRONMENT = "benchmark"
+
+# always measure the full render path
+PTA_EXPORT_ARCHIVE = False
@@ -109,6 +109,9 @@ CACHES = {
 
 AXES_CACHE = "axes_cache"
 
+# Fail loudly on N+1 queries
+QUERY_BUDGET_ENFORCE = True
+
 
 # THOU SHALT NOT USE NAIVE DATETIMES
 warnings.filterwarnings(
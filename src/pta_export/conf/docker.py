@@ -34,9 +34,31 @@ MANAGERS = ADMINS
 # See https://docs.djangoproject.com/en/1.5/ref/settings/#allowed-hosts
 ALLOWED_HOSTS = getenv("ALLOWED_HOSTS", "*", split=True)
 
+# Shared between the uwsgi processes and the nodes. Exports go to a separate
+# database, so that they can be flushed (and sized) independently.
+REDIS_URL = getenv("REDIS_URL", "redis://redis:6379")
+REDIS_OPTIONS = {
+    "CLIENT_CLASS": "django_redis.client.DefaultClient",
+    "CONNECTION_POOL_KWARGS": {
+        "max_connections": int(getenv("REDIS_MAX_CONNECTIONS", 20)),
+        "retry_on_timeout": True,
+    },
+    "SOCKET_CONNECT_TIMEOUT": 2,
+    "SOCKET_TIMEOUT": 2,
+    "IGNORE_EXCEPTIONS": True,
+}
+
 CACHES = {
     "default": {
-        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "BACKEND": "django_redis.cache.RedisCache",
+        "LOCATION": f"{REDIS_URL}/{getenv('REDIS_CACHE_DB', 0)}",
+        "OPTIONS": REDIS_OPTIONS,
+    },
+    "exports": {
+        "BACKEND": "django_redis.cache.RedisCache",
+        "LOCATION": f"{REDIS_URL}/{getenv('REDIS_EXPORTS_DB', 1)}",
+        "TIMEOUT": int(getenv("EXPORTS_CACHE_TIMEOUT", 24 * 60 * 60)),
+        "OPTIONS": REDIS_OPTIONS,
     },
     # https://github.com/jazzband/django-axes/blob/master/docs/configuration.rst#cache-problems
     "axes_cache": {
@@ -58,6 +80,8 @@ CSRF_COOKIE_SECURE = getenv("CSRF_COOKIE_SECURE", False)
 #
 ENVIRONMENT = "docker"
 
+PTA_EXPORT_ARTIFACT_CACHE = "exports"
+
 if missing_environment_vars:
     raise ImproperlyConfigured(
         "These environment variables are required but missing: {}".format(
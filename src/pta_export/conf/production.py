@@ -35,7 +35,16 @@ CACHES = {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
             "IGNORE_EXCEPTIONS": True,
         },
-    }
+    },
+    "exports": {
+        "BACKEND": "django_redis.cache.RedisCache",
+        "LOCATION": "redis://127.0.0.1:6379/3",
+        "TIMEOUT": 24 * 60 * 60,
+        "OPTIONS": {
+            "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            "IGNORE_EXCEPTIONS": True,
+        },
+    },
 }
 
 # Caching sessions.
@@ -76,6 +85,8 @@ LOGGING["loggers"].update(
 ENVIRONMENT = "production"
 SHOW_ALERT = False
 
+PTA_EXPORT_ARTIFACT_CACHE = "exports"
+
 # We will assume we're running under https
 SESSION_COOKIE_SECURE = True
 SESSION_COOKIE_HTTPONLY = True
@@ -1,11 +1,33 @@
+import asyncio
+
+from django.conf import settings
 from django.urls import path
 
+from asgiref.sync import sync_to_async
 from rest_framework import permissions, serializers
 from rest_framework.generics import CreateAPIView
 
-from .constants import Leerjaren
-from .models import Kalender
-from .views import get_export_response
+from pta_export.accounts.middleware import get_pta_user
+from pta_export.exports.models import ProfileSources
+
+from .constants import ExportFormats, Leerjaren
+from .data_api import (
+    OverstappenDataView,
+    ToetsenDataView,
+    VakkenDataView,
+    VoetnotenDataView,
+)
+from .export import VAK_EXPORT_LEERJAREN
+from .models import Kalender, Vak
+from .permissions import can_export
+from .views import (
+    AsyncExportMixin,
+    ExportResponseMixin,
+    get_export_response,
+    get_profiled_export_response,
+    get_spreadsheet_response,
+    get_vak_export_response,
+)
 
 
 class ExportSerializer(serializers.Serializer):
@@ -16,14 +38,59 @@ class ExportSerializer(serializers.Serializer):
         label="klas",
         choices=[choice for choice in Leerjaren.choices if choice[0]],
     )
+    vakken = serializers.ListField(
+        label="vakken",
+        child=serializers.IntegerField(),
+        required=False,
+        allow_empty=False,
+        help_text="IDs van de vakken om te exporteren, standaard de hele klas.",
+    )
+    format = serializers.ChoiceField(
+        label="formaat",
+        choices=ExportFormats.choices,
+        default=ExportFormats.docx,
+        help_text="Word document, of alleen de tabellen als spreadsheet.",
+    )
+    profile = serializers.BooleanField(
+        label="profiel",
+        default=False,
+        help_text="Sla een profiel van de export op (alleen voor beheerders).",
+    )
+
+    def validate_profile(self, value: bool):
+        if value and not self.context["request"].user.is_staff:
+            raise serializers.ValidationError(
+                "Alleen beheerders kunnen een export profileren."
+            )
+        return value
 
     def validate_jaar(self, value: int):
         if not Kalender.objects.filter(jaar=value).exists():
             raise serializers.ValidationError("Er bestaat geen kalender voor dit jaar.")
         return value
 
-
-class ExportAPIView(CreateAPIView):
+    def validate_vakken(self, value: list[int]):
+        vakken = set(value)
+        if missing := vakken - set(
+            Vak.objects.filter(id__in=vakken).values_list("id", flat=True)
+        ):
+            raise serializers.ValidationError(
+                f"Onbekende vakken: {', '.join(map(str, sorted(missing)))}."
+            )
+        return sorted(vakken)
+
+    def validate(self, attrs):
+        # exports of a whole klas are not limited for API users
+        vakken = attrs.get("vakken")
+        pta_user = get_pta_user(self.context["request"]._request)
+        if vakken and not can_export(pta_user, attrs["klas"], vakken):
+            raise serializers.ValidationError(
+                {"vakken": "Je kan alleen je eigen vakken van deze klas exporteren."}
+            )
+        return attrs
+
+
+class ExportAPIView(ExportResponseMixin, CreateAPIView):
     """
     Create an export.
 
@@ -37,20 +104,152 @@ class ExportAPIView(CreateAPIView):
     - `jaar`: year in the YYYY format, e.g. 2019
     - `klas`: Array index of the klas/leerjaar, e.g. `1` for "4 havo"
 
+    Optional parameters:
+
+    - `vakken`: IDs of the vakken to export instead of the whole klas. Users can
+      export the vakken of their access mode and their own vakken (`OC_users`)
+    - `format`: `docx` (default), or `xlsx` or `csv` for the table data only
+    - `profile`: staff users only, store a profile of the export that can be
+      downloaded in the admin
+
     The response is a file response, containing the file as attachment.
     """
 
     permission_classes = (permissions.IsAuthenticated,)
     serializer_class = ExportSerializer
+    endpoint = "api"
+    # includes rendering and archiving the export on a fingerprint change
+    query_budget = {"default": 10, "ocpta": 15}
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         jaar = serializer.validated_data["jaar"]
         leerjaar = serializer.validated_data["klas"]
-        return get_export_response(jaar, leerjaar)
+        vak_ids = serializer.validated_data.get("vakken")
+        file_format = serializer.validated_data["format"]
+        if file_format != ExportFormats.docx:
+            return self.get_export_response(
+                get_spreadsheet_response, jaar, leerjaar, file_format, vak_ids
+            )
+        if serializer.validated_data["profile"]:
+            return self.get_export_response(
+                get_profiled_export_response,
+                jaar,
+                leerjaar,
+                ProfileSources.api,
+                request.user,
+                self.get_compression(),
+                vak_ids,
+            )
+        return self.get_export_response(
+            get_export_response, jaar, leerjaar, self.get_compression(), vak_ids
+        )
+
+
+class AsyncExportAPIMixin(AsyncExportMixin):
+    """
+    Finalize the response of the async handlers like the sync ones.
+
+    ``APIView.dispatch`` only gets a coroutine from the handler, its exceptions and
+    the response are passed to the DRF hooks once it has been awaited.
+    """
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if asyncio.iscoroutine(response):
+            return self.finalize_async_response(request, response, *args, **kwargs)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+    async def finalize_async_response(self, request, coroutine, *args, **kwargs):
+        try:
+            response = await coroutine
+        except Exception as exc:
+            response = await sync_to_async(self.handle_exception)(exc)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class AsyncExportAPIView(AsyncExportAPIMixin, ExportAPIView):
+    pass
+
+
+class VakExportSerializer(serializers.Serializer):
+    jaar = serializers.IntegerField(
+        label="Jaar", required=True, help_text="Jaar in YYYY formaat, bv. 2019."
+    )
+    vak = serializers.PrimaryKeyRelatedField(
+        label="vak", queryset=Vak.objects.all(), help_text="ID van het vak."
+    )
+    format = serializers.ChoiceField(
+        label="formaat",
+        choices=ExportFormats.choices,
+        default=ExportFormats.docx,
+        help_text="Word document, of alleen de tabellen als spreadsheet.",
+    )
+
+    validate_jaar = ExportSerializer.validate_jaar
+
+
+class VakExportAPIView(ExportResponseMixin, CreateAPIView):
+    """
+    Create the export of a vak, with the PTA of every klas in one document.
+
+    This endpoint requires authorization, see the `export` endpoint. Like the
+    export of a whole klas, it is not limited to the vakken of the user.
+
+    Required parameters:
+
+    - `jaar`: year in the YYYY format, e.g. 2019
+    - `vak`: ID of the vak
+
+    Optional parameters:
+
+    - `format`: `docx` (default), or `xlsx` or `csv` for the table data only
+
+    The response is a file response, containing the file as attachment.
+    """
+
+    permission_classes = (permissions.IsAuthenticated,)
+    serializer_class = VakExportSerializer
+    endpoint = "api"
+    # includes the kalender and vak lookups of the serializer
+    query_budget = {"default": 10, "ocpta": 10}
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return self.get_export_response(
+            get_vak_export_response,
+            serializer.validated_data["jaar"],
+            serializer.validated_data["vak"],
+            VAK_EXPORT_LEERJAREN,
+            self.get_compression(),
+            serializer.validated_data["format"],
+        )
+
+
+class AsyncVakExportAPIView(AsyncExportAPIMixin, VakExportAPIView):
+    pass
 
 
 urlpatterns = [
-    path("export", ExportAPIView.as_view(), name="export"),
+    path(
+        "export",
+        (
+            AsyncExportAPIView if settings.PTA_EXPORT_ASYNC_VIEWS else ExportAPIView
+        ).as_view(),
+        name="export",
+    ),
+    path(
+        "export/vak",
+        (
+            AsyncVakExportAPIView
+            if settings.PTA_EXPORT_ASYNC_VIEWS
+            else VakExportAPIView
+        ).as_view(),
+        name="export-vak",
+    ),
+    path("data/vakken", VakkenDataView.as_view(), name="data-vakken"),
+    path("data/voetnoten", VoetnotenDataView.as_view(), name="data-voetnoten"),
+    path("data/toetsen", ToetsenDataView.as_view(), name="data-toetsen"),
+    path("data/overstappen", OverstappenDataView.as_view(), name="data-overstappen"),
 ]
@@ -5,3 +5,6 @@ from django.utils.translation import gettext_lazy as _
 class CoreConfig(AppConfig):
     name = "pta_export.core"
     verbose_name = _("database")
+
+    def ready(self):
+        from . import checks, slow_queries  # noqa
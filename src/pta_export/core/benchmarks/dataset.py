@@ -0,0 +1,350 @@
+"""
+Synthetic OCPTA data for benchmarks and tests.
+
+The OCPTA models are unmanaged, so no migration ever creates their tables. The
+helpers in this module create them in a stand-in database and fill them with
+generated data that exercises every export code path. Generation is fully
+determined by the seed, so results can be compared across commits.
+"""
+
+import random
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.apps import apps
+from django.db import connections
+from django.utils import timezone
+
+from ..constants import ExportModes, Leerjaren, OverstapActies, Sorteringen, Types
+from ..models import Kalender, Overstap, Toets, User, Vak, Voetnoot, Werk
+
+VAK_NAMEN = (
+    "aardrijkskunde",
+    "biologie",
+    "economie",
+    "engels",
+    "frans",
+    "duits",
+    "geschiedenis",
+    "informatica",
+    "kunst",
+    "lichamelijke opvoeding",
+    "maatschappijleer",
+    "natuurkunde",
+    "nederlands",
+    "scheikunde",
+    "wiskunde A",
+    "wiskunde B",
+    "wiskunde C",
+    "wiskunde D",
+    "grieks",
+    "latijn",
+)
+
+WERK_NAMEN = (
+    "schriftelijk",
+    "mondeling",
+    "praktisch",
+    "presentatie",
+    "verslag",
+    "werkstuk",
+    "luistertoets",
+    "kijktoets",
+    "dossier",
+    "portfolio",
+    "opdracht",
+    "geen",  # ID 12 is never displayed
+)
+
+OMSCHRIJVINGEN = (
+    "Hoofdstuk {n}: toets over de behandelde stof",
+    "Praktische opdracht &amp; verslag {n}",
+    "Leesdossier {n}\r\nInleveren via de ELO",
+    "Mondeling over de gelezen literatuur ({n} boeken)",
+    "Onderzoek &quot;{n}&quot; met presentatie",
+)
+
+# Toetsweek periodes as week numbers, see Kalender.toetsweek_periodes
+TOETSWEKEN = {"tw11": 44, "tw12": 45, "tw21": 4, "tw22": 5}
+TOETSWEKEN.update({"tw31": 14, "tw32": 15, "tw41": 25, "tw42": 26})
+
+# The leerjaren string is indexed by the Leerjaren value
+LEERJAREN_LENGTH = max(Leerjaren.values) + 1
+
+
+@dataclass
+class Scale:
+    vakken: int
+    toetsen_per_vak: int
+    overstappen_per_vak: int
+    voetnoten_per_vak: int
+
+
+SCALES = {
+    "small": Scale(
+        vakken=5, toetsen_per_vak=4, overstappen_per_vak=2, voetnoten_per_vak=1
+    ),
+    "medium": Scale(
+        vakken=15, toetsen_per_vak=12, overstappen_per_vak=4, voetnoten_per_vak=2
+    ),
+    "large": Scale(
+        vakken=20, toetsen_per_vak=40, overstappen_per_vak=10, voetnoten_per_vak=3
+    ),
+}
+
+
+def get_ocpta_models() -> list:
+    return [
+        model
+        for model in apps.get_app_config("core").get_models()
+        if not model._meta.managed
+    ]
+
+
+@contextmanager
+def ocpta_tables(using: str = "ocpta"):
+    """
+    Create the unmanaged OCPTA tables for the duration of the context.
+
+    This must be used outside of a transaction, as not every database supports
+    schema changes inside of one.
+    """
+    connection = connections[using]
+    if connection.vendor == "mysql":
+        raise RuntimeError("Refusing to create the OCPTA tables in a MySQL database.")
+
+    models = get_ocpta_models()
+    with connection.schema_editor() as schema_editor:
+        for model in models:
+            schema_editor.create_model(model)
+    try:
+        yield
+    finally:
+        with connection.schema_editor() as schema_editor:
+            for model in reversed(models):
+                schema_editor.delete_model(model)
+
+
+class DatasetGenerator:
+    """
+    Generate the OCPTA data for a single year.
+    """
+
+    def __init__(self, year: int, scale: Scale, seed: int = 0, using: str = "ocpta"):
+        self.year = year
+        self.scale = scale
+        self.random = random.Random(seed)
+        self.using = using
+
+    def generate(self) -> dict[str, int]:
+        self.create_kalender()
+        werken = self.create_werken()
+        user = User.objects.using(self.using).create(
+            naam="Benchmark", afkorting="BENCH", email="bench@example.com"
+        )
+        vakken = self.create_vakken()
+        self.create_voetnoten(vakken)
+
+        # toetsen of the previous years are referenced by the overstappen
+        oude_toetsen = {
+            leerjaar: self.create_toetsen(vakken, werken, user, leerjaar, self.year - 1)
+            for leerjaar in (Leerjaren.havo_4, Leerjaren.vwo_4, Leerjaren.vwo_5)
+        }
+        toetsen = {
+            leerjaar: self.create_toetsen(vakken, werken, user, leerjaar, self.year)
+            for leerjaar in Leerjaren
+            if leerjaar.value
+        }
+        self.create_overstappen(vakken, user, oude_toetsen, toetsen)
+
+        return {
+            model._meta.db_table: model.objects.using(self.using).count()
+            for model in get_ocpta_models()
+        }
+
+    def create_kalender(self) -> None:
+        Kalender.objects.using(self.using).create(
+            jaar=self.year, begin=35, eind=27, **TOETSWEKEN
+        )
+
+    def create_werken(self) -> list[Werk]:
+        return Werk.objects.using(self.using).bulk_create(
+            [Werk(id=index, naam=naam) for index, naam in enumerate(WERK_NAMEN, 1)]
+        )
+
+    def get_leerjaren_bits(self, weights: dict[str, int]) -> str:
+        population, _weights = zip(*weights.items())
+        bits = self.random.choices(population, weights=_weights, k=LEERJAREN_LENGTH)
+        return "".join(bits)
+
+    def create_vakken(self) -> list[Vak]:
+        vakken = []
+        for index in range(self.scale.vakken):
+            naam = VAK_NAMEN[index % len(VAK_NAMEN)]
+            if index >= len(VAK_NAMEN):
+                naam = f"{naam} {index // len(VAK_NAMEN) + 1}"
+            vakken.append(
+                Vak(
+                    id=index + 1,
+                    naam=naam,
+                    afkorting=naam[:4].upper().strip(),
+                    sector=self.random.choice((1, 2, 3)),
+                    sortering=self.random.choice(Sorteringen.values),
+                    weergeven=self.random.choice((0, 1)),
+                    leerjaren=self.get_leerjaren_bits(
+                        {
+                            ExportModes.table.value: 6,
+                            ExportModes.no_export.value: 1,
+                            ExportModes.remark_completed_earlier.value: 1,
+                            ExportModes.remark_vwo.value: 1,
+                        }
+                    ),
+                )
+            )
+        return Vak.objects.using(self.using).bulk_create(vakken)
+
+    def create_voetnoten(self, vakken: list[Vak]) -> None:
+        voetnoten = [
+            Voetnoot(
+                vak=vak,
+                noot=f"Voor {vak.naam} geldt opmerking {index + 1}.\r\nZie de ELO.",
+                leerjaren=self.get_leerjaren_bits({"1": 2, "0": 1}),
+            )
+            for vak in vakken
+            for index in range(self.scale.voetnoten_per_vak)
+        ]
+        Voetnoot.objects.using(self.using).bulk_create(voetnoten)
+
+    def get_timestamp(self, week: int) -> int:
+        year = self.year if week >= 30 else self.year + 1
+        moment = datetime.fromisocalendar(year, week, self.random.randint(1, 5))
+        return int(timezone.make_aware(moment).timestamp())
+
+    def create_toetsen(
+        self,
+        vakken: list[Vak],
+        werken: list[Werk],
+        user: User,
+        leerjaar: Leerjaren,
+        year: int,
+    ) -> list[Toets]:
+        toetsen = []
+        toetsweken = list(TOETSWEKEN.values())
+        for vak in vakken:
+            for index in range(self.scale.toetsen_per_vak):
+                periode = index * 4 // self.scale.toetsen_per_vak + 1
+                if self.random.random() < 0.3:
+                    week = toetsweken[(periode - 1) * 2]
+                else:
+                    week = self.random.choice((38, 41, 48, 51, 8, 11, 18, 21))
+                omschrijving = self.random.choice(OMSCHRIJVINGEN)
+                type_ = self.random.choice(
+                    [value for value in Types.values if value and value != Types.ED6]
+                )
+                if leerjaar == Leerjaren.overstappers_vwo_5 and index == 0:
+                    type_ = Types.ED6
+                toetsen.append(
+                    Toets(
+                        jaar=year,
+                        klas=leerjaar,
+                        cohort=str(year),
+                        vak=vak,
+                        user=user,
+                        type=type_,
+                        code=f"{vak.afkorting[:2]}{leerjaar.value}{index % 100:02d}",
+                        omschrijving=omschrijving.format(n=index + 1),
+                        herkansbaar=self.random.choice((1, 2)),
+                        domein=self.random.choice(("", "A", "B1, B2", "C en D")),
+                        week=week,
+                        lesweek=index + 1,
+                        inleverdatum=(
+                            self.get_timestamp(week)
+                            if self.random.random() < 0.2
+                            else 0
+                        ),
+                        datum=(
+                            self.get_timestamp(week)
+                            if self.random.random() < 0.3
+                            else 0
+                        ),
+                        periode=periode,
+                        soortwerk=self.random.choice(werken),
+                        tijd=self.random.choice((0, 50, 100, 120)),
+                        weging_ed3=self.random.randint(0, 10),
+                        weging_ed4=self.random.randint(0, 10),
+                        weging_ed5=self.random.randint(0, 10),
+                        weging_ed6=self.random.randint(0, 10),
+                        weging_r4=self.random.randint(0, 10),
+                        pct=0,
+                        se="SE" if self.random.random() < 0.5 else "",
+                        voetnoot=(
+                            f"Opmerking bij toets {index + 1}"
+                            if self.random.random() < 0.1
+                            else ""
+                        ),
+                        wegingv=0,
+                        vbijt=0,
+                    )
+                )
+        return Toets.objects.using(self.using).bulk_create(toetsen)
+
+    def create_overstappen(
+        self,
+        vakken: list[Vak],
+        user: User,
+        oude_toetsen: dict[Leerjaren, list[Toets]],
+        toetsen: dict[Leerjaren, list[Toets]],
+    ) -> None:
+        overstappen = []
+        for vak in vakken:
+            h4_toetsen = [t for t in oude_toetsen[Leerjaren.havo_4] if t.vak == vak]
+            vwo_toetsen = [
+                toets
+                for leerjaar in (Leerjaren.vwo_4, Leerjaren.vwo_5)
+                for toets in oude_toetsen[leerjaar]
+                if toets.vak == vak
+            ]
+            h5_toetsen = [t for t in toetsen[Leerjaren.havo_5] if t.vak == vak]
+
+            for index in range(self.scale.overstappen_per_vak):
+                actie = self.random.choice(OverstapActies.values)
+                if actie == OverstapActies.inhalen:
+                    oude_toets = self.random.choice(h4_toetsen)
+                else:
+                    oude_toets = self.random.choice(vwo_toetsen)
+                overstappen.append(
+                    Overstap(
+                        jaar=self.year,
+                        klas=Leerjaren.overstappers_vwo_5,
+                        vak=vak,
+                        cohort=str(self.year),
+                        user=user,
+                        weging_ed4=self.random.randint(1, 10),
+                        oude_toets=oude_toets if index else None,
+                        actie=actie,
+                    )
+                )
+                overstappen.append(
+                    Overstap(
+                        jaar=self.year,
+                        klas=Leerjaren.overstappers_vwo_6,
+                        vak=vak,
+                        cohort=str(self.year),
+                        user=user,
+                        weging_ed4=self.random.randint(1, 10),
+                        oude_toets=self.random.choice(vwo_toetsen),
+                        h5_toets=h5_toetsen[index % len(h5_toetsen)],
+                        actie=actie,
+                    )
+                )
+        Overstap.objects.using(self.using).bulk_create(overstappen)
+
+
+def generate_dataset(
+    year: int, scale: Scale, seed: int = 0, using: str = "ocpta"
+) -> dict[str, int]:
+    """
+    Fill the OCPTA tables for ``year``, returning the number of rows per table.
+    """
+    return DatasetGenerator(year, scale, seed=seed, using=using).generate()
@@ -0,0 +1,225 @@
+"""
+Micro-benchmarks of the rendering primitives in :mod:`pta_export.core.document`.
+
+Every case builds its input outside of the measured block and renders a synthetic
+vak with a given number of toetsen. Results are expressed per table cell, so that
+they can be compared between table sizes and against a stored baseline.
+"""
+
+import gc
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Callable
+
+from django.utils import translation
+
+from docx.shared import Cm
+from docx.table import _Cell
+
+from .. import document as doc
+from ..constants import Leerjaren, Sorteringen, Types
+from ..models import Toets, Vak, Werk
+
+TOETSWEEK_PERIODES = {1: [44, 45], 2: [4, 5], 3: [14, 15], 4: [25, 26]}
+
+LEERJAAR = Leerjaren.havo_4
+
+WIDTHS = {index: Cm(2) for index in range(len(doc.COLUMN_WIDTHS) + 2)}
+
+
+def build_vak(num_toetsen: int) -> Vak:
+    """
+    Build an unsaved vak with ``num_toetsen`` toetsen, without touching the database.
+    """
+    vak = Vak(
+        id=1,
+        naam="wiskunde &amp; statistiek",
+        afkorting="WIS",
+        sortering=Sorteringen.chronological,
+        weergeven=1,
+        leerjaren="1" * 40,
+    )
+    werk = Werk(id=1, naam="schriftelijk")
+    toetsen = []
+    for index in range(num_toetsen):
+        toets = Toets(
+            id=index + 1,
+            jaar=2024,
+            klas=LEERJAAR,
+            vak=vak,
+            type=Types.T,
+            code=f"W{index:04d}",
+            omschrijving=f"Hoofdstuk {index}: toets &amp; verslag\r\nover de stof",
+            herkansbaar=1,
+            domein="B1, B2",
+            week=44 if index % 3 else 48,
+            lesweek=index % 40,
+            inleverdatum=date(2024, 11, 1) if index % 4 == 0 else None,
+            datum=date(2024, 11, 4) if index % 4 == 1 else None,
+            periode=index % 4 + 1,
+            soortwerk=werk,
+            tijd=50,
+            weging_ed4=3,
+            weging_r4=2,
+            se="SE",
+            voetnoot="Zie de ELO" if index % 10 == 0 else "",
+            vbijt=0,
+        )
+        toetsen.append(toets)
+    vak.toetsen = toetsen
+    vak.voetnoten = []
+    return vak
+
+
+def get_table_data(vak: Vak) -> tuple[list[str], list[list[str]]]:
+    weging = doc.LEERJAAR_WEGING.get(LEERJAAR)
+    header, *rows = doc.get_toets_table(LEERJAAR, vak, TOETSWEEK_PERIODES, weging)
+    table_data = [
+        [
+            cell.content if isinstance(cell, doc.Omschrijving) else str(cell)
+            for cell in row
+        ]
+        for row in rows
+    ]
+    return header, table_data
+
+
+def iter_cells(table):
+    """
+    Iterate over the cells of a table without spans in linear time.
+
+    ``Table.cell`` and ``_Row.cells`` build the complete cell grid on every call,
+    which would make the setup of the larger cases dominate the run time.
+    """
+    for tr in table._tbl.tr_lst:
+        for tc in tr.tc_lst:
+            yield _Cell(tc, table)
+
+
+def build_table(num_toetsen: int):
+    """
+    Build the same table as :func:`create_table` would, but in linear time.
+    """
+    header, table_data = get_table_data(build_vak(num_toetsen))
+    document = doc.initialize_document()
+    table = document.add_table(rows=len(table_data) + 1, cols=len(header))
+    doc._set_default_table_style(table)
+    values = [*header, *(content for row in table_data for content in row)]
+    for cell, value in zip(iter_cells(table), values):
+        cell.text = value
+    return table
+
+
+@dataclass
+class Case:
+    """
+    A benchmark case.
+
+    ``setup`` receives the number of toetsen and returns the arguments for ``run``
+    and the number of table cells they represent.
+    """
+
+    name: str
+    setup: Callable[[int], tuple[tuple[Any, ...], int]]
+    run: Callable[..., Any]
+
+
+def _setup_vak(num_toetsen: int):
+    vak = build_vak(num_toetsen)
+    weging = doc.LEERJAAR_WEGING.get(LEERJAAR)
+    header = doc.get_toets_table(LEERJAAR, vak, TOETSWEEK_PERIODES, weging)[0]
+    return (LEERJAAR, vak, TOETSWEEK_PERIODES, weging), (num_toetsen + 1) * len(header)
+
+
+def _setup_create_table(num_toetsen: int):
+    header, table_data = get_table_data(build_vak(num_toetsen))
+    document = doc.initialize_document()
+    num_cells = (len(table_data) + 1) * len(header)
+    return (document, header, table_data, WIDTHS), num_cells
+
+
+def _setup_table(num_toetsen: int):
+    table = build_table(num_toetsen)
+    return (table,), len(table.rows) * len(table.columns)
+
+
+def _setup_table_widths(num_toetsen: int):
+    table = build_table(num_toetsen)
+    return (table, WIDTHS), len(table.rows) * len(table.columns)
+
+
+def _setup_cells(num_toetsen: int):
+    cells = list(iter_cells(build_table(num_toetsen)))
+    return (cells,), len(cells)
+
+
+def _set_cells_bg(cells) -> None:
+    for cell in cells:
+        doc._set_cell_bg(cell)
+
+
+def _setup_header(num_toetsen: int):
+    return (doc.initialize_document(), build_vak(0), 2024, LEERJAAR), 1
+
+
+def _setup_document(num_toetsen: int):
+    return (), 1
+
+
+CASES = [
+    Case("get_toets_table", _setup_vak, doc.get_toets_table),
+    Case("create_table", _setup_create_table, doc.create_table),
+    Case("_style_table_cells", _setup_table, doc._style_table_cells),
+    Case("_set_column_widths", _setup_table_widths, doc._set_column_widths),
+    Case("_set_cell_bg", _setup_cells, _set_cells_bg),
+    Case("add_header", _setup_header, doc.add_header),
+    Case("initialize_document", _setup_document, doc.initialize_document),
+]
+
+
+def run_case(
+    case: Case, num_toetsen: int, repeat: int, max_time: float | None = None
+) -> dict[str, float]:
+    """
+    Measure the time and allocations per cell of a single case.
+
+    Timing and memory tracing happen in separate runs, as tracemalloc slows down
+    the code under test considerably. Once the timed runs exceed ``max_time``
+    seconds in total, no further repetitions are done.
+    """
+    durations = []
+    with translation.override("nl_NL"):
+        for _ in range(repeat):
+            args, num_cells = case.setup(num_toetsen)
+            gc.collect()
+            start = time.perf_counter()
+            case.run(*args)
+            durations.append(time.perf_counter() - start)
+            if max_time is not None and sum(durations) > max_time:
+                break
+
+        args, num_cells = case.setup(num_toetsen)
+        gc.collect()
+        tracemalloc.start()
+        try:
+            before = tracemalloc.take_snapshot()
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            case.run(*args)
+            peak = tracemalloc.get_traced_memory()[1] - baseline
+            after = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+
+    blocks = sum(
+        max(stat.count_diff, 0) for stat in after.compare_to(before, "filename")
+    )
+    return {
+        "cells": num_cells,
+        "repeat": len(durations),
+        "time_per_cell": min(durations) / num_cells,
+        "bytes_per_cell": peak / num_cells,
+        "blocks_per_cell": blocks / num_cells,
+    }
@@ -0,0 +1,79 @@
+import json
+import platform
+import statistics
+import subprocess
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from django import get_version
+from django.conf import settings
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+
+def get_commit() -> str:
+    try:
+        process = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+    return process.stdout.strip()
+
+
+def get_metadata(using: str = "ocpta", **extra) -> dict:
+    """
+    Describe the environment, so that results can be compared across commits.
+    """
+    return {
+        "commit": get_commit(),
+        "timestamp": timezone.now().isoformat(),
+        "python": platform.python_version(),
+        "django": get_version(),
+        "database": connections[using].vendor,
+        **extra,
+    }
+
+
+@dataclass
+class Measurement:
+    durations: list[float] = field(default_factory=list)
+    cpu_times: list[float] = field(default_factory=list)
+    queries: int = 0
+    size: int = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "min": min(self.durations),
+            "median": statistics.median(self.durations),
+            "max": max(self.durations),
+            "cpu": statistics.median(self.cpu_times),
+            "repeat": len(self.durations),
+            "queries": self.queries,
+            "size": self.size,
+        }
+
+
+@contextmanager
+def measure(measurement: Measurement, using: str = "ocpta"):
+    """
+    Record the wall time, CPU time and number of queries of the wrapped block.
+    """
+    with CaptureQueriesContext(connections[using]) as queries:
+        start, cpu_start = time.perf_counter(), time.process_time()
+        yield measurement
+        measurement.durations.append(time.perf_counter() - start)
+        measurement.cpu_times.append(time.process_time() - cpu_start)
+    measurement.queries = len(queries)
+
+
+def write_results(path: str, results: dict) -> None:
+    with open(path, "w") as outfile:
+        json.dump(results, outfile, indent=2)
+        outfile.write("\n")
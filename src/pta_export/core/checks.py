@@ -0,0 +1,62 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+from django.db import DatabaseError, connections
+
+from .constants import Compression
+from .indexes import get_missing_indexes
+
+
+@register(Tags.database)
+def check_ocpta_indexes(app_configs, databases=None, **kwargs):
+    """
+    Check that the OCPTA tables have the indexes the export filters on.
+
+    The OCPTA tables are unmanaged, so nothing creates these indexes for us. Run
+    this with ``manage.py check --database ocpta``.
+    """
+    if not databases or "ocpta" not in databases:
+        return []
+
+    try:
+        missing = get_missing_indexes("ocpta")
+    except DatabaseError as exc:
+        return [
+            Warning(
+                f"Could not inspect the indexes of the OCPTA database: {exc}",
+                id="core.W002",
+            )
+        ]
+
+    connection = connections["ocpta"]
+    return [
+        Warning(
+            f"Missing index on {index.table} ({', '.join(index.columns)})",
+            hint=f"Run manage.py advise_indexes, or: {index.get_ddl(connection)};",
+            id="core.W001",
+        )
+        for index in missing
+    ]
+
+
+@register
+def check_compression(app_configs, **kwargs):
+    """
+    Check that the export compression settings name known profiles.
+    """
+    profiles = {
+        "PTA_EXPORT_COMPRESSION": settings.PTA_EXPORT_COMPRESSION,
+        **{
+            f"PTA_EXPORT_ENDPOINT_COMPRESSION[{endpoint!r}]": profile
+            for endpoint, profile in settings.PTA_EXPORT_ENDPOINT_COMPRESSION.items()
+            if profile
+        },
+    }
+    return [
+        Error(
+            f"Unknown compression profile {profile!r} in {name}",
+            hint=f"Use one of {', '.join(Compression.values)}.",
+            id="core.E001",
+        )
+        for name, profile in profiles.items()
+        if profile not in Compression.values
+    ]
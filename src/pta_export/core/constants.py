@@ -154,6 +154,19 @@ class ExportModes(models.TextChoices):
     remark_vwo = "3", "opmerking afronding op VWO niveau"
 
 
+class Compression(models.TextChoices):
+    stored = "stored", "niet comprimeren"
+    fast = "fast", "snel"
+    default = "default", "standaard"
+    max = "max", "maximaal"
+
+
+class ExportFormats(models.TextChoices):
+    docx = "docx", "Word"
+    xlsx = "xlsx", "Excel"
+    csv = "csv", "CSV"
+
+
 class AccessModes(models.IntegerChoices):
     export_any = 1, "export: alle klassen"
     export_by_sector = 2, "export: adhv sector"
@@ -0,0 +1,228 @@
+"""
+Read-only JSON API for the PTA data: vakken, voetnoten, toetsen and overstappen.
+
+The rows are fetched with ``QuerySet.values()``, which decodes the columns with
+the same model fields as the export (e.g. the CP1252 text and the integer dates)
+without hydrating model instances, and are rendered as they are.
+
+- Pages are keyset paginated on the id (``cursor``), so later pages don't get
+  slower at thousands of rows.
+- ``fields`` limits the columns that are fetched and returned.
+- Responses have an ``ETag`` derived from the data fingerprints (see
+  :mod:`pta_export.core.fingerprints`). A request with a matching
+  ``If-None-Match`` gets a 304 response without fetching the rows.
+"""
+
+import hashlib
+
+from django.db.models import F, Model, QuerySet
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags, quote_etag
+
+from rest_framework import serializers
+from rest_framework.generics import ListAPIView
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+from .constants import Leerjaren
+from .fingerprints import get_fingerprint, get_vakken_fingerprint, get_year_fingerprint
+from .models import Overstap, Toets, Vak, Voetnoot
+
+
+class IdCursorPagination(CursorPagination):
+    ordering = "id"
+    page_size = 500
+    page_size_query_param = "page_size"
+    max_page_size = 5000
+
+
+class DataQuerySerializer(serializers.Serializer):
+    jaar = serializers.IntegerField(
+        required=False, help_text="Jaar in YYYY formaat, bv. 2019."
+    )
+    klas = serializers.ChoiceField(
+        choices=[choice for choice in Leerjaren.choices if choice[0]], required=False
+    )
+    vak = serializers.IntegerField(required=False, help_text="ID van het vak.")
+    fields = serializers.CharField(
+        required=False, help_text="Komma-gescheiden lijst van de velden."
+    )
+
+    def validate_fields(self, value: str) -> list[str]:
+        fields = [field.strip() for field in value.split(",") if field.strip()]
+        available = self.context["fields"]
+        if unknown := [field for field in fields if field not in available]:
+            raise serializers.ValidationError(
+                f"Onbekende velden: {', '.join(unknown)}. "
+                f"Beschikbaar: {', '.join(available)}."
+            )
+        return fields
+
+    def validate(self, attrs):
+        view = self.context["view"]
+        if missing := [name for name in view.required_filters if name not in attrs]:
+            raise serializers.ValidationError(
+                {name: "Dit veld is verplicht." for name in missing}
+            )
+        return attrs
+
+
+def get_model_fields(model: type[Model], exclude: tuple[str, ...] = ()) -> dict:
+    # foreign keys are returned as the id of the related object
+    return {
+        field.name: field.name
+        for field in model._meta.concrete_fields
+        if field.name not in exclude
+    }
+
+
+class DataAPIView(ListAPIView):
+    """
+    Base view for the data endpoints.
+    """
+
+    model: type[Model]
+    # name in the response -> lookup of the value
+    fields: dict[str, str]
+    # query parameters to filter on, and the ones that are required
+    filters: tuple[str, ...] = ()
+    required_filters: tuple[str, ...] = ()
+    pagination_class = IdCursorPagination
+    # the fingerprint and the page, and the OCPTA user of the request
+    query_budget = {"default": 10, "ocpta": 8}
+
+    def get_params(self) -> dict:
+        serializer = DataQuerySerializer(
+            data=self.request.query_params,
+            context={"view": self, "fields": list(self.fields)},
+        )
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data
+
+    def get_fingerprint(self, params: dict) -> str:
+        raise NotImplementedError
+
+    def get_etag(self, params: dict) -> str:
+        # the page, projection and filters are part of the path
+        hasher = hashlib.sha1(usedforsecurity=False)
+        hasher.update(self.get_fingerprint(params).encode())
+        hasher.update(self.request.get_full_path().encode())
+        return quote_etag(hasher.hexdigest())
+
+    def get_queryset(self) -> QuerySet:
+        params = self.params
+        names = params.get("fields") or list(self.fields)
+        # the id is needed for the cursor of the next page
+        if "id" not in names:
+            names = ["id", *names]
+        queryset = self.model.objects.filter(
+            **{name: params[name] for name in self.filters if name in params}
+        )
+        lookups = {name: self.fields[name] for name in names}
+        return queryset.values(
+            *(name for name, lookup in lookups.items() if name == lookup),
+            **{name: F(lookup) for name, lookup in lookups.items() if name != lookup},
+        )
+
+    def list(self, request, *args, **kwargs):
+        self.params = self.get_params()
+        etag = self.get_etag(self.params)
+        if_none_match = parse_etags(request.headers.get("If-None-Match", ""))
+        if etag in if_none_match or "*" in if_none_match:
+            response = Response(status=304)
+        else:
+            page = self.paginate_queryset(self.get_queryset())
+            response = self.get_paginated_response(page)
+        response["ETag"] = etag
+        # cached by the client, but revalidated on every use
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+class VakkenDataView(DataAPIView):
+    """
+    List the vakken.
+
+    Optional parameters:
+
+    - `fields`: comma separated fields to return, e.g. `id,naam,afkorting`
+    - `page_size`: number of vakken per page (default 500, at most 5000)
+    """
+
+    model = Vak
+    fields = get_model_fields(Vak)
+
+    def get_fingerprint(self, params: dict) -> str:
+        return get_vakken_fingerprint()
+
+
+class VoetnotenDataView(DataAPIView):
+    """
+    List the voetnoten of the vakken.
+
+    Optional parameters:
+
+    - `vak`: ID of the vak
+    - `fields`: comma separated fields to return, e.g. `id,vak,noot`
+    - `page_size`: number of voetnoten per page (default 500, at most 5000)
+    """
+
+    model = Voetnoot
+    fields = get_model_fields(Voetnoot)
+    filters = ("vak",)
+
+    def get_fingerprint(self, params: dict) -> str:
+        return get_vakken_fingerprint()
+
+
+class YearDataAPIView(DataAPIView):
+    filters = ("jaar", "klas", "vak")
+    required_filters = ("jaar",)
+
+    def get_fingerprint(self, params: dict) -> str:
+        if "klas" in params:
+            return get_fingerprint(params["jaar"], params["klas"])
+        return get_year_fingerprint(params["jaar"])
+
+
+class ToetsenDataView(YearDataAPIView):
+    """
+    List the toetsen of a year.
+
+    Required parameters:
+
+    - `jaar`: year in the YYYY format, e.g. 2019
+
+    Optional parameters:
+
+    - `klas`: Array index of the klas/leerjaar, e.g. `1` for "4 havo"
+    - `vak`: ID of the vak
+    - `fields`: comma separated fields to return, e.g. `id,code,omschrijving`
+    - `page_size`: number of toetsen per page (default 500, at most 5000)
+    """
+
+    model = Toets
+    fields = {
+        **get_model_fields(Toets, exclude=("user",)),
+        "soortwerk_naam": "soortwerk__naam",
+    }
+
+
+class OverstappenDataView(YearDataAPIView):
+    """
+    List the overstappen of a year.
+
+    Required parameters:
+
+    - `jaar`: year in the YYYY format, e.g. 2019
+
+    Optional parameters:
+
+    - `klas`: Array index of the klas/leerjaar, e.g. `6` for "overstappers vwo 5"
+    - `vak`: ID of the vak
+    - `fields`: comma separated fields to return, e.g. `id,oude_toets,actie`
+    - `page_size`: number of overstappen per page (default 500, at most 5000)
+    """
+
+    model = Overstap
+    fields = get_model_fields(Overstap, exclude=("user",))
@@ -1,4 +1,5 @@
 import html
+import threading
 from dataclasses import dataclass
 
 from django.template.defaultfilters import date as format_date
@@ -129,23 +130,27 @@ def add_vak(
             add_vak_regular(document, vak, year, leerjaar, toetsweek_periodes)
 
 
+# the footnote numbering is per render, and renders may run concurrently (shadow
+# renders run in a background thread)
+_voetnoot_counter = threading.local()
+
+
 @dataclass
 class Omschrijving:
     content: str
     inleverdatum: str
     voetnoot: str
 
-    _voetnoot_counter = 0
     voetnoot_nr = 0
 
     def __post_init__(self):
         if self.voetnoot:
-            self.__class__._voetnoot_counter += 1
-            self.voetnoot_nr = self.__class__._voetnoot_counter
+            _voetnoot_counter.value = getattr(_voetnoot_counter, "value", 0) + 1
+            self.voetnoot_nr = _voetnoot_counter.value
 
     @classmethod
     def reset_counter(cls):
-        cls._voetnoot_counter = 0
+        _voetnoot_counter.value = 0
 
 
 def clean_text(text: str) -> str:
@@ -390,6 +395,149 @@ def iter_oude_toets_columns(oude_toets: Toets | None):
     yield oude_toets.domein,
 
 
+def get_overnemen_herwaarderen_table(vak: Vak) -> list[list[str]]:
+    header = [
+        "Code V4/V5",
+        "Jaar",
+        "Omschrijving",
+        "Domein",
+        "Actie",
+        "Weging SE",
+    ]
+    rows = [
+        [
+            *iter_oude_toets_columns(overstap.oude_toets),
+            overstap.get_actie_display(),
+            str(overstap.weging_ed4),
+        ]
+        for overstap in vak.overnemen_herwaarderen
+    ]
+    return [header] + rows
+
+
+def get_inhalen_table(vak: Vak) -> list[list[str]]:
+    header = ["Code H4", "Jaar", "Omschrijving", "Domein", "Weging SE"]
+    rows = [
+        [
+            overstap.oude_toets.code,
+            f"{overstap.oude_toets.jaar}-{overstap.oude_toets.jaar + 1}",
+            clean_text(overstap.oude_toets.omschrijving),
+            overstap.oude_toets.domein,
+            str(overstap.weging_ed4),
+        ]
+        for overstap in vak.inhalen
+    ]
+    return [header] + rows
+
+
+def get_inhaalopdrachten_table(vak: Vak) -> list[list[str]]:
+    header = ["Code H4", "Jaar", "Omschrijving", "Domein", "Weging SE"]
+    rows = [
+        [
+            toets.code,
+            f"{toets.jaar}-{toets.jaar + 1}",
+            clean_text(toets.omschrijving),
+            toets.domein,
+            str(toets.weging_ed4),
+        ]
+        for toets in vak.inhaalopdrachten
+    ]
+    return [header] + rows
+
+
+def get_h5_toetsen_table(vak: Vak) -> list[list[str]]:
+    overstappen = {overstap.h5_toets_id: overstap for overstap in vak.overstappen_vwo6}
+
+    PREFIX_MAPPING = {
+        Leerjaren.vwo_4: "V4",
+        Leerjaren.vwo_5: "V5",
+        Leerjaren.vwo_6: "V6",
+    }
+
+    def _get_oude_toets(toets) -> str:
+        overstap = overstappen.get(toets.id)
+        if not overstap:
+            return ""
+        if not overstap.oude_toets:
+            return ""
+        prefix = PREFIX_MAPPING[overstap.oude_toets.klas]
+        return f"{prefix} {overstap.oude_toets.code}"
+
+    def _get_actie(toets):
+        overstap = overstappen.get(toets.id)
+        if not overstap:
+            return ""
+        return overstap.get_actie_display()
+
+    header = [
+        "Code H5",
+        "Oude toets",
+        "Omschrijving",
+        "Domein",
+        "Actie",
+    ]
+    rows = [
+        [
+            toets.code,
+            _get_oude_toets(toets),
+            clean_text(toets.omschrijving),
+            toets.domein or "",
+            _get_actie(toets),
+        ]
+        for toets in vak.h5_toetsen
+    ]
+    return [header] + rows
+
+
+def get_tl_table(
+    leerjaar: int, vak: Vak, toetsweek_periodes: dict[int, list[int]]
+) -> list[list[str]]:
+    type_map = {
+        3: "Schriftelijk",
+        4: "Praktisch",
+        5: "Handelingsdeel",
+    }
+    herkansbaar = {
+        Types.T: "Ja",
+        Types.H: "Ja",
+        Types.R: "Nee",
+        Types.V: "Nee",
+        Types.P: "Nee",
+    }
+
+    weging_map = {
+        Leerjaren.tl_3: lambda t: t.weging_ed3,
+        Leerjaren.tl_4: lambda t: t.weging_ed4,
+    }
+
+    header = [
+        "Code",
+        "Onderwerp/Omschrijving",
+        "Eind-\ntermen",
+        "Periode",
+        "Herkansbaar",
+        "Soort werk",
+        "Tijd\n(min)",
+        "Weging SE",
+    ]
+    rows = [
+        [
+            toets.code,
+            clean_text(toets.omschrijving),
+            clean_text(toets.domein or ""),
+            get_periode_and_week(toets, toetsweek_periodes)[0],
+            herkansbaar.get(
+                toets.type, ""
+            ),  # apparently the DB column cannot be trusted?
+            type_map.get(toets.type) or "",  # does not follow regular enum...
+            str(toets.tijd or ""),
+            str(weging_map[leerjaar](toets)) if leerjaar in weging_map else "",
+        ]
+        for toets in vak.toetsen
+    ]
+    return [header] + rows
+
+
 def add_vak_overstappers_vwo5(document: Document, vak: Vak, year: int, leerjaar: int):
     match vak.export_bit_for(leerjaar):
         case ExportModes.no_export.value:
@@ -428,22 +576,7 @@ def add_vak_overstappers_vwo5(document: Document, vak: Vak, year: int, leerjaar:
         # try to set global font name
         _set_default_font(paragraph)
 
-        header = [
-            "Code V4/V5",
-            "Jaar",
-            "Omschrijving",
-            "Domein",
-            "Actie",
-            "Weging SE",
-        ]
-        table_data = [
-            [
-                *iter_oude_toets_columns(overstap.oude_toets),
-                overstap.get_actie_display(),
-                str(overstap.weging_ed4),
-            ]
-            for overstap in vak.overnemen_herwaarderen
-        ]
+        [header, *table_data] = get_overnemen_herwaarderen_table(vak)
         WIDTHS = {
             0: Cm(2.00),
             1: Cm(2.50),
@@ -463,17 +596,7 @@ def add_vak_overstappers_vwo5(document: Document, vak: Vak, year: int, leerjaar:
         if vak.overnemen_herwaarderen:
             paragraph.paragraph_format.space_before = Pt(10)
 
-        header = ["Code H4", "Jaar", "Omschrijving", "Domein", "Weging SE"]
-        table_data = [
-            [
-                overstap.oude_toets.code,
-                f"{overstap.oude_toets.jaar}-{overstap.oude_toets.jaar + 1}",
-                clean_text(overstap.oude_toets.omschrijving),
-                overstap.oude_toets.domein,
-                str(overstap.weging_ed4),
-            ]
-            for overstap in vak.inhalen
-        ]
+        [header, *table_data] = get_inhalen_table(vak)
         WIDTHS = {
             0: Cm(2.00),
             1: Cm(2.50),
@@ -493,17 +616,7 @@ def add_vak_overstappers_vwo5(document: Document, vak: Vak, year: int, leerjaar:
         if vak.overnemen_herwaarderen or vak.inhalen:
             paragraph.paragraph_format.space_before = Pt(10)
 
-        header = ["Code H4", "Jaar", "Omschrijving", "Domein", "Weging SE"]
-        table_data = [
-            [
-                toets.code,
-                f"{toets.jaar}-{toets.jaar + 1}",
-                clean_text(toets.omschrijving),
-                toets.domein,
-                str(toets.weging_ed4),
-            ]
-            for toets in vak.inhaalopdrachten
-        ]
+        [header, *table_data] = get_inhaalopdrachten_table(vak)
         WIDTHS = {
             0: Cm(2.00),
             1: Cm(2.50),
@@ -550,8 +663,6 @@ def add_vak_overstappers_vwo6(
     if not vak.h5_toetsen:
         return
 
-    overstappen = {overstap.h5_toets_id: overstap for overstap in vak.overstappen_vwo6}
-
     add_header(document, vak, year, leerjaar)
 
     paragraph = document.add_paragraph(
@@ -562,45 +673,7 @@ def add_vak_overstappers_vwo6(
     # try to set global font name
     _set_default_font(paragraph)
 
-    PREFIX_MAPPING = {
-        Leerjaren.vwo_4: "V4",
-        Leerjaren.vwo_5: "V5",
-        Leerjaren.vwo_6: "V6",
-    }
-
-    def _get_oude_toets(toets) -> str:
-        overstap = overstappen.get(toets.id)
-        if not overstap:
-            return ""
-        if not overstap.oude_toets:
-            return ""
-        prefix = PREFIX_MAPPING[overstap.oude_toets.klas]
-        return f"{prefix} {overstap.oude_toets.code}"
-
-    def _get_actie(toets):
-        overstap = overstappen.get(toets.id)
-        if not overstap:
-            return ""
-        return overstap.get_actie_display()
-
-    table_data = [
-        [
-            toets.code,
-            _get_oude_toets(toets),
-            clean_text(toets.omschrijving),
-            toets.domein or "",
-            _get_actie(toets),
-        ]
-        for toets in vak.h5_toetsen
-    ]
-
-    header = [
-        "Code H5",
-        "Oude toets",
-        "Omschrijving",
-        "Domein",
-        "Actie",
-    ]
+    [header, *table_data] = get_h5_toetsen_table(vak)
     WIDTHS = {
         0: Cm(2.00),
         1: Cm(2.50),
@@ -620,56 +693,12 @@ def add_vak_tl(
     leerjaar: int,
     toetsweek_periodes: dict[int, list[int]],
 ) -> None:
-    toetsen: list[Toets]
-    if not (toetsen := vak.toetsen):
+    if not vak.toetsen:
         return
 
     add_header(document, vak, year, leerjaar)
 
-    type_map = {
-        3: "Schriftelijk",
-        4: "Praktisch",
-        5: "Handelingsdeel",
-    }
-    herkansbaar = {
-        Types.T: "Ja",
-        Types.H: "Ja",
-        Types.R: "Nee",
-        Types.V: "Nee",
-        Types.P: "Nee",
-    }
-
-    weging_map = {
-        Leerjaren.tl_3: lambda t: t.weging_ed3,
-        Leerjaren.tl_4: lambda t: t.weging_ed4,
-    }
-
-    table_data = [
-        [
-            toets.code,
-            clean_text(toets.omschrijving),
-            clean_text(toets.domein or ""),
-            get_periode_and_week(toets, toetsweek_periodes)[0],
-            herkansbaar.get(
-                toets.type, ""
-            ),  # apparently the DB column cannot be trusted?
-            type_map.get(toets.type) or "",  # does not follow regular enum...
-            str(toets.tijd or ""),
-            str(weging_map[leerjaar](toets)) if leerjaar in weging_map else "",
-        ]
-        for toets in toetsen
-    ]
-
-    header = [
-        "Code",
-        "Onderwerp/Omschrijving",
-        "Eind-\ntermen",
-        "Periode",
-        "Herkansbaar",
-        "Soort werk",
-        "Tijd\n(min)",
-        "Weging SE",
-    ]
+    [header, *table_data] = get_tl_table(leerjaar, vak, toetsweek_periodes)
     WIDTHS = {
         0: Cm(1.51),
         1: Cm(10.10),
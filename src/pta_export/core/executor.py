@@ -0,0 +1,51 @@
+"""
+Run exports outside of the event loop of the ASGI server.
+
+Fetching and rendering an export blocks for seconds on MySQL and python-docx. The
+async views hand that work to a thread pool with ``PTA_EXPORT_RENDER_THREADS``
+workers, so the process keeps serving logins, forms and archived exports while a
+render is in flight, and the number of concurrent renders per process (and the
+OCPTA connections they hold) stays bounded.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, TypeVar
+
+from django.conf import settings
+from django.db import close_old_connections
+
+T = TypeVar("T")
+
+_executor: ThreadPoolExecutor | None = None
+_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.PTA_EXPORT_RENDER_THREADS,
+                thread_name_prefix="pta-export-render",
+            )
+    return _executor
+
+
+def _call(func: Callable[..., T], *args, **kwargs) -> T:
+    # the worker threads outlive the requests, treat every call as a request for the
+    # database connections of the thread
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run_in_executor(func: Callable[..., T], *args, **kwargs) -> T:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_executor(), partial(_call, func, *args, **kwargs)
+    )
@@ -1,40 +1,145 @@
+import copy
 import logging
-from typing import Iterable
+import time
+from collections import defaultdict
+from itertools import groupby
+from operator import attrgetter
+from typing import Collection, Iterable, Iterator
 
-from django.db.models import Case, F, Prefetch, When
+from django.conf import settings
+from django.db import connections, router
+from django.db.models import Case, F, Prefetch, QuerySet, When
 from django.db.models.functions import Lower
 from django.utils import translation
 
 from docx import Document
 
+from pta_export.utils import cache
+from pta_export.utils.query_budget import query_budget
+
+from . import timing
 from .constants import Leerjaren, OverstapActies, Sorteringen, Types
 from .document import add_vak, initialize_document
-from .models import Kalender, Overstap, Toets, Vak, Voetnoot
+from .models import Kalender, Overstap, Toets, Vak, Voetnoot, Werk
+from .shadow import (
+    get_candidate_renderer,
+    get_renderer_mode,
+    should_shadow,
+    start_shadow_render,
+)
 
 logger = logging.getLogger(__name__)
 
+# attributes populated by the prefetches of get_vakken
+PREFETCH_ATTRS = (
+    "toetsen",
+    "voetnoten",
+    "overnemen_herwaarderen",
+    "inhalen",
+    "inhaalopdrachten",
+    "h5_toetsen",
+    "overstappen_vwo6",
+)
+
+
+# one query for the vakken, one per prefetch, and on a cache miss one for the
+# kalender and one for the werken, regardless of the number of vakken and toetsen
+EXPORT_QUERY_BUDGET = 10
+
+# the vak with its voetnoten, the toetsen, havo 5 toetsen and overstappen of all the
+# leerjaren, and on a cache miss the kalender and the werken
+EXPORT_VAK_QUERY_BUDGET = 7
+
+# the leerjaren of a vak export, in the order of the school
+VAK_EXPORT_LEERJAREN = (
+    *Leerjaren.get_onderbouw_havo_vwo(),
+    *Leerjaren.get_bovenbouw_havo_vwo(),
+    *Leerjaren.get_vmbo(),
+)
+
 
-def export(year: int, leerjaar: int) -> Document:
+@query_budget("export()", ocpta=EXPORT_QUERY_BUDGET)
+def export(
+    year: int,
+    leerjaar: int,
+    stream: bool | None = None,
+    vak_ids: Collection[int] | None = None,
+) -> Document:
+    """
+    Render the export, limited to the vakken in ``vak_ids`` if given.
+
+    The toetsen are streamed with ``stream`` (default: ``PTA_EXPORT_STREAM_TOETSEN``).
+    The candidate and shadow renderers need all the vakken up front and don't
+    stream.
+    """
+    mode = get_renderer_mode()
+    if stream is None:
+        stream = settings.PTA_EXPORT_STREAM_TOETSEN
     translation.activate("nl_NL")
-    toetsen = (
-        Toets.objects.select_related("soortwerk")
-        .filter(jaar=year, klas=leerjaar)
-        .order_by(
-            # first field to order on
-            Case(
-                When(vak__sortering=Sorteringen.chronological, then=F("lesweek")),
-                When(vak__sortering=Sorteringen.by_type, then=F("type")),
-                default=F("lesweek"),
-            ),
-            # second field to order on
-            Case(
-                When(vak__sortering=Sorteringen.chronological, then=F("type")),
-                When(vak__sortering=Sorteringen.by_type, then=F("lesweek")),
-                default=F("lesweek"),
-            ),
-            # and lastly, order on code
-            F("code"),
-        )
+    if stream and mode == "legacy":
+        # the toetsen are fetched while rendering
+        with timing.phase("render"):
+            doc = create_document(
+                year, leerjaar, stream_vakken(year, leerjaar, vak_ids)
+            )
+        translation.deactivate()
+        return doc
+
+    with timing.phase("fetch"):
+        vakken = fetch_vakken(year, leerjaar, vak_ids)
+    timing.record(vakken=len(vakken), rows=count_rows(vakken))
+
+    if mode == "candidate":
+        with timing.phase("render"):
+            doc = get_candidate_renderer()(year, leerjaar, vakken)
+    else:
+        start = time.perf_counter()
+        with timing.phase("render"):
+            doc = create_document(year, leerjaar, vakken)
+        duration = time.perf_counter() - start
+        if mode == "shadow" and should_shadow():
+            start_shadow_render(year, leerjaar, vakken, doc, duration)
+    translation.deactivate()
+    return doc
+
+
+def get_toets_ordering() -> tuple:
+    """
+    Order the toetsen of a vak according to the sortering of the vak.
+    """
+    return (
+        # first field to order on
+        Case(
+            When(vak__sortering=Sorteringen.chronological, then=F("lesweek")),
+            When(vak__sortering=Sorteringen.by_type, then=F("type")),
+            default=F("lesweek"),
+        ),
+        # second field to order on
+        Case(
+            When(vak__sortering=Sorteringen.chronological, then=F("type")),
+            When(vak__sortering=Sorteringen.by_type, then=F("lesweek")),
+            default=F("lesweek"),
+        ),
+        # and lastly, order on code
+        F("code"),
+    )
+
+
+def get_vakken(
+    year: int,
+    leerjaar: int,
+    with_toetsen: bool = True,
+    vak_ids: Collection[int] | None = None,
+) -> QuerySet[Vak]:
+    """
+    Build the queryset of vakken with all the data needed to render the export.
+
+    Without ``with_toetsen``, the toetsen are left to :func:`stream_vakken`. With
+    ``vak_ids``, only those vakken are fetched, and the prefetches are limited to
+    them too.
+    """
+    toetsen = Toets.objects.filter(jaar=year, klas=leerjaar).order_by(
+        *get_toets_ordering()
     )
     voetnoten = Voetnoot.objects.order_by("id")
     overstappen = (
@@ -42,8 +147,7 @@ def export(year: int, leerjaar: int) -> Document:
         .select_related("oude_toets")
         .order_by("oude_toets__klas", "oude_toets__code")
     )
-    vakken = Vak.objects.prefetch_related(
-        Prefetch("toets_set", queryset=toetsen, to_attr="toetsen"),
+    prefetches = [
         Prefetch("voetnoot_set", queryset=voetnoten, to_attr="voetnoten"),
         Prefetch(
             "overstap_set",
@@ -82,10 +186,133 @@ def export(year: int, leerjaar: int) -> Document:
             ),
             to_attr="overstappen_vwo6",
         ),
-    ).order_by(Lower("naam"))
-    doc = create_document(year, leerjaar, vakken)
-    translation.deactivate()
-    return doc
+    ]
+    if with_toetsen:
+        prefetches.insert(0, Prefetch("toets_set", queryset=toetsen, to_attr="toetsen"))
+    vakken = Vak.objects.prefetch_related(*prefetches)
+    if vak_ids is not None:
+        vakken = vakken.filter(id__in=vak_ids)
+    # the id keeps the order of vakken with the same name stable for stream_vakken
+    return vakken.order_by(Lower("naam"), "id")
+
+
+def fetch_vakken(
+    year: int, leerjaar: int, vak_ids: Collection[int] | None = None
+) -> list[Vak]:
+    vakken = list(get_vakken(year, leerjaar, vak_ids=vak_ids))
+    add_werken(vakken)
+    return vakken
+
+
+def get_stream_alias() -> str:
+    alias = settings.PTA_EXPORT_STREAM_DATABASE
+    return alias if alias in connections else router.db_for_read(Toets)
+
+
+def stream_vakken(
+    year: int, leerjaar: int, vak_ids: Collection[int] | None = None
+) -> Iterator[Vak]:
+    """
+    Yield the vakken of :func:`fetch_vakken` one at a time, reading their toetsen in
+    chunks of ``PTA_EXPORT_STREAM_CHUNK_SIZE`` through a server-side cursor.
+
+    Only the toetsen of the current vak are kept, they are released when the next
+    vak is requested.
+    """
+    vakken = list(get_vakken(year, leerjaar, with_toetsen=False, vak_ids=vak_ids))
+    werken = get_werken()
+    toetsen = Toets.objects.using(get_stream_alias()).filter(
+        jaar=year, klas=leerjaar, vak__isnull=False
+    )
+    if vak_ids is not None:
+        toetsen = toetsen.filter(vak_id__in=vak_ids)
+    toetsen = (
+        toetsen
+        # the order of the vakken, and then the order within the vak
+        .order_by(Lower("vak__naam"), "vak_id", *get_toets_ordering()).iterator(
+            chunk_size=settings.PTA_EXPORT_STREAM_CHUNK_SIZE
+        )
+    )
+    groups = groupby(toetsen, key=attrgetter("vak_id"))
+    vak_id, group = next(groups, (None, None))
+    for vak in vakken:
+        if vak.id == vak_id:
+            vak.toetsen = list(group)
+            vak_id, group = next(groups, (None, None))
+        else:
+            vak.toetsen = []
+        set_werken(werken, (*vak.toetsen, *vak.inhaalopdrachten))
+        timing.record(vakken=1, rows=count_rows([vak]))
+        yield vak
+        vak.toetsen = []
+
+    if vak_id is not None:
+        logger.error(
+            "Toetsen of vak %s (and later) were not streamed in the order of the "
+            "vakken and are missing from export %s-%s",
+            vak_id,
+            year,
+            leerjaar,
+        )
+
+
+def get_kalender_key(year: int) -> str:
+    return f"ocpta:kalender:{year}"
+
+
+WERKEN_KEY = "ocpta:werken"
+
+VAK_CHOICES_KEY = "ocpta:vak_choices"
+
+
+def get_kalender(year: int) -> Kalender:
+    return cache.get_or_set(
+        get_kalender_key(year), lambda: Kalender.objects.get(jaar=year)
+    )
+
+
+def get_werken() -> dict[int, Werk]:
+    return cache.get_or_set(
+        WERKEN_KEY, lambda: {werk.id: werk for werk in Werk.objects.all()}
+    )
+
+
+def get_vak_choices() -> list[tuple[int, str]]:
+    """
+    Return the (id, naam) of all vakken, ordered by name.
+    """
+    return cache.get_or_set(
+        VAK_CHOICES_KEY,
+        lambda: list(Vak.objects.order_by(Lower("naam")).values_list("id", "naam")),
+    )
+
+
+def add_werken(vakken: list[Vak]) -> None:
+    """
+    Set the soortwerk of the toetsen from the cached werken instead of a join.
+    """
+    werken = get_werken()
+    for vak in vakken:
+        set_werken(werken, (*vak.toetsen, *vak.inhaalopdrachten))
+
+
+def set_werken(werken: dict[int, Werk], toetsen: Iterable[Toets]) -> None:
+    set_cached_value = Toets._meta.get_field("soortwerk").set_cached_value
+    for toets in toetsen:
+        set_cached_value(toets, werken.get(toets.soortwerk_id))
+
+
+def invalidate_lookups(year: int) -> None:
+    cache.invalidate(get_kalender_key(year), WERKEN_KEY, VAK_CHOICES_KEY)
+
+
+def count_rows(vakken: list[Vak]) -> int:
+    """
+    Count the model instances fetched by :func:`get_vakken`.
+    """
+    return len(vakken) + sum(
+        len(getattr(vak, attr)) for vak in vakken for attr in PREFETCH_ATTRS
+    )
 
 
 def create_document(
@@ -93,10 +320,96 @@ def create_document(
     leerjaar: int,
     vakken: Iterable[Vak],
 ) -> Document:
-    toetsweek_periodes = Kalender.objects.get(jaar=year).toetsweek_periodes
+    toetsweek_periodes = get_kalender(year).toetsweek_periodes
     document = initialize_document()
 
     for vak in vakken:
         add_vak(document, vak, year, leerjaar, toetsweek_periodes)
 
     return document
+
+
+def fetch_vak_leerjaren(
+    year: int, vak_id: int, leerjaren: Collection[int] = VAK_EXPORT_LEERJAREN
+) -> dict[int, Vak]:
+    """
+    Fetch the data of a vak for all the ``leerjaren`` at once, and split it into a
+    copy of the vak per leerjaar with the attributes of :func:`get_vakken`.
+    """
+    vak = Vak.objects.prefetch_related(
+        Prefetch(
+            "voetnoot_set",
+            queryset=Voetnoot.objects.order_by("id"),
+            to_attr="voetnoten",
+        )
+    ).get(id=vak_id)
+    toetsen = list(
+        Toets.objects.filter(jaar=year, vak_id=vak_id, klas__in=leerjaren).order_by(
+            "klas", *get_toets_ordering()
+        )
+    )
+    h5_toetsen = list(
+        Toets.objects.exclude(soortwerk=12)
+        .filter(jaar=year, vak_id=vak_id, klas=Leerjaren.havo_5)
+        .order_by("code")
+    )
+    overstappen = (
+        Overstap.objects.filter(jaar=year, vak_id=vak_id, klas__in=leerjaren)
+        .select_related("oude_toets", "h5_toets")
+        .order_by("klas", "oude_toets__klas", "oude_toets__code")
+    )
+    set_werken(get_werken(), toetsen)
+
+    toetsen_per_klas = defaultdict(list)
+    for toets in toetsen:
+        toetsen_per_klas[toets.klas].append(toets)
+    overstappen_per_klas = defaultdict(list)
+    for overstap in overstappen:
+        overstappen_per_klas[overstap.klas].append(overstap)
+
+    vakken = {}
+    for leerjaar in leerjaren:
+        leerjaar_vak = vakken[leerjaar] = copy.copy(vak)
+        leerjaar_vak.toetsen = toetsen_per_klas[leerjaar]
+        leerjaar_vak.inhaalopdrachten = [
+            toets for toets in leerjaar_vak.toetsen if toets.type == Types.ED6
+        ]
+        leerjaar_vak.h5_toetsen = h5_toetsen
+        leerjaar_overstappen = overstappen_per_klas[leerjaar]
+        leerjaar_vak.overnemen_herwaarderen = [
+            overstap
+            for overstap in leerjaar_overstappen
+            if overstap.actie in (OverstapActies.overnemen, OverstapActies.herwaarderen)
+        ]
+        leerjaar_vak.inhalen = [
+            overstap
+            for overstap in leerjaar_overstappen
+            if overstap.actie == OverstapActies.inhalen
+            and overstap.oude_toets_id is not None
+        ]
+        leerjaar_vak.overstappen_vwo6 = [
+            overstap
+            for overstap in leerjaar_overstappen
+            if overstap.oude_toets_id is not None
+        ]
+    return vakken
+
+
+@query_budget("export_vak()", ocpta=EXPORT_VAK_QUERY_BUDGET)
+def export_vak(
+    year: int, vak_id: int, leerjaren: Collection[int] = VAK_EXPORT_LEERJAREN
+) -> Document:
+    """
+    Render the sections of a single vak for all the ``leerjaren`` in one document.
+
+    The queries don't depend on the number of leerjaren, see
+    :func:`fetch_vak_leerjaren`.
+    """
+    translation.activate("nl_NL")
+    vakken = fetch_vak_leerjaren(year, vak_id, leerjaren)
+    toetsweek_periodes = get_kalender(year).toetsweek_periodes
+    document = initialize_document()
+    for leerjaar, vak in vakken.items():
+        add_vak(document, vak, year, leerjaar, toetsweek_periodes)
+    translation.deactivate()
+    return document
@@ -0,0 +1,158 @@
+"""
+Cheap change detection for the OCPTA data feeding an export.
+
+The OCPTA tables have no modification timestamps, so a fingerprint is a hash over
+the raw column values of every row that ends up in the export of a (jaar, klas).
+Fetching tuples is a fraction of the cost of hydrating models and rendering the
+document, which makes it suitable to decide whether a stored export is stale.
+"""
+
+import hashlib
+from collections import defaultdict
+from itertools import groupby
+from operator import itemgetter
+from typing import Iterable
+
+from django.db.models import Model
+
+from .constants import Leerjaren
+from .models import Kalender, Overstap, Toets, Vak, Voetnoot
+
+TOETS_FIELDS = [
+    *(field.attname for field in Toets._meta.concrete_fields),
+    "soortwerk__naam",
+]
+
+OVERSTAP_FIELDS = [
+    *(field.attname for field in Overstap._meta.concrete_fields),
+    "oude_toets__klas",
+    "oude_toets__jaar",
+    "oude_toets__code",
+    "oude_toets__omschrijving",
+    "oude_toets__domein",
+]
+
+
+def _get_fields(model: type[Model]) -> list[str]:
+    return [field.attname for field in model._meta.concrete_fields]
+
+
+def _hash_rows(rows: Iterable[tuple]) -> str:
+    hasher = hashlib.sha1(usedforsecurity=False)
+    for row in rows:
+        hasher.update(repr(row).encode("utf-8"))
+    return hasher.hexdigest()
+
+
+def _get_vakken_digests() -> list[str]:
+    vakken = Vak.objects.order_by("id").values_list(*_get_fields(Vak))
+    voetnoten = Voetnoot.objects.order_by("id").values_list(*_get_fields(Voetnoot))
+    return [_hash_rows(vakken), _hash_rows(voetnoten)]
+
+
+def _get_shared_digest(year: int) -> str:
+    """
+    Hash the data that is shared between all klassen of a year.
+    """
+    kalender = Kalender.objects.filter(jaar=year).values_list(*_get_fields(Kalender))
+    return _hash_rows([*_get_vakken_digests(), _hash_rows(kalender)])
+
+
+def get_vakken_fingerprint() -> str:
+    """
+    Calculate the fingerprint of the vakken and voetnoten, which don't depend on
+    the year.
+    """
+    return _hash_rows(_get_vakken_digests())
+
+
+def _get_h5_toetsen(year: int):
+    return (
+        Toets.objects.filter(jaar=year, klas=Leerjaren.havo_5)
+        .order_by("id")
+        .values_list(*TOETS_FIELDS)
+    )
+
+
+def get_fingerprint(year: int, leerjaar: int) -> str:
+    """
+    Calculate the fingerprint of the data for a single export.
+    """
+    toetsen = (
+        Toets.objects.filter(jaar=year, klas=leerjaar)
+        .order_by("id")
+        .values_list(*TOETS_FIELDS)
+    )
+    overstappen = (
+        Overstap.objects.filter(jaar=year, klas=leerjaar)
+        .order_by("id")
+        .values_list(*OVERSTAP_FIELDS)
+    )
+    bits = [_get_shared_digest(year), _hash_rows(toetsen), _hash_rows(overstappen)]
+    if leerjaar == Leerjaren.overstappers_vwo_6:
+        bits.append(_hash_rows(_get_h5_toetsen(year)))
+    return _hash_rows(bits)
+
+
+def get_fingerprints(year: int) -> dict[int, str]:
+    """
+    Calculate the fingerprints of all klassen with data in the given year.
+
+    This issues a fixed number of queries regardless of the number of klassen, and
+    produces the same values as :func:`get_fingerprint` for every klas.
+    """
+    shared_digest = _get_shared_digest(year)
+    empty_digest = _hash_rows([])
+
+    toetsen = (
+        Toets.objects.filter(jaar=year)
+        .order_by("klas", "id")
+        .values_list(*TOETS_FIELDS)
+    )
+    overstappen = (
+        Overstap.objects.filter(jaar=year)
+        .order_by("klas", "id")
+        .values_list(*OVERSTAP_FIELDS)
+    )
+
+    klas_index = TOETS_FIELDS.index("klas")
+    toets_digests = defaultdict(
+        lambda: empty_digest,
+        {
+            klas: _hash_rows(rows)
+            for klas, rows in groupby(toetsen, key=itemgetter(klas_index))
+        },
+    )
+    klas_index = OVERSTAP_FIELDS.index("klas")
+    overstap_digests = defaultdict(
+        lambda: empty_digest,
+        {
+            klas: _hash_rows(rows)
+            for klas, rows in groupby(overstappen, key=itemgetter(klas_index))
+        },
+    )
+
+    fingerprints = {}
+    for leerjaar in Leerjaren:
+        if not leerjaar.value:
+            continue
+        sources = [leerjaar]
+        if leerjaar == Leerjaren.overstappers_vwo_6:
+            sources.append(Leerjaren.havo_5)
+        has_data = any(
+            source in toets_digests or source in overstap_digests for source in sources
+        )
+        if not has_data:
+            continue
+        bits = [shared_digest, toets_digests[leerjaar], overstap_digests[leerjaar]]
+        if leerjaar == Leerjaren.overstappers_vwo_6:
+            bits.append(toets_digests[Leerjaren.havo_5])
+        fingerprints[leerjaar.value] = _hash_rows(bits)
+    return fingerprints
+
+
+def get_year_fingerprint(year: int) -> str:
+    """
+    Calculate a fingerprint of the data of all klassen in the given year.
+    """
+    return _hash_rows(sorted(get_fingerprints(year).items()))
@@ -1,9 +1,10 @@
 from django import forms
 from django.utils import timezone
 
-from .constants import Leerjaren
+from .constants import ExportFormats, Leerjaren
+from .export import get_vak_choices
 from .models import Kalender, User as PtaUser
-from .permissions import get_allowed_leerjaren
+from .permissions import can_export, get_allowed_leerjaren, get_allowed_vakken
 
 
 class ExportForm(forms.Form):
@@ -18,12 +19,44 @@ class ExportForm(forms.Form):
         help_text="Selecteer de klas om te exporteren.",
         coerce=int,
     )
+    vakken = forms.TypedMultipleChoiceField(
+        label="Vakken",
+        coerce=int,
+        required=False,
+        help_text="Exporteer alleen deze vakken, laat leeg voor de hele klas.",
+    )
+    format = forms.ChoiceField(
+        label="Formaat",
+        choices=ExportFormats.choices,
+        required=False,
+        help_text="Word document, of alleen de tabellen als spreadsheet.",
+    )
+    profile = forms.BooleanField(
+        label="Profileren",
+        required=False,
+        help_text="Sla een profiel van de export op, te downloaden in de admin.",
+    )
 
     def __init__(self, *args, **kwargs):
-        pta_user: PtaUser | None = kwargs.pop("pta_user")
+        self.pta_user: PtaUser | None = kwargs.pop("pta_user")
+        user = kwargs.pop("user", None)
         super().__init__(*args, **kwargs)
 
-        leerjaren_choices = get_allowed_leerjaren(pta_user)
+        if not (user and user.is_staff):
+            del self.fields["profile"]
+
+        # users can export their own vakken of every klas
+        if allowed_vakken := get_allowed_vakken(self.pta_user):
+            leerjaren_choices = [choice for choice in Leerjaren if choice.value]
+            # cached, the page doesn't query OCPTA for a known user
+            self.fields["vakken"].choices = [
+                (vak_id, naam)
+                for vak_id, naam in get_vak_choices()
+                if vak_id in allowed_vakken
+            ]
+        else:
+            leerjaren_choices = get_allowed_leerjaren(self.pta_user)
+            del self.fields["vakken"]
         self.fields["klas"].choices = [
             (choice.value, choice.label) for choice in leerjaren_choices
         ]
@@ -33,3 +66,18 @@ class ExportForm(forms.Form):
         if not Kalender.objects.filter(jaar=jaar).exists():
             raise forms.ValidationError("Er bestaat geen kalender voor dit jaar")
         return jaar
+
+    def clean_format(self) -> str:
+        return self.cleaned_data["format"] or ExportFormats.docx
+
+    def clean(self):
+        cleaned_data = super().clean()
+        klas = cleaned_data.get("klas")
+        vakken = cleaned_data.get("vakken")
+        if klas and not can_export(self.pta_user, klas, vakken):
+            # the vakken are only shown to users with their own vakken
+            self.add_error(
+                "vakken" if "vakken" in self.fields else "klas",
+                "Je kan alleen je eigen vakken van deze klas exporteren",
+            )
+        return cleaned_data
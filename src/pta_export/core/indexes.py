@@ -0,0 +1,171 @@
+"""
+Indexes the export relies on in the unmanaged OCPTA schema.
+
+No migration ever touches the ``OC_*`` tables, so the indexes for the filters of
+:mod:`pta_export.core.export` have to be created by hand. This module describes
+them, and inspects the query plans of the export to find full table scans and
+filesorts.
+"""
+
+from contextlib import ExitStack
+from dataclasses import dataclass
+from typing import Iterator
+
+from django.db import connections, models
+
+from .constants import Leerjaren
+from .models import Kalender, Overstap, Toets, Voetnoot
+from .slow_queries import normalize_sql
+
+
+@dataclass(frozen=True)
+class ExpectedIndex:
+    model: type[models.Model]
+    fields: tuple[str, ...]
+
+    @property
+    def table(self) -> str:
+        return self.model._meta.db_table
+
+    @property
+    def columns(self) -> list[str]:
+        return [self.model._meta.get_field(name).column for name in self.fields]
+
+    @property
+    def name(self) -> str:
+        return f"pta_{self.table}_{'_'.join(self.fields)}".lower()[:64]
+
+    def get_ddl(self, connection) -> str:
+        quote = connection.ops.quote_name
+        columns = ", ".join(quote(column) for column in self.columns)
+        return f"CREATE INDEX {quote(self.name)} ON {quote(self.table)} ({columns})"
+
+    def exists(self, constraints: dict) -> bool:
+        """
+        Check if an existing index starts with the expected columns.
+        """
+        columns = [column.lower() for column in self.columns]
+        return any(
+            [column.lower() for column in constraint["columns"][: len(columns)]]
+            == columns
+            for constraint in constraints.values()
+            if constraint["index"] or constraint["primary_key"] or constraint["unique"]
+        )
+
+
+EXPECTED_INDEXES = [
+    ExpectedIndex(Toets, ("jaar", "klas", "vak")),
+    ExpectedIndex(Overstap, ("jaar", "klas", "vak")),
+    ExpectedIndex(Voetnoot, ("vak",)),
+    ExpectedIndex(Kalender, ("jaar",)),
+]
+
+
+def get_missing_indexes(using: str = "ocpta") -> list[ExpectedIndex]:
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        tables = set(connection.introspection.table_names(cursor))
+        missing = []
+        for index in EXPECTED_INDEXES:
+            if index.table not in tables:
+                continue
+            constraints = connection.introspection.get_constraints(cursor, index.table)
+            if not index.exists(constraints):
+                missing.append(index)
+    return missing
+
+
+@dataclass
+class QueryShape:
+    sql: str
+    params: tuple
+    normalized: str
+    klassen: set[int]
+
+
+class QueryCollector:
+    def __init__(self):
+        self.queries: list[tuple[str, tuple]] = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if not many and sql.lstrip().upper().startswith("SELECT"):
+            self.queries.append((sql, tuple(params or ())))
+        return execute(sql, params, many, context)
+
+
+def collect_query_shapes(
+    year: int, klassen: list[int], using: str = "ocpta"
+) -> list[QueryShape]:
+    """
+    Run the export for each klas and collect the distinct SELECT queries, including
+    the streamed toetsen queries of ``PTA_EXPORT_STREAM_DATABASE``.
+    """
+    # imported here, the system checks import this module on every start
+    from .export import export, get_stream_alias
+
+    aliases = {using, get_stream_alias()}
+    shapes: dict[str, QueryShape] = {}
+    for klas in klassen:
+        collector = QueryCollector()
+        with ExitStack() as stack:
+            for alias in aliases:
+                stack.enter_context(connections[alias].execute_wrapper(collector))
+            export(year, klas)
+        for sql, params in collector.queries:
+            normalized = normalize_sql(sql)
+            shape = shapes.setdefault(
+                normalized, QueryShape(sql, params, normalized, set())
+            )
+            shape.klassen.add(klas)
+    return list(shapes.values())
+
+
+@dataclass
+class PlanStep:
+    table: str
+    detail: str
+    full_scan: bool
+    filesort: bool
+
+
+def explain(sql: str, params: tuple, using: str = "ocpta") -> list[PlanStep]:
+    connection = connections[using]
+    match connection.vendor:
+        case "mysql":
+            return list(_explain_mysql(connection, sql, params))
+        case "sqlite":
+            return list(_explain_sqlite(connection, sql, params))
+        case vendor:
+            raise NotImplementedError(f"EXPLAIN is not supported for {vendor}")
+
+
+def _explain_mysql(connection, sql: str, params: tuple) -> Iterator[PlanStep]:
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN {sql}", params)
+        names = [column[0].lower() for column in cursor.description]
+        for values in cursor.fetchall():
+            row = dict(zip(names, values))
+            extra = row.get("extra") or ""
+            yield PlanStep(
+                table=row.get("table") or "",
+                detail=f"type={row.get('type')} key={row.get('key')} {extra}".strip(),
+                full_scan=row.get("type") == "ALL",
+                filesort="filesort" in extra,
+            )
+
+
+def _explain_sqlite(connection, sql: str, params: tuple) -> Iterator[PlanStep]:
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        for *_, detail in cursor.fetchall():
+            words = detail.split()
+            yield PlanStep(
+                table=words[1] if words[0] in ("SCAN", "SEARCH") else "",
+                detail=detail,
+                full_scan=words[0] == "SCAN" and "USING" not in words,
+                filesort="TEMP B-TREE" in detail,
+            )
+
+
+def get_klassen() -> list[int]:
+    return [leerjaar.value for leerjaar in Leerjaren if leerjaar.value]
@@ -0,0 +1,113 @@
+from django.core.management import BaseCommand, CommandError
+from django.db import connections
+
+from ...constants import LEERJAREN_SHORT, Leerjaren
+from ...indexes import collect_query_shapes, explain, get_klassen, get_missing_indexes
+from ...models import Kalender
+
+
+class Command(BaseCommand):
+    help = (
+        "Run EXPLAIN for the queries of the export, report full table scans and "
+        "filesorts and suggest the indexes missing from the OCPTA tables."
+    )
+
+    @staticmethod
+    def add_arguments(parser):
+        parser.add_argument(
+            "--jaar", type=int, help="Year to export, defaults to the latest kalender."
+        )
+        parser.add_argument(
+            "--klas",
+            type=int,
+            action="append",
+            dest="klassen",
+            help="ID of the leerjaar to export, defaults to all of them.",
+        )
+        parser.add_argument(
+            "--database",
+            default="ocpta",
+            help="Database alias of the OCPTA data (default: %(default)s).",
+        )
+        parser.add_argument(
+            "--apply",
+            action="store_true",
+            help="Create the missing indexes, after confirmation.",
+        )
+        parser.add_argument(
+            "--no-input",
+            action="store_false",
+            dest="interactive",
+            help="Do not ask for confirmation before creating the indexes.",
+        )
+
+    def handle(self, **options):
+        using = options["database"]
+        connection = connections[using]
+        if connection.vendor not in ("mysql", "sqlite"):
+            raise CommandError(f"EXPLAIN is not supported for {connection.vendor}.")
+
+        klassen = options["klassen"] or get_klassen()
+        if invalid := set(klassen) - set(Leerjaren.values):
+            raise CommandError(f"Invalid Leerjaar ID(s) given: {sorted(invalid)}")
+
+        jaar = options["jaar"] or (
+            Kalender.objects.using(using)
+            .order_by("-jaar")
+            .values_list("jaar", flat=True)
+            .first()
+        )
+        if jaar is None:
+            raise CommandError("There is no kalender to export.")
+
+        self.report_query_plans(jaar, klassen, using)
+
+        missing = get_missing_indexes(using)
+        if not missing:
+            self.stdout.write(self.style.SUCCESS("All expected indexes exist."))
+            return
+
+        self.stdout.write("\nMissing indexes:")
+        statements = [index.get_ddl(connection) for index in missing]
+        for statement in statements:
+            self.stdout.write(f"  {statement};")
+
+        if not options["apply"]:
+            return
+
+        if options["interactive"]:
+            answer = input(
+                f"\nCreate {len(statements)} index(es) on the '{using}' database? "
+                "Type 'yes' to continue: "
+            )
+            if answer != "yes":
+                raise CommandError("Aborted, no indexes were created.")
+
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+                self.stdout.write(self.style.SUCCESS(f"Created: {statement}"))
+
+    def report_query_plans(self, jaar: int, klassen: list[int], using: str) -> None:
+        shapes = collect_query_shapes(jaar, klassen, using=using)
+        self.stdout.write(f"{len(shapes)} distinct queries for the export of {jaar}")
+
+        for shape in shapes:
+            steps = explain(shape.sql, shape.params, using=using)
+            problems = [step for step in steps if step.full_scan or step.filesort]
+            style = self.style.WARNING if problems else self.style.SUCCESS
+            used_by = ", ".join(sorted(LEERJAREN_SHORT[klas] for klas in shape.klassen))
+            self.stdout.write(
+                "\n" + style("PROBLEM" if problems else "OK") + f" [{used_by}]"
+            )
+            self.stdout.write(f"  {shape.normalized[:300]}")
+            for step in problems:
+                kinds = [
+                    kind
+                    for kind, present in (
+                        ("full scan", step.full_scan),
+                        ("filesort", step.filesort),
+                    )
+                    if present
+                ]
+                self.stdout.write(f"  - {' + '.join(kinds)}: {step.detail}")
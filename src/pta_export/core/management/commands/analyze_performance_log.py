@@ -0,0 +1,106 @@
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from ...performance_log import PERCENTILES, aggregate, iter_records
+
+PHASE_ORDER = ("fingerprint", "lookup", "fetch", "render", "save", "store", "total")
+
+
+def sort_key(item) -> tuple:
+    (klas, phase, renderer), _ = item
+    order = PHASE_ORDER.index(phase) if phase in PHASE_ORDER else len(PHASE_ORDER)
+    return klas, renderer, order
+
+
+class Command(BaseCommand):
+    help = (
+        "Report latency, query count and output size percentiles per klas, phase "
+        "and renderer from the export records in performance.log, including the "
+        "rotated and gzip-compressed files."
+    )
+
+    @staticmethod
+    def add_arguments(parser):
+        parser.add_argument(
+            "paths",
+            nargs="*",
+            help="Log files to read, defaults to performance.log* in LOGGING_DIR.",
+        )
+        parser.add_argument(
+            "--since",
+            type=datetime.fromisoformat,
+            help="Only include records at or after this time (YYYY-MM-DD[ HH:MM]).",
+        )
+        parser.add_argument(
+            "--until",
+            type=datetime.fromisoformat,
+            help="Only include records before this time (YYYY-MM-DD[ HH:MM]).",
+        )
+        parser.add_argument("--klas", action="append", help="Only report this klas.")
+        parser.add_argument(
+            "--json", action="store_true", help="Output the report as JSON."
+        )
+
+    def handle(self, **options):
+        if options["paths"]:
+            paths = [Path(path) for path in options["paths"]]
+        else:
+            paths = sorted(Path(settings.LOGGING_DIR).glob("performance.log*"))
+        if missing := [str(path) for path in paths if not path.is_file()]:
+            raise CommandError(f"Log file(s) not found: {', '.join(missing)}")
+        if not paths:
+            raise CommandError(f"No performance.log files in {settings.LOGGING_DIR}")
+
+        records = iter_records(paths, since=options["since"], until=options["until"])
+        if options["klas"]:
+            klassen = set(options["klas"])
+            records = (record for record in records if record.get("klas") in klassen)
+
+        groups = aggregate(records)
+        rows = [
+            {
+                "klas": klas,
+                "phase": phase,
+                "renderer": renderer,
+                "count": group.duration.count,
+                "duration": group.duration.summary(),
+                "queries": group.queries.summary(),
+                **({"size": group.size.summary()} if group.size.count else {}),
+            }
+            for (klas, phase, renderer), group in sorted(groups.items(), key=sort_key)
+        ]
+
+        if options["json"]:
+            self.stdout.write(
+                json.dumps({"files": [os.fspath(p) for p in paths], "groups": rows})
+            )
+        else:
+            self.write_report(rows)
+
+    def write_report(self, rows: list[dict]) -> None:
+        if not rows:
+            self.stdout.write("No export records found.")
+            return
+
+        percentiles = [f"p{p}" for p in PERCENTILES]
+        header = (
+            f"{'klas':<8}{'phase':<12}{'renderer':<12}{'count':>7}"
+            + "".join(f"{p + ' ms':>11}" for p in percentiles)
+            + f"{'p95 queries':>13}{'p95 kB':>10}"
+        )
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for row in rows:
+            size = row["size"]["p95"] / 1024 if "size" in row else None
+            self.stdout.write(
+                f"{row['klas']:<8}{row['phase']:<12}{row['renderer'][:11]:<12}"
+                f"{row['count']:>7}"
+                + "".join(f"{row['duration'][p] * 1000:>11.1f}" for p in percentiles)
+                + f"{row['queries']['p95']:>13.0f}"
+                + (f"{size:>10.1f}" if size is not None else f"{'':>10}")
+            )
@@ -0,0 +1,114 @@
+import json
+
+from django.core.management import BaseCommand, CommandError
+
+from ...benchmarks.document import CASES, run_case
+from ...benchmarks.results import get_metadata, write_results
+
+METRICS = ("time_per_cell", "bytes_per_cell")
+
+
+class Command(BaseCommand):
+    help = (
+        "Micro-benchmark the document rendering primitives on synthetic vakken and "
+        "optionally compare the results against a stored baseline."
+    )
+
+    @staticmethod
+    def add_arguments(parser):
+        parser.add_argument(
+            "--rows",
+            type=int,
+            action="append",
+            help="Number of toetsen in the synthetic vak (default: 10, 100 and 1000).",
+        )
+        parser.add_argument(
+            "--case",
+            action="append",
+            dest="cases",
+            choices=[case.name for case in CASES],
+            help="Only run the given case(s).",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Number of timed runs per case, the fastest counts "
+            "(default: %(default)s).",
+        )
+        parser.add_argument(
+            "--max-time",
+            type=float,
+            default=30,
+            help="Stop repeating a case once its timed runs took this many seconds "
+            "(default: %(default)s).",
+        )
+        parser.add_argument(
+            "--output",
+            help="Write the results as JSON to this file instead of stdout.",
+        )
+        parser.add_argument(
+            "--baseline",
+            help="JSON file with earlier results to compare against.",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.2,
+            help="Relative increase per cell that counts as a regression "
+            "(default: %(default)s).",
+        )
+
+    def handle(self, **options):
+        cases = [
+            case
+            for case in CASES
+            if not options["cases"] or case.name in options["cases"]
+        ]
+        results = {
+            "metadata": get_metadata(using="default", repeat=options["repeat"]),
+            "results": [
+                {
+                    "case": case.name,
+                    "rows": rows,
+                    **run_case(case, rows, options["repeat"], options["max_time"]),
+                }
+                for case in cases
+                for rows in options["rows"] or [10, 100, 1000]
+            ],
+        }
+
+        if options["output"]:
+            write_results(options["output"], results)
+        else:
+            self.stdout.write(json.dumps(results, indent=2))
+
+        if options["baseline"]:
+            self.compare(results, options["baseline"], options["threshold"])
+
+    def compare(self, results: dict, baseline_path: str, threshold: float) -> None:
+        with open(baseline_path) as infile:
+            baseline = {
+                (result["case"], result["rows"]): result
+                for result in json.load(infile)["results"]
+            }
+
+        regressions = []
+        for result in results["results"]:
+            if (reference := baseline.get((result["case"], result["rows"]))) is None:
+                continue
+            for metric in METRICS:
+                if not reference[metric]:
+                    continue
+                change = result[metric] / reference[metric] - 1
+                if change > threshold:
+                    regressions.append(
+                        f"{result['case']} ({result['rows']} rows): {metric} "
+                        f"increased by {change:.0%}"
+                    )
+
+        if regressions:
+            raise CommandError(
+                "Regressions against the baseline:\n" + "\n".join(regressions)
+            )
+        self.stderr.write(self.style.SUCCESS("No regressions against the baseline."))
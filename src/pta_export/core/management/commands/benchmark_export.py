@@ -0,0 +1,169 @@
+import json
+from collections import defaultdict
+from dataclasses import asdict
+from io import BytesIO
+
+from django.core.management import BaseCommand, CommandError
+from django.db import connections
+from django.utils import translation
+
+from ...benchmarks.dataset import SCALES, Scale, generate_dataset, ocpta_tables
+from ...benchmarks.results import Measurement, get_metadata, measure, write_results
+from ...constants import LEERJAREN_SHORT, Compression, Leerjaren
+from ...export import create_document, fetch_vakken
+from ...packaging import save_document
+from ...views import get_export_response
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the export of generated OCPTA data. Run this with the "
+        "pta_export.conf.benchmark settings, it creates the OCPTA tables in a "
+        "stand-in database."
+    )
+
+    @staticmethod
+    def add_arguments(parser):
+        parser.add_argument(
+            "--scale",
+            choices=SCALES,
+            default="medium",
+            help="Size of the generated dataset (default: %(default)s).",
+        )
+        parser.add_argument("--vakken", type=int, help="Override the number of vakken.")
+        parser.add_argument(
+            "--toetsen-per-vak",
+            type=int,
+            help="Override the number of toetsen per vak and leerjaar.",
+        )
+        parser.add_argument(
+            "--overstappen-per-vak",
+            type=int,
+            help="Override the number of overstappen per vak and leerjaar.",
+        )
+        parser.add_argument(
+            "--voetnoten-per-vak",
+            type=int,
+            help="Override the number of voetnoten per vak.",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Seed for the data generation (default: %(default)s).",
+        )
+        parser.add_argument(
+            "--year", type=int, default=2024, help="Year to generate and export."
+        )
+        parser.add_argument(
+            "--klas",
+            type=int,
+            action="append",
+            dest="klassen",
+            help="ID of the leerjaar to benchmark, defaults to all of them.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Number of times every export is measured (default: %(default)s).",
+        )
+        parser.add_argument(
+            "--compression",
+            action="append",
+            choices=Compression.values,
+            help="Compression profile to measure the save phase with, defaults to "
+            "all of them.",
+        )
+        parser.add_argument(
+            "--output",
+            help="Write the results as JSON to this file instead of stdout.",
+        )
+
+    def handle(self, **options):
+        if connections["ocpta"].vendor == "mysql":
+            raise CommandError(
+                "The ocpta database is MySQL, run this with the "
+                "pta_export.conf.benchmark settings."
+            )
+
+        scale = Scale(
+            **{
+                name: options[name] if options[name] is not None else value
+                for name, value in asdict(SCALES[options["scale"]]).items()
+            }
+        )
+        if scale.vakken < 1 or scale.toetsen_per_vak < 1:
+            raise CommandError("At least one vak with one toets is required.")
+
+        klassen = options["klassen"] or [lj.value for lj in Leerjaren if lj.value]
+        if invalid := set(klassen) - set(Leerjaren.values):
+            raise CommandError(f"Invalid Leerjaar ID(s) given: {sorted(invalid)}")
+
+        year = options["year"]
+        compressions = options["compression"] or Compression.values
+        with ocpta_tables():
+            rows = generate_dataset(year, scale, seed=options["seed"])
+            results = {
+                "metadata": get_metadata(
+                    scale=asdict(scale), seed=options["seed"], rows=rows
+                ),
+                "results": [
+                    {"klas": LEERJAREN_SHORT[klas], **result}
+                    for klas in klassen
+                    for result in self.benchmark(
+                        year,
+                        klas,
+                        compressions,
+                        options["repeat"],
+                        options["verbosity"],
+                    )
+                ],
+            }
+
+        if options["output"]:
+            write_results(options["output"], results)
+        else:
+            self.stdout.write(json.dumps(results, indent=2))
+
+    def benchmark(
+        self, year: int, klas: int, compressions: list[str], repeat: int, verbosity: int
+    ) -> list[dict]:
+        measurements = defaultdict(Measurement)
+        for _ in range(repeat):
+            with measure(measurements["fetch"]):
+                vakken = fetch_vakken(year, klas)
+
+            with translation.override("nl_NL"):
+                with measure(measurements["render"]):
+                    document = create_document(year, klas, vakken)
+
+            for compression in compressions:
+                outfile = BytesIO()
+                with measure(measurements["save", compression]) as measurement:
+                    save_document(document, outfile, compression)
+                measurement.size = outfile.tell()
+
+            with measure(measurements["response"]) as measurement:
+                response = get_export_response(year, klas)
+                measurement.size = len(
+                    b"".join(response.streaming_content)
+                    if response.streaming
+                    else response.content
+                )
+
+        if verbosity >= 2:
+            self.stderr.write(f"Benchmarked {LEERJAREN_SHORT[klas]}")
+        return [
+            {"phase": "fetch", **measurements["fetch"].as_dict()},
+            {"phase": "render", **measurements["render"].as_dict()},
+            *(
+                {
+                    "phase": "save",
+                    "compression": compression,
+                    **measurements["save", compression].as_dict(),
+                }
+                for compression in compressions
+            ),
+            {"phase": "response", **measurements["response"].as_dict()},
+        ]
@@ -1,7 +1,14 @@
+from contextlib import nullcontext
+
 from django.core.management import BaseCommand, CommandError
 
-from ...constants import Leerjaren
+from pta_export.exports.models import ProfileSources
+from pta_export.exports.profiling import profile_export
+
+from ...constants import Compression, ExportFormats, Leerjaren
 from ...export import export
+from ...packaging import save_document
+from ...spreadsheet import export_spreadsheet
 
 
 class Command(BaseCommand):
@@ -11,10 +18,59 @@ class Command(BaseCommand):
     def add_arguments(parser):
         parser.add_argument("year", type=int, help="Year to export")
         parser.add_argument("klas", type=int, help="ID of the leerjaar")
+        parser.add_argument(
+            "--profile",
+            action="store_true",
+            help="Profile the export and store the result, see the admin.",
+        )
+        parser.add_argument(
+            "--stream",
+            action="store_true",
+            help="Stream the toetsen one vak at a time, see PTA_EXPORT_STREAM_TOETSEN.",
+        )
+        parser.add_argument("--output", help="Save the export to this file.")
+        parser.add_argument(
+            "--compression",
+            choices=Compression.values,
+            help="Compression profile of the saved file (default: "
+            "PTA_EXPORT_COMPRESSION).",
+        )
+        parser.add_argument(
+            "--format",
+            choices=ExportFormats.values,
+            default=ExportFormats.docx,
+            help="Save the Word document, or only the table data as spreadsheet.",
+        )
 
     def handle(self, **options):
         klas = options["klas"]
         if klas not in Leerjaren:
             raise CommandError("Invalid Leerjaar ID given")
 
-        export(options["year"], klas)
+        year = options["year"]
+        if options["format"] != ExportFormats.docx:
+            if not options["output"]:
+                raise CommandError("Spreadsheet exports require --output")
+            with open(options["output"], "wb") as outfile:
+                export_spreadsheet(year, klas, outfile, options["format"])
+            return
+
+        if options["profile"]:
+            context = profile_export(year, klas, ProfileSources.command)
+        else:
+            context = nullcontext()
+
+        with context as profiler:
+            document = export(year, klas, stream=options["stream"] or None)
+
+        if options["output"]:
+            with open(options["output"], "wb") as outfile:
+                save_document(document, outfile, options["compression"] or "")
+
+        if profiler:
+            export_profile = profiler.export_profile
+            self.stdout.write(
+                f"Stored profile {export_profile.filename} "
+                f"({export_profile.duration:.2f}s, "
+                f"{export_profile.num_queries} queries)"
+            )
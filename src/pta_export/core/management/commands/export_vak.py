@@ -0,0 +1,48 @@
+from django.core.management import BaseCommand, CommandError
+
+from ...constants import Compression, ExportFormats
+from ...export import export_vak
+from ...models import Vak
+from ...packaging import save_document
+from ...spreadsheet import export_vak_spreadsheet
+
+
+class Command(BaseCommand):
+    help = "Export the PTAs of a vak for all klassen of a given year"
+
+    @staticmethod
+    def add_arguments(parser):
+        parser.add_argument("year", type=int, help="Year to export")
+        parser.add_argument("vak", type=int, help="ID of the vak")
+        parser.add_argument("--output", help="Save the export to this file.")
+        parser.add_argument(
+            "--compression",
+            choices=Compression.values,
+            help="Compression profile of the saved file (default: "
+            "PTA_EXPORT_COMPRESSION).",
+        )
+        parser.add_argument(
+            "--format",
+            choices=ExportFormats.values,
+            default=ExportFormats.docx,
+            help="Save the Word document, or only the table data as spreadsheet.",
+        )
+
+    def handle(self, **options):
+        if not Vak.objects.filter(id=options["vak"]).exists():
+            raise CommandError("Invalid Vak ID given")
+
+        if options["format"] != ExportFormats.docx:
+            if not options["output"]:
+                raise CommandError("Spreadsheet exports require --output")
+            with open(options["output"], "wb") as outfile:
+                export_vak_spreadsheet(
+                    options["year"], options["vak"], outfile, options["format"]
+                )
+            return
+
+        document = export_vak(options["year"], options["vak"])
+
+        if options["output"]:
+            with open(options["output"], "wb") as outfile:
+                save_document(document, outfile, options["compression"] or "")
@@ -0,0 +1,213 @@
+import json
+import statistics
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+from django.core.management import BaseCommand, CommandError
+
+from ...benchmarks.results import get_metadata, write_results
+from ...constants import Leerjaren
+
+
+class LoadTest:
+    """
+    Keep a number of clients busy with exports, and measure the latency of cheap
+    requests made at the same time.
+    """
+
+    def __init__(self, base_url: str, token: str, data: dict, light_path: str):
+        self.base_url = base_url.rstrip("/")
+        self.token = token
+        self.data = urlencode(data, doseq=True).encode()
+        self.light_path = light_path
+        self.durations: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def request(self, kind: str) -> None:
+        if kind == "export":
+            request = Request(
+                f"{self.base_url}/api/export",
+                data=self.data,
+                headers={"Authorization": f"Token {self.token}"},
+            )
+        else:
+            request = Request(f"{self.base_url}{self.light_path}")
+
+        start = time.perf_counter()
+        try:
+            with urlopen(request, timeout=120) as response:
+                response.read()
+            failed = False
+        except (HTTPError, URLError, TimeoutError):
+            failed = True
+        duration = time.perf_counter() - start
+
+        with self._lock:
+            if failed:
+                self.errors[kind] += 1
+            else:
+                self.durations[kind].append(duration)
+
+    def client(self, kind: str, deadline: float) -> None:
+        while time.monotonic() < deadline:
+            self.request(kind)
+
+    def run(self, exports: int, light: int, duration: float) -> dict:
+        deadline = time.monotonic() + duration
+        kinds = ["export"] * exports + ["light"] * light
+        with ThreadPoolExecutor(max_workers=len(kinds)) as executor:
+            for kind in kinds:
+                executor.submit(self.client, kind, deadline)
+        return {
+            kind: summarize(self.durations[kind], self.errors[kind], duration)
+            for kind in ("export", "light")
+        }
+
+
+def summarize(durations: list[float], errors: int, duration: float) -> dict:
+    if not durations:
+        return {"requests": 0, "errors": errors}
+    durations = sorted(durations)
+    return {
+        "requests": len(durations),
+        "errors": errors,
+        "throughput": len(durations) / duration,
+        "median": statistics.median(durations),
+        "p95": durations[min(len(durations) - 1, int(len(durations) * 0.95))],
+        "max": durations[-1],
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test running servers with concurrent exports, and measure the latency "
+        "of cheap requests while the exports are in flight. Start the WSGI (uwsgi) "
+        "and ASGI (pta_export.asgi) servers with the same number of worker "
+        "processes, and pass both as --target to compare them. With "
+        "PTA_EXPORT_ARCHIVE enabled (the default), the servers render the export "
+        "once and serve the archived file after that: start them with the archive "
+        "disabled, or pass --vak, to load test the renders."
+    )
+
+    @staticmethod
+    def add_arguments(parser):
+        parser.add_argument(
+            "--target",
+            action="append",
+            dest="targets",
+            required=True,
+            metavar="NAME=URL",
+            help="Server to test, e.g. wsgi=http://localhost:8000. Repeatable.",
+        )
+        parser.add_argument(
+            "--token", required=True, help="API token used for the exports."
+        )
+        parser.add_argument("--year", type=int, default=2024, help="Year to export.")
+        parser.add_argument(
+            "--klas",
+            type=int,
+            default=Leerjaren.havo_4.value,
+            help="ID of the leerjaar to export (default: %(default)s).",
+        )
+        parser.add_argument(
+            "--vak",
+            type=int,
+            action="append",
+            dest="vakken",
+            help=(
+                "ID of a vak to export instead of the whole klas, can be specified "
+                "multiple times. Exports of a selection of vakken are not archived, "
+                "every request renders."
+            ),
+        )
+        parser.add_argument(
+            "--exports",
+            type=int,
+            default=4,
+            help="Number of concurrent export clients (default: %(default)s).",
+        )
+        parser.add_argument(
+            "--light",
+            type=int,
+            default=4,
+            help="Number of concurrent clients for the cheap requests "
+            "(default: %(default)s).",
+        )
+        parser.add_argument(
+            "--light-path",
+            default="/admin/login/",
+            help="Path of the cheap request (default: %(default)s).",
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=30,
+            help="Seconds to run the load for every target (default: %(default)s).",
+        )
+        parser.add_argument(
+            "--output",
+            help="Write the results as JSON to this file instead of stdout.",
+        )
+
+    def handle(self, **options):
+        targets = {}
+        for target in options["targets"]:
+            name, sep, url = target.partition("=")
+            if not sep or not url:
+                raise CommandError(f"Invalid target {target!r}, expected NAME=URL")
+            targets[name] = url
+
+        if options["klas"] not in Leerjaren or not options["klas"]:
+            raise CommandError("Invalid Leerjaar ID given")
+
+        data = {"jaar": options["year"], "klas": options["klas"]}
+        if options["vakken"]:
+            data["vakken"] = options["vakken"]
+        results = {
+            "metadata": get_metadata(
+                exports=options["exports"],
+                light=options["light"],
+                light_path=options["light_path"],
+                duration=options["duration"],
+                **data,
+            ),
+            "results": {},
+        }
+        for name, url in targets.items():
+            if options["verbosity"] >= 2:
+                self.stderr.write(f"Load testing {name} ({url})")
+            load_test = LoadTest(url, options["token"], data, options["light_path"])
+            results["results"][name] = load_test.run(
+                options["exports"], options["light"], options["duration"]
+            )
+
+        if options["output"]:
+            write_results(options["output"], results)
+        else:
+            self.stdout.write(json.dumps(results, indent=2))
+        self.write_summary(results["results"])
+
+    def write_summary(self, results: dict) -> None:
+        self.stderr.write(
+            f"{'target':<12} {'kind':<8} {'req/s':>8} {'median':>8} {'p95':>8} "
+            f"{'errors':>7}"
+        )
+        for name, kinds in results.items():
+            for kind, summary in kinds.items():
+                if not summary["requests"]:
+                    self.stderr.write(
+                        f"{name:<12} {kind:<8} {'-':>8} {'-':>8} {'-':>8} "
+                        f"{summary['errors']:>7}"
+                    )
+                    continue
+                self.stderr.write(
+                    f"{name:<12} {kind:<8} {summary['throughput']:>8.1f} "
+                    f"{summary['median']:>8.3f} {summary['p95']:>8.3f} "
+                    f"{summary['errors']:>7}"
+                )
@@ -0,0 +1,146 @@
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+# runs in a fresh interpreter, so that nothing is imported yet
+SCRIPT = """
+import json, time
+start = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter()
+from pta_export.utils.startup import preload
+preload()
+urls = time.perf_counter()
+timings = {"setup": setup - start, "preload": urls - setup}
+if %(checks)r:
+    from django.core import checks
+    checks.run_checks()
+    timings["checks"] = time.perf_counter() - urls
+print(json.dumps(timings))
+"""
+
+
+@dataclass
+class ImportTime:
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+def parse_importtime(output: str) -> list[ImportTime]:
+    """
+    Parse the ``-X importtime`` lines of the interpreter.
+    """
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, module = line[len("import time:") :].split("|")
+        if not self_us.strip().isdigit():
+            continue  # the header
+        imports.append(ImportTime(module.strip(), int(self_us), int(cumulative_us)))
+    return imports
+
+
+def group_by_package(imports: list[ImportTime]) -> dict[str, int]:
+    packages = defaultdict(int)
+    for imported in imports:
+        packages[imported.module.split(".")[0]] += imported.self_us
+    return dict(sorted(packages.items(), key=lambda item: item[1], reverse=True))
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the cold start of a process: Django setup and the imports of the "
+        "views, in a fresh interpreter with the current settings."
+    )
+
+    @staticmethod
+    def add_arguments(parser):
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=20,
+            help="Number of modules and packages to report (default: %(default)s).",
+        )
+        parser.add_argument(
+            "--checks", action="store_true", help="Include the system checks."
+        )
+        parser.add_argument(
+            "--budget",
+            type=float,
+            help="Fail if the startup takes longer than this many seconds.",
+        )
+        parser.add_argument(
+            "--json", action="store_true", help="Output the report as JSON."
+        )
+
+    def handle(self, **options):
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": settings.SETTINGS_MODULE}
+        process = subprocess.run(
+            [
+                sys.executable,
+                "-X",
+                "importtime",
+                "-c",
+                SCRIPT % {"checks": options["checks"]},
+            ],
+            cwd=os.path.dirname(settings.DJANGO_PROJECT_DIR),
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        if process.returncode:
+            raise CommandError(f"Starting Django failed:\n{process.stderr[-2000:]}")
+
+        timings = json.loads(process.stdout.strip().splitlines()[-1])
+        total = sum(timings.values())
+        imports = parse_importtime(process.stderr)
+        limit = options["limit"]
+        slowest = sorted(imports, key=lambda i: i.cumulative_us, reverse=True)
+        packages = list(group_by_package(imports).items())
+
+        if options["json"]:
+            report = {
+                "timings": timings,
+                "total": total,
+                "modules": [asdict(imported) for imported in slowest[:limit]],
+                "packages": dict(packages[:limit]),
+            }
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self.write_report(timings, total, slowest[:limit], packages[:limit])
+
+        if options["budget"] is not None and total > options["budget"]:
+            raise CommandError(
+                f"Startup took {total:.3f}s, over the budget of {options['budget']}s"
+            )
+
+    def write_report(
+        self,
+        timings: dict[str, float],
+        total: float,
+        modules: list[ImportTime],
+        packages: list[tuple[str, int]],
+    ) -> None:
+        for name, seconds in timings.items():
+            self.stdout.write(f"{name:<10} {seconds * 1000:>8.1f} ms")
+        self.stdout.write(f"{'total':<10} {total * 1000:>8.1f} ms")
+
+        self.stdout.write("\nSlowest imports (cumulative)")
+        for imported in modules:
+            self.stdout.write(
+                f"{imported.cumulative_us / 1000:>8.1f} ms  "
+                f"{imported.self_us / 1000:>8.1f} ms self  {imported.module}"
+            )
+
+        self.stdout.write("\nImport time per package (self)")
+        for package, self_us in packages:
+            self.stdout.write(f"{self_us / 1000:>8.1f} ms  {package}")
@@ -0,0 +1,160 @@
+"""
+Prometheus metrics of the exports.
+
+The web server runs multiple processes, so the counters are kept in a cache that
+is shared between them (redis in production) rather than in process memory. Every
+observation increments one bucket per phase, the cumulative buckets of the
+Prometheus histogram are computed when the metrics are scraped.
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+
+from pta_export.utils.cache import pop_stats
+
+from .constants import LEERJAREN_SHORT
+
+PHASES = ("fingerprint", "lookup", "fetch", "render", "save", "store", "total")
+
+# upper bounds of the duration buckets, in seconds
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+KEY_PREFIX = "metrics:export"
+
+# tiers of pta_export.utils.cache, and the artifact cache of the archived exports
+CACHE_TIERS = ("l1", "shared", "exports")
+CACHE_KEY_PREFIX = "metrics:cache"
+
+
+def get_cache():
+    return caches[settings.PTA_EXPORT_METRICS_CACHE]
+
+
+def _incr(cache, key: str, delta: int) -> None:
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        if not cache.add(key, delta, timeout=None):
+            cache.incr(key, delta)
+
+
+def _bucket(seconds: float) -> str:
+    for bound in BUCKETS:
+        if seconds <= bound:
+            return str(bound)
+    return "+Inf"
+
+
+def flush_cache_stats() -> None:
+    """
+    Add the cache hits and misses counted by this process to the shared metrics.
+    """
+    if not settings.PTA_EXPORT_METRICS:
+        return
+
+    cache = get_cache()
+    for (tier, result), value in pop_stats().items():
+        _incr(cache, f"{CACHE_KEY_PREFIX}:{tier}:{result}", value)
+
+
+def observe(timing) -> None:
+    """
+    Add an :class:`pta_export.core.timing.ExportTiming` to the metrics.
+    """
+    if not settings.PTA_EXPORT_METRICS:
+        return
+
+    cache = get_cache()
+    klas = LEERJAREN_SHORT[timing.klas]
+    durations = {name: phase.duration for name, phase in timing.phases.items()}
+    durations["total"] = timing.duration
+    for name, seconds in durations.items():
+        prefix = f"{KEY_PREFIX}:{klas}:{name}"
+        _incr(cache, f"{prefix}:bucket:{_bucket(seconds)}", 1)
+        _incr(cache, f"{prefix}:sum", round(seconds * 1_000_000))
+        _incr(cache, f"{prefix}:count", 1)
+
+    for alias, stats in timing.get_queries().items():
+        _incr(cache, f"{KEY_PREFIX}:{klas}:queries:{alias}", stats.count)
+    _incr(cache, f"{KEY_PREFIX}:{klas}:bytes", timing.size)
+    flush_cache_stats()
+
+
+def render_metrics() -> str:
+    """
+    Render the metrics in the Prometheus text exposition format.
+    """
+    flush_cache_stats()
+    cache = get_cache()
+    klassen = list(LEERJAREN_SHORT.values())
+    aliases = list(settings.DATABASES)
+    bounds = [str(bound) for bound in BUCKETS] + ["+Inf"]
+
+    keys = []
+    for klas in klassen:
+        for name in PHASES:
+            prefix = f"{KEY_PREFIX}:{klas}:{name}"
+            keys += [f"{prefix}:bucket:{bound}" for bound in bounds]
+            keys += [f"{prefix}:sum", f"{prefix}:count"]
+        keys += [f"{KEY_PREFIX}:{klas}:queries:{alias}" for alias in aliases]
+        keys.append(f"{KEY_PREFIX}:{klas}:bytes")
+    keys += [
+        f"{CACHE_KEY_PREFIX}:{tier}:{result}"
+        for tier in CACHE_TIERS
+        for result in ("hit", "miss")
+    ]
+    values = cache.get_many(keys)
+
+    lines = [
+        "# HELP pta_export_phase_seconds Duration of the phases of an export.",
+        "# TYPE pta_export_phase_seconds histogram",
+    ]
+    for klas in klassen:
+        for name in PHASES:
+            prefix = f"{KEY_PREFIX}:{klas}:{name}"
+            if not (count := values.get(f"{prefix}:count")):
+                continue
+            labels = f'klas="{klas}",phase="{name}"'
+            cumulative = 0
+            for bound in bounds:
+                cumulative += values.get(f"{prefix}:bucket:{bound}", 0)
+                lines.append(
+                    f'pta_export_phase_seconds_bucket{{{labels},le="{bound}"}} '
+                    f"{cumulative}"
+                )
+            total = values.get(f"{prefix}:sum", 0) / 1_000_000
+            lines.append(f"pta_export_phase_seconds_sum{{{labels}}} {total}")
+            lines.append(f"pta_export_phase_seconds_count{{{labels}}} {count}")
+
+    lines += [
+        "# HELP pta_export_queries_total Queries executed for exports.",
+        "# TYPE pta_export_queries_total counter",
+    ]
+    for klas in klassen:
+        for alias in aliases:
+            if count := values.get(f"{KEY_PREFIX}:{klas}:queries:{alias}"):
+                lines.append(
+                    f'pta_export_queries_total{{klas="{klas}",alias="{alias}"}} {count}'
+                )
+
+    lines += [
+        "# HELP pta_export_bytes_total Bytes of the exported documents.",
+        "# TYPE pta_export_bytes_total counter",
+    ]
+    for klas in klassen:
+        if size := values.get(f"{KEY_PREFIX}:{klas}:bytes"):
+            lines.append(f'pta_export_bytes_total{{klas="{klas}"}} {size}')
+
+    lines += [
+        "# HELP pta_export_cache_requests_total Cache lookups per tier.",
+        "# TYPE pta_export_cache_requests_total counter",
+    ]
+    for tier in CACHE_TIERS:
+        for result in ("hit", "miss"):
+            if value := values.get(f"{CACHE_KEY_PREFIX}:{tier}:{result}"):
+                lines.append(
+                    f'pta_export_cache_requests_total{{tier="{tier}",result="{result}"}} '
+                    f"{value}"
+                )
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,37 @@
+"""
+Normalize rendered documents so that they can be compared.
+
+Two exports are considered equivalent when the main document part is the same
+after canonicalization, regardless of attribute order or zip compression.
+"""
+
+from io import BytesIO
+from zipfile import ZipFile
+
+from docx.document import Document
+from lxml import etree
+
+DOCUMENT_PART = "word/document.xml"
+
+
+def get_document_xml(document: Document | bytes) -> str:
+    """
+    Return the canonical, indented XML of the main part of a document.
+    """
+    if isinstance(document, bytes):
+        with ZipFile(BytesIO(document)) as package:
+            xml = package.read(DOCUMENT_PART)
+    else:
+        xml = etree.tostring(document.element)
+    return normalize_xml(xml)
+
+
+def normalize_xml(xml: bytes) -> str:
+    """
+    Return the canonical, indented form of serialized XML.
+    """
+    parser = etree.XMLParser(remove_blank_text=True)
+    root = etree.fromstring(xml, parser)
+    canonical = etree.tostring(root, method="c14n")
+    root = etree.fromstring(canonical, parser)
+    return etree.tostring(root, encoding="unicode", pretty_print=True)
@@ -0,0 +1,94 @@
+"""
+Save documents with a configurable zip compression.
+
+python-docx deflates every part of the package at the default level. Compressing
+is a noticeable part of saving the larger exports, and not worth it on a fast
+network. :func:`save_document` writes the package with one of the
+:class:`Compression` profiles instead.
+
+The package is written like ``OpcPackage.save`` does, from the public attributes of
+the parts and with the public API of :mod:`zipfile`.
+"""
+
+from typing import IO, Iterable
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
+
+from django.conf import settings
+
+from docx import Document
+from docx.opc.constants import CONTENT_TYPE as CT, NAMESPACE
+from docx.opc.packuri import CONTENT_TYPES_URI, PACKAGE_URI
+from docx.opc.part import Part
+from docx.opc.spec import default_content_types
+from lxml import etree
+
+from .constants import Compression
+
+COMPRESSION_LEVELS: dict[str, int | None] = {
+    Compression.stored: None,
+    Compression.fast: 1,
+    Compression.default: 6,
+    Compression.max: 9,
+}
+
+
+def get_content_types_xml(parts: Iterable[Part]) -> bytes:
+    """
+    Return the ``[Content_Types].xml`` of the package with the given parts.
+    """
+    defaults = {"rels": CT.OPC_RELATIONSHIPS, "xml": CT.XML}
+    overrides = {}
+    for part in parts:
+        ext = part.partname.ext.lower()
+        if (ext, part.content_type) in default_content_types:
+            defaults[ext] = part.content_type
+        else:
+            overrides[str(part.partname)] = part.content_type
+
+    types = etree.Element(
+        f"{{{NAMESPACE.OPC_CONTENT_TYPES}}}Types",
+        nsmap={None: NAMESPACE.OPC_CONTENT_TYPES},
+    )
+    for ext, content_type in sorted(defaults.items()):
+        etree.SubElement(
+            types,
+            f"{{{NAMESPACE.OPC_CONTENT_TYPES}}}Default",
+            Extension=ext,
+            ContentType=content_type,
+        )
+    for partname, content_type in sorted(overrides.items()):
+        etree.SubElement(
+            types,
+            f"{{{NAMESPACE.OPC_CONTENT_TYPES}}}Override",
+            PartName=partname,
+            ContentType=content_type,
+        )
+    return etree.tostring(types, encoding="UTF-8", standalone=True)
+
+
+def save_document(
+    document: Document, outfile: IO[bytes], compression: str = ""
+) -> None:
+    """
+    Save the document like ``document.save(outfile)``, with the given compression
+    profile or ``PTA_EXPORT_COMPRESSION``.
+    """
+    compression = compression or settings.PTA_EXPORT_COMPRESSION
+    level = COMPRESSION_LEVELS[compression]
+    package = document.part.package
+    parts = package.parts
+    for part in parts:
+        part.before_marshal()
+
+    with ZipFile(
+        outfile,
+        "w",
+        compression=ZIP_DEFLATED if level else ZIP_STORED,
+        compresslevel=level,
+    ) as zipf:
+        zipf.writestr(CONTENT_TYPES_URI.membername, get_content_types_xml(parts))
+        zipf.writestr(PACKAGE_URI.rels_uri.membername, package.rels.xml)
+        for part in parts:
+            zipf.writestr(part.partname.membername, part.blob)
+            if len(part.rels):
+                zipf.writestr(part.partname.rels_uri.membername, part.rels.xml)
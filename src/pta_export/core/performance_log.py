@@ -0,0 +1,143 @@
+"""
+Aggregate the export records in (rotated) ``performance.log`` files.
+
+The files are read line by line and every value is added to a histogram with
+logarithmic buckets, so the memory use does not grow with the number of records.
+Percentiles are accurate within :data:`PRECISION`.
+"""
+
+import gzip
+import json
+import math
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator
+
+# relative error of the percentiles
+PRECISION = 0.01
+
+PERCENTILES = (50, 95, 99)
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S,%f"
+
+
+@dataclass
+class Histogram:
+    buckets: dict[int, int] = field(default_factory=lambda: defaultdict(int))
+    zeros: int = 0
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        if value <= 0:
+            self.zeros += 1
+        else:
+            self.buckets[math.ceil(math.log(value, 1 + PRECISION))] += 1
+
+    def percentile(self, percentile: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = math.ceil(self.count * percentile / 100)
+        if rank <= self.zeros:
+            return 0.0
+        seen = self.zeros
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min((1 + PRECISION) ** index, self.max)
+        return self.max
+
+    def summary(self) -> dict[str, float]:
+        return {
+            **{f"p{p}": self.percentile(p) for p in PERCENTILES},
+            "max": self.max,
+            "mean": self.total / self.count if self.count else 0.0,
+        }
+
+
+@dataclass
+class Group:
+    duration: Histogram = field(default_factory=Histogram)
+    queries: Histogram = field(default_factory=Histogram)
+    size: Histogram = field(default_factory=Histogram)
+
+
+def open_log(path: Path):
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    return path.open("r", encoding="utf-8", errors="replace")
+
+
+def parse_line(line: str) -> tuple[datetime | None, dict] | None:
+    """
+    Parse a line of the ``performance`` formatter, ``<asctime> <pid> | <thread> | <json>``.
+    """
+    parts = line.rstrip("\n").split(" | ", 2)
+    if len(parts) != 3 or not parts[2].startswith("{"):
+        return None
+    try:
+        record = json.loads(parts[2])
+    except json.JSONDecodeError:
+        return None
+    try:
+        timestamp = datetime.strptime(parts[0].rsplit(" ", 1)[0], TIMESTAMP_FORMAT)
+    except ValueError:
+        timestamp = None
+    return timestamp, record
+
+
+def iter_records(
+    paths: Iterable[Path],
+    event: str = "export",
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> Iterator[dict]:
+    for path in paths:
+        with open_log(path) as logfile:
+            for line in logfile:
+                if (parsed := parse_line(line)) is None:
+                    continue
+                timestamp, record = parsed
+                if record.get("event") != event:
+                    continue
+                if timestamp and since and timestamp < since:
+                    continue
+                if timestamp and until and timestamp >= until:
+                    continue
+                yield record
+
+
+def aggregate(records: Iterable[dict]) -> dict[tuple[str, str, str], Group]:
+    """
+    Group the export records per (klas, phase, renderer).
+
+    The ``total`` phase covers the complete export and holds the output size.
+    """
+    groups = defaultdict(Group)
+    for record in records:
+        klas, renderer = record.get("klas", "?"), record.get("renderer", "legacy")
+        phases = record.get("phases", {})
+        for name, phase in phases.items():
+            group = groups[klas, name, renderer]
+            group.duration.add(phase.get("duration", 0))
+            group.queries.add(
+                sum(stats["count"] for stats in phase.get("queries", {}).values())
+            )
+
+        group = groups[klas, "total", renderer]
+        group.duration.add(record.get("duration", 0))
+        group.queries.add(
+            sum(
+                stats["count"]
+                for phase in phases.values()
+                for stats in phase.get("queries", {}).values()
+            )
+        )
+        group.size.add(record.get("size", 0))
+    return groups
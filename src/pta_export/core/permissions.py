@@ -1,4 +1,4 @@
-from collections.abc import Sequence
+from collections.abc import Collection, Sequence
 
 from .constants import AccessModes, Leerjaren, Sectoren
 from .models import User as PtaUser
@@ -24,3 +24,27 @@ def get_allowed_leerjaren(pta_user: PtaUser | None) -> Sequence[Leerjaren]:
                 return []
 
     return []
+
+
+def get_allowed_vakken(pta_user: PtaUser | None) -> set[int]:
+    """
+    Return the IDs of the vakken of the user (``vak1`` to ``vak5``).
+    """
+    if pta_user is None:
+        return set()
+    vakken = (pta_user.vak1, pta_user.vak2, pta_user.vak3, pta_user.vak4, pta_user.vak5)
+    return {vak for vak in vakken if vak}
+
+
+def can_export(
+    pta_user: PtaUser | None, leerjaar: int, vak_ids: Collection[int] | None = None
+) -> bool:
+    """
+    Check access to the export of a klas, or of a selection of its vakken.
+
+    Users can export the klassen of their access mode, and their own vakken of any
+    klas.
+    """
+    if leerjaar in get_allowed_leerjaren(pta_user):
+        return True
+    return bool(vak_ids) and set(vak_ids) <= get_allowed_vakken(pta_user)
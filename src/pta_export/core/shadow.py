@@ -0,0 +1,149 @@
+"""
+Compare a candidate renderer against the legacy renderer on real exports.
+
+In shadow mode the legacy document is always the one that is served. For a
+sample of the exports, the candidate renderer runs afterwards in a background
+thread with the same vakken, and the normalized XML of both documents is
+compared. Timings and mismatches are written to the ``performance`` log.
+
+At most one shadow render runs per process, the samples taken while one is running
+are skipped. The shadow renders don't pile up next to the real renders under load.
+"""
+
+import difflib
+import logging
+import random
+import threading
+import time
+from typing import Callable
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.utils import translation
+from django.utils.module_loading import import_string
+
+from docx.document import Document
+from lxml import etree
+
+from ..utils.performance import log_record
+from .models import Vak
+from .normalize import get_document_xml, normalize_xml
+
+logger = logging.getLogger(__name__)
+
+RENDERER_MODES = ("legacy", "candidate", "shadow")
+
+# maximum number of diff lines included in a mismatch record
+MAX_DIFF_LINES = 50
+
+# held by the running shadow render
+_running = threading.Lock()
+
+
+def get_renderer_mode() -> str:
+    mode = settings.PTA_EXPORT_RENDERER
+    if mode not in RENDERER_MODES:
+        raise ImproperlyConfigured(
+            f"PTA_EXPORT_RENDERER must be one of {RENDERER_MODES}, got {mode!r}."
+        )
+    return mode
+
+
+def get_candidate_renderer() -> Callable[[int, int, list[Vak]], Document]:
+    if not settings.PTA_EXPORT_CANDIDATE_RENDERER:
+        raise ImproperlyConfigured(
+            "PTA_EXPORT_CANDIDATE_RENDERER is required for the candidate and "
+            "shadow renderer modes."
+        )
+    return import_string(settings.PTA_EXPORT_CANDIDATE_RENDERER)
+
+
+def should_shadow() -> bool:
+    return random.random() < settings.PTA_EXPORT_SHADOW_SAMPLE_RATE
+
+
+def compare_renderers(
+    year: int,
+    leerjaar: int,
+    vakken: list[Vak],
+    legacy_xml: bytes,
+    legacy_duration: float,
+) -> bool:
+    """
+    Render the export with the candidate renderer and compare it to the legacy output.
+
+    Returns whether the normalized documents are equal.
+    """
+    renderer = get_candidate_renderer()
+    with translation.override("nl_NL"):
+        start = time.perf_counter()
+        document = renderer(year, leerjaar, vakken)
+        candidate_duration = time.perf_counter() - start
+
+    expected = normalize_xml(legacy_xml)
+    actual = get_document_xml(document)
+    match = expected == actual
+
+    record = {
+        "jaar": year,
+        "klas": leerjaar,
+        "candidate": settings.PTA_EXPORT_CANDIDATE_RENDERER,
+        "legacy_duration": round(legacy_duration, 6),
+        "candidate_duration": round(candidate_duration, 6),
+        "match": match,
+    }
+    if not match:
+        diff = difflib.unified_diff(
+            expected.splitlines(),
+            actual.splitlines(),
+            "legacy",
+            "candidate",
+            lineterm="",
+        )
+        record["diff"] = "\n".join(line for _, line in zip(range(MAX_DIFF_LINES), diff))
+    log_record("shadow_render", **record)
+    return match
+
+
+def _run_comparison(*args) -> None:
+    try:
+        compare_renderers(*args)
+    except Exception:
+        logger.exception("Shadow render of the export failed")
+    finally:
+        # the thread has its own database connections
+        connections.close_all()
+        _running.release()
+
+
+def start_shadow_render(
+    year: int,
+    leerjaar: int,
+    vakken: list[Vak],
+    legacy_document: Document,
+    legacy_duration: float,
+) -> threading.Thread | None:
+    """
+    Compare the candidate renderer in a background thread, unless a shadow render
+    is already running.
+
+    The legacy document is serialized up front, as it is saved concurrently by the
+    request that rendered it.
+    """
+    if not _running.acquire(blocking=False):
+        logger.debug("Skipping the shadow render, another one is running")
+        return None
+    try:
+        legacy_xml = etree.tostring(legacy_document.element)
+        thread = threading.Thread(
+            target=_run_comparison,
+            args=(year, leerjaar, vakken, legacy_xml, legacy_duration),
+            name=f"shadow-render-{year}-{leerjaar}",
+            daemon=True,
+        )
+        thread.start()
+    except BaseException:
+        _running.release()
+        raise
+    return thread
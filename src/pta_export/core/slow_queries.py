@@ -0,0 +1,157 @@
+"""
+Capture slow queries on the OCPTA database.
+
+The OCPTA schema is unmanaged, so we cannot add indexes ourselves - but we can
+find out which of our queries would need them. An execute wrapper is installed on
+every ``ocpta`` connection, and on the connections of
+``PTA_EXPORT_STREAM_DATABASE`` for the streamed toetsen. Queries over ``PTA_EXPORT_SLOW_QUERY_THRESHOLD``
+seconds are logged to the performance log and aggregated per fingerprint (the SQL
+with the parameters and ``IN`` lists collapsed) in a cache shared by the web
+server processes.
+
+The aggregates are updated with a read-modify-write on the cache, concurrent slow
+queries with the same fingerprint may lose an update. That is acceptable for
+finding the top offenders.
+"""
+
+import hashlib
+import re
+import time
+import traceback
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.backends.signals import connection_created
+
+from ..utils.performance import log_record
+
+KEY_PREFIX = "slow_queries"
+INDEX_KEY = f"{KEY_PREFIX}:index"
+
+# bounds on the cached aggregates
+MAX_FINGERPRINTS = 500
+MAX_CALL_SITES = 10
+
+PACKAGE_DIR = Path(__file__).resolve().parent.parent
+
+WHITESPACE_RE = re.compile(r"\s+")
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+IN_LIST_RE = re.compile(r"\bIN \((?:\s*(?:%s|\?)\s*,?)+\)", re.IGNORECASE)
+
+
+def normalize_sql(sql: str) -> str:
+    sql = WHITESPACE_RE.sub(" ", sql).strip()
+    sql = STRING_RE.sub("?", sql)
+    sql = NUMBER_RE.sub("?", sql)
+    sql = sql.replace("%s", "?")
+    return IN_LIST_RE.sub("IN (...)", sql)
+
+
+def get_fingerprint(normalized_sql: str) -> str:
+    return hashlib.sha1(normalized_sql.encode()).hexdigest()[:16]
+
+
+def get_call_site() -> str:
+    """
+    Return the innermost frame in project code outside of this module.
+    """
+    this_file = Path(__file__).resolve()
+    for frame in reversed(traceback.extract_stack()):
+        path = Path(frame.filename).resolve()
+        if path == this_file or not path.is_relative_to(PACKAGE_DIR):
+            continue
+        return f"{path.relative_to(PACKAGE_DIR.parent)}:{frame.lineno} {frame.name}"
+    return "unknown"
+
+
+def get_cache():
+    return caches[settings.PTA_EXPORT_SLOW_QUERY_CACHE]
+
+
+def record_slow_query(
+    sql: str, duration: float, rows: int | None, call_site: str
+) -> None:
+    normalized = normalize_sql(sql)
+    fingerprint = get_fingerprint(normalized)
+    log_record(
+        "slow_query",
+        fingerprint=fingerprint,
+        sql=normalized,
+        duration=round(duration, 6),
+        rows=rows,
+        call_site=call_site,
+    )
+
+    cache = get_cache()
+    key = f"{KEY_PREFIX}:{fingerprint}"
+    stats = cache.get(key) or {
+        "fingerprint": fingerprint,
+        "sql": normalized,
+        "count": 0,
+        "total_time": 0.0,
+        "max_time": 0.0,
+        "rows": 0,
+        "call_sites": {},
+    }
+    stats["count"] += 1
+    stats["total_time"] += duration
+    stats["max_time"] = max(stats["max_time"], duration)
+    stats["rows"] += max(rows or 0, 0)
+    stats["last_seen"] = time.time()
+    call_sites = stats["call_sites"]
+    if call_site in call_sites or len(call_sites) < MAX_CALL_SITES:
+        call_sites[call_site] = call_sites.get(call_site, 0) + 1
+    cache.set(key, stats, timeout=None)
+
+    index = cache.get(INDEX_KEY) or []
+    if fingerprint not in index and len(index) < MAX_FINGERPRINTS:
+        cache.set(INDEX_KEY, [*index, fingerprint], timeout=None)
+
+
+def get_slow_queries() -> list[dict]:
+    """
+    Return the aggregated slow queries, the highest total time first.
+    """
+    cache = get_cache()
+    index = cache.get(INDEX_KEY) or []
+    stats = cache.get_many([f"{KEY_PREFIX}:{fingerprint}" for fingerprint in index])
+    queries = [
+        {**query, "mean_time": query["total_time"] / query["count"]}
+        for query in stats.values()
+    ]
+    return sorted(queries, key=lambda query: query["total_time"], reverse=True)
+
+
+def reset_slow_queries() -> None:
+    cache = get_cache()
+    index = cache.get(INDEX_KEY) or []
+    cache.delete_many([f"{KEY_PREFIX}:{fingerprint}" for fingerprint in index])
+    cache.delete(INDEX_KEY)
+
+
+class SlowQueryWrapper:
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            threshold = settings.PTA_EXPORT_SLOW_QUERY_THRESHOLD
+            if threshold is not None and duration >= threshold:
+                rows = getattr(context["cursor"], "rowcount", None)
+                record_slow_query(sql, duration, rows, get_call_site())
+
+
+def install_slow_query_wrapper(sender, connection, **kwargs) -> None:
+    if connection.alias not in ("ocpta", settings.PTA_EXPORT_STREAM_DATABASE):
+        return
+    # the signal is sent again for every reconnect of the same wrapper
+    if not any(isinstance(w, SlowQueryWrapper) for w in connection.execute_wrappers):
+        connection.execute_wrappers.append(SlowQueryWrapper())
+
+
+connection_created.connect(
+    install_slow_query_wrapper, dispatch_uid="pta_export.core.slow_queries"
+)
@@ -0,0 +1,299 @@
+"""
+Export the table data of the PTAs as spreadsheet (xlsx) or csv.
+
+The rows are the rows of the tables of the Word export, built by the same
+functions of :mod:`pta_export.core.document`, without the layout. There is a sheet
+per vak in the export of a klas, and a sheet per klas in the export of a vak.
+
+Workbooks are written with the write-only worksheets of openpyxl, which write the
+rows to disk as they are appended instead of keeping the cells in memory. The OCPTA
+text is written as text, also when it looks like a formula.
+"""
+
+import csv
+import html
+from dataclasses import dataclass
+from io import TextIOWrapper
+from typing import IO, Collection, Iterable, Iterator
+
+from django.conf import settings
+from django.utils import translation
+from django.utils.text import capfirst
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.styles import Font
+from openpyxl.workbook.child import INVALID_TITLE_REGEX
+
+from pta_export.utils.query_budget import query_budget
+
+from .constants import ExportFormats, ExportModes, Leerjaren
+from .document import (
+    LEERJAAR_WEGING,
+    Omschrijving,
+    get_h5_toetsen_table,
+    get_inhaalopdrachten_table,
+    get_inhalen_table,
+    get_overnemen_herwaarderen_table,
+    get_tl_table,
+    get_toets_table,
+)
+from .export import (
+    EXPORT_QUERY_BUDGET,
+    EXPORT_VAK_QUERY_BUDGET,
+    VAK_EXPORT_LEERJAREN,
+    fetch_vak_leerjaren,
+    fetch_vakken,
+    get_kalender,
+    stream_vakken,
+)
+from .models import Vak
+
+SPREADSHEET_FORMATS = (ExportFormats.xlsx, ExportFormats.csv)
+
+# sheet titles in xlsx files are limited to 31 characters
+MAX_TITLE_LENGTH = 31
+
+# the start of a formula (or of a DDE payload) in a csv cell
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+@dataclass
+class Table:
+    title: str
+    header: list[str]
+    rows: list[list]
+
+
+@dataclass
+class Sheet:
+    title: str
+    vak: str
+    klas: str
+    tables: list[Table]
+
+
+def make_table(title: str, table: list[list]) -> Table:
+    [header, *rows] = table
+    return Table(title, header, rows)
+
+
+def get_cell_value(content):
+    if isinstance(content, Omschrijving):
+        content = "\n".join(filter(None, (content.content, content.inleverdatum)))
+    elif isinstance(content, tuple):
+        # the columns of iter_oude_toets_columns
+        content = "".join(map(str, content))
+    if content is None:
+        return ""
+    if isinstance(content, str):
+        return ILLEGAL_CHARACTERS_RE.sub("", content)
+    return content
+
+
+def get_xlsx_cell(worksheet, content) -> WriteOnlyCell:
+    value = get_cell_value(content)
+    cell = WriteOnlyCell(worksheet, value=value)
+    if isinstance(value, str):
+        # openpyxl writes strings starting with "=" as formula
+        cell.data_type = "s"
+    return cell
+
+
+def get_csv_value(content):
+    value = get_cell_value(content)
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        # spreadsheet applications evaluate these as formula when opening the csv
+        return f"'{value}"
+    return value
+
+
+def get_regular_tables(
+    vak: Vak, leerjaar: int, toetsweek_periodes: dict[int, list[int]]
+) -> list[Table]:
+    Omschrijving.reset_counter()
+    weging = LEERJAAR_WEGING.get(leerjaar)
+    [header, *rows] = get_toets_table(leerjaar, vak, toetsweek_periodes, weging)
+    # the voetnoten of the toetsen are numbered below the table in the document
+    rows = [
+        [
+            *row,
+            next((cell.voetnoot for cell in row if isinstance(cell, Omschrijving)), ""),
+        ]
+        for row in rows
+    ]
+    tables = [Table("Toetsen", [*header, "Voetnoot"], rows)]
+    voetnoten = [
+        [voetnoot.noot]
+        for voetnoot in vak.voetnoten
+        if voetnoot.is_included_for(leerjaar)
+    ]
+    if voetnoten:
+        tables.append(Table("Opmerkingen", ["Opmerking"], voetnoten))
+    return tables
+
+
+def get_tables(
+    vak: Vak, leerjaar: int, toetsweek_periodes: dict[int, list[int]]
+) -> list[Table]:
+    """
+    Return the tables of the vak in the export of the leerjaar, following the
+    dispatch of :func:`pta_export.core.document.add_vak`.
+    """
+    match leerjaar:
+        case Leerjaren.overstappers_vwo_5:
+            if vak.export_bit_for(leerjaar) in (
+                ExportModes.no_export.value,
+                ExportModes.remark_completed_earlier.value,
+            ):
+                return []
+            tables = [
+                make_table(
+                    "Overnemen en herwaarderen", get_overnemen_herwaarderen_table(vak)
+                ),
+                make_table("Inhalen", get_inhalen_table(vak)),
+                make_table("Inhaalopdrachten", get_inhaalopdrachten_table(vak)),
+            ]
+        case Leerjaren.overstappers_vwo_6:
+            if vak.export_bit_for(leerjaar) in (
+                ExportModes.no_export.value,
+                ExportModes.remark_completed_earlier.value,
+                ExportModes.remark_vwo.value,
+            ):
+                return []
+            tables = [make_table("Havo 5 toetsen", get_h5_toetsen_table(vak))]
+        case Leerjaren.tl_3 | Leerjaren.tl_4:
+            tables = [
+                make_table("Toetsen", get_tl_table(leerjaar, vak, toetsweek_periodes))
+            ]
+        case _:
+            if not vak.toetsen:
+                return []
+            tables = get_regular_tables(vak, leerjaar, toetsweek_periodes)
+    return [table for table in tables if table.rows]
+
+
+def get_vak_naam(vak: Vak) -> str:
+    return capfirst(html.unescape(vak.naam or ""))
+
+
+def get_sheet_title(title: str, used: set[str]) -> str:
+    """
+    Return a valid and unique (case insensitive) sheet title.
+    """
+    title = INVALID_TITLE_REGEX.sub("-", title).strip()[:MAX_TITLE_LENGTH] or "PTA"
+    unique_title, counter = title, 1
+    while unique_title.lower() in used:
+        counter += 1
+        suffix = f" ({counter})"
+        unique_title = f"{title[:MAX_TITLE_LENGTH - len(suffix)]}{suffix}"
+    used.add(unique_title.lower())
+    return unique_title
+
+
+def write_xlsx(sheets: Iterable[Sheet], outfile: IO[bytes]) -> None:
+    workbook = Workbook(write_only=True)
+    used_titles: set[str] = set()
+
+    def bold_row(worksheet, values) -> list[WriteOnlyCell]:
+        cells = [get_xlsx_cell(worksheet, value) for value in values]
+        for cell in cells:
+            cell.font = Font(bold=True)
+        return cells
+
+    for sheet in sheets:
+        worksheet = workbook.create_sheet(get_sheet_title(sheet.title, used_titles))
+        for index, table in enumerate(sheet.tables):
+            if index:
+                worksheet.append([])
+            worksheet.append(bold_row(worksheet, [table.title]))
+            worksheet.append(bold_row(worksheet, table.header))
+            for row in table.rows:
+                worksheet.append([get_xlsx_cell(worksheet, content) for content in row])
+
+    if not used_titles:
+        # a workbook needs at least one sheet
+        workbook.create_sheet("PTA")
+    workbook.save(outfile)
+
+
+def write_csv(sheets: Iterable[Sheet], outfile: IO[bytes]) -> None:
+    """
+    Write the tables below each other, every table starting with its header. The
+    first columns are the vak, the klas and the title of the table.
+    """
+    textfile = TextIOWrapper(outfile, encoding="utf-8", newline="")
+    writer = csv.writer(textfile)
+    for sheet in sheets:
+        prefix = [get_csv_value(sheet.vak), sheet.klas]
+        for table in sheet.tables:
+            writer.writerow(["Vak", "Klas", "Tabel", *table.header])
+            writer.writerows(
+                [*prefix, table.title, *map(get_csv_value, row)] for row in table.rows
+            )
+    textfile.flush()
+    # leave the outfile open for the caller
+    textfile.detach()
+
+
+def write_sheets(sheets: Iterable[Sheet], outfile: IO[bytes], file_format: str) -> None:
+    if file_format == ExportFormats.csv:
+        write_csv(sheets, outfile)
+    else:
+        write_xlsx(sheets, outfile)
+
+
+@query_budget("export_spreadsheet()", ocpta=EXPORT_QUERY_BUDGET)
+def export_spreadsheet(
+    year: int,
+    leerjaar: int,
+    outfile: IO[bytes],
+    file_format: str,
+    vak_ids: Collection[int] | None = None,
+) -> None:
+    """
+    Write the export of a klas as spreadsheet, with a sheet per vak.
+    """
+    translation.activate("nl_NL")
+    toetsweek_periodes = get_kalender(year).toetsweek_periodes
+    if settings.PTA_EXPORT_STREAM_TOETSEN:
+        vakken: Iterable[Vak] = stream_vakken(year, leerjaar, vak_ids)
+    else:
+        vakken = fetch_vakken(year, leerjaar, vak_ids)
+    klas = Leerjaren(leerjaar).label
+    sheets: Iterator[Sheet] = (
+        Sheet(get_vak_naam(vak), get_vak_naam(vak), klas, tables)
+        for vak in vakken
+        if (tables := get_tables(vak, leerjaar, toetsweek_periodes))
+    )
+    write_sheets(sheets, outfile, file_format)
+    translation.deactivate()
+
+
+@query_budget("export_vak_spreadsheet()", ocpta=EXPORT_VAK_QUERY_BUDGET)
+def export_vak_spreadsheet(
+    year: int,
+    vak_id: int,
+    outfile: IO[bytes],
+    file_format: str,
+    leerjaren: Collection[int] = VAK_EXPORT_LEERJAREN,
+) -> None:
+    """
+    Write the export of a vak as spreadsheet, with a sheet per klas.
+    """
+    translation.activate("nl_NL")
+    toetsweek_periodes = get_kalender(year).toetsweek_periodes
+    vakken = fetch_vak_leerjaren(year, vak_id, leerjaren)
+    sheets = (
+        Sheet(
+            Leerjaren(leerjaar).label,
+            get_vak_naam(vak),
+            Leerjaren(leerjaar).label,
+            tables,
+        )
+        for leerjaar, vak in vakken.items()
+        if (tables := get_tables(vak, leerjaar, toetsweek_periodes))
+    )
+    write_sheets(sheets, outfile, file_format)
+    translation.deactivate()
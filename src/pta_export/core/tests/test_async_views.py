@@ -0,0 +1,118 @@
+from unittest.mock import patch
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import ImproperlyConfigured
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from asgiref.sync import sync_to_async
+from rest_framework.test import force_authenticate
+
+from pta_export.accounts.models import User
+
+from ..api import AsyncExportAPIView, AsyncVakExportAPIView
+from ..benchmarks.dataset import SCALES, generate_dataset
+from ..constants import AccessModes, Leerjaren
+from ..models import User as PtaUser
+from ..views import AsyncExportView
+from .utils import YEAR, OCPTATablesMixin
+
+
+async def run_inline(func):
+    # the worker threads of the executor don't see the data of the test transaction
+    return await sync_to_async(func)()
+
+
+@override_settings(PTA_EXPORT_ARCHIVE=False)
+@patch("pta_export.core.views.run_in_executor", run_inline)
+class AsyncExportViewTests(OCPTATablesMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate_dataset(YEAR, SCALES["small"], seed=0)
+        PtaUser.objects.update(access=AccessModes.export_any)
+        cls.user = User.objects.create_user("async", email="bench@example.com")
+        cls.pta_user = PtaUser.objects.get(email="bench@example.com")
+
+    async def test_form_is_rendered(self):
+        request = RequestFactory().get("/")
+        request.user = self.user
+        request.pta_user = self.pta_user
+
+        response = await AsyncExportView.as_view()(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.template_name, ["export.html"])
+
+    async def test_login_required(self):
+        request = RequestFactory().post("/", {"jaar": YEAR, "klas": Leerjaren.havo_4})
+        request.user = AnonymousUser()
+
+        response = await AsyncExportView.as_view()(request)
+
+        self.assertEqual(response.status_code, 302)
+
+    async def test_export_view(self):
+        request = RequestFactory().post("/", {"jaar": YEAR, "klas": Leerjaren.havo_4})
+        request.user = self.user
+        request.pta_user = self.pta_user
+
+        response = await AsyncExportView.as_view()(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("attachment", response["Content-Disposition"])
+
+    async def test_invalid_form_is_rendered(self):
+        request = RequestFactory().post("/", {"jaar": YEAR - 10, "klas": 1})
+        request.user = self.user
+        request.pta_user = self.pta_user
+
+        response = await AsyncExportView.as_view()(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("Content-Disposition", response)
+
+    async def test_export_api_view(self):
+        request = RequestFactory().post(
+            "/api/export", {"jaar": YEAR, "klas": Leerjaren.havo_4}
+        )
+        force_authenticate(request, self.user)
+
+        response = await AsyncExportAPIView.as_view()(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("attachment", response["Content-Disposition"])
+        self.assertIn("Allow", response)
+
+    async def test_api_not_authenticated(self):
+        request = RequestFactory().post(
+            "/api/export", {"jaar": YEAR, "klas": Leerjaren.havo_4}
+        )
+
+        response = await AsyncExportAPIView.as_view()(request)
+
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response["WWW-Authenticate"], "Token")
+
+    async def test_api_validation_error(self):
+        request = RequestFactory().post("/api/export", {"jaar": YEAR})
+        force_authenticate(request, self.user)
+
+        response = await AsyncExportAPIView.as_view()(request)
+        await sync_to_async(response.render)()
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("klas", response.data)
+
+
+class AsyncHandlersTests(SimpleTestCase):
+    def test_views_are_async(self):
+        for view in (AsyncExportView, AsyncExportAPIView, AsyncVakExportAPIView):
+            with self.subTest(view=view.__name__):
+                self.assertTrue(view.view_is_async)
+
+    def test_sync_handler_is_rejected(self):
+        class View(AsyncExportAPIView):
+            def get(self, request, *args, **kwargs):
+                pass
+
+        with self.assertRaises(ImproperlyConfigured):
+            View.as_view()
@@ -0,0 +1,98 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from pta_export.accounts.models import User
+
+from ..benchmarks.dataset import SCALES, generate_dataset
+from ..constants import Leerjaren
+from ..models import Overstap, Toets, Vak
+from .utils import YEAR, OCPTATablesMixin
+
+
+class DataAPITests(OCPTATablesMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate_dataset(YEAR, SCALES["small"], seed=0)
+        cls.user = User.objects.create_user("bench", email="bench@example.com")
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+
+    def get_all(self, url, params) -> list[dict]:
+        rows = []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            rows += response.json()["results"]
+            if not (url := response.json()["next"]):
+                return rows
+            response = self.client.get(url)
+
+    def test_keyset_pagination(self):
+        toetsen = Toets.objects.filter(jaar=YEAR, klas=Leerjaren.havo_4).order_by("id")
+
+        rows = self.get_all(
+            reverse("data-toetsen"),
+            {"jaar": YEAR, "klas": Leerjaren.havo_4, "page_size": 3},
+        )
+
+        self.assertEqual([row["id"] for row in rows], [toets.id for toets in toetsen])
+        self.assertEqual(rows[0]["omschrijving"], toetsen[0].omschrijving)
+        self.assertEqual(rows[0]["soortwerk_naam"], toetsen[0].soortwerk.naam)
+
+    def test_fields(self):
+        response = self.client.get(
+            reverse("data-toetsen"), {"jaar": YEAR, "fields": "code,vak"}
+        )
+
+        self.assertEqual(set(response.json()["results"][0]), {"id", "code", "vak"})
+
+        response = self.client.get(
+            reverse("data-toetsen"), {"jaar": YEAR, "fields": "code,password"}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("fields", response.json())
+
+    def test_filters(self):
+        vak = Vak.objects.order_by("id").first()
+
+        rows = self.get_all(reverse("data-overstappen"), {"jaar": YEAR, "vak": vak.id})
+
+        self.assertEqual(len(rows), Overstap.objects.filter(jaar=YEAR, vak=vak).count())
+        self.assertTrue(all(row["vak"] == vak.id for row in rows))
+
+        response = self.client.get(reverse("data-toetsen"))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("jaar", response.json())
+
+    def test_etag(self):
+        url = reverse("data-toetsen")
+        params = {"jaar": YEAR, "klas": Leerjaren.havo_4}
+        response = self.client.get(url, params)
+        etag = response["ETag"]
+
+        # only the fingerprint
+        with self.assertNumQueries(5, using="ocpta"):
+            response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        with self.subTest("other page"):
+            response = self.client.get(url, {**params, "page_size": 1})
+            self.assertNotEqual(response["ETag"], etag)
+        with self.subTest("changed data"):
+            Toets.objects.filter(jaar=YEAR, klas=Leerjaren.havo_4).update(tijd=1)
+            response = self.client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response["ETag"], etag)
+
+    def test_vakken(self):
+        for name in ("data-vakken", "data-voetnoten"):
+            with self.subTest(name=name):
+                response = self.client.get(reverse(name))
+
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response.json()["results"])
+                etag = response["ETag"]
+                response = self.client.get(reverse(name), HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
@@ -0,0 +1,119 @@
+"""
+Guard the Word output and the cost of the exports.
+
+The rendered ``document.xml`` of every renderer path is compared against the
+checked-in files in ``golden/``. After an intended change of the output,
+regenerate them with::
+
+    UPDATE_GOLDEN=1 python src/manage.py test pta_export.core
+"""
+
+import os
+import time
+import tracemalloc
+from io import BytesIO
+from pathlib import Path
+
+from django.test import SimpleTestCase, TestCase
+from django.utils import translation
+
+from pta_export.utils import cache
+
+from ..benchmarks.dataset import SCALES, generate_dataset
+from ..constants import ExportModes, Leerjaren
+from ..document import add_vak, initialize_document
+from ..export import export
+from ..normalize import get_document_xml
+from .utils import TOETSWEEK_PERIODES, YEAR, OCPTATablesMixin, make_vak
+
+GOLDEN_DIR = Path(__file__).parent / "golden"
+
+UPDATE_GOLDEN = bool(os.getenv("UPDATE_GOLDEN"))
+
+CASES = [
+    ("regular_havo_4", Leerjaren.havo_4, ExportModes.table),
+    ("regular_vwo_6", Leerjaren.vwo_6, ExportModes.table),
+    ("regular_havo_3", Leerjaren.havo_3, ExportModes.table),
+    ("regular_havo_vwo_1", Leerjaren.havo_vwo_1, ExportModes.table),
+    ("tl_3", Leerjaren.tl_3, ExportModes.table),
+    ("tl_4", Leerjaren.tl_4, ExportModes.table),
+    *(
+        (f"overstappers_vwo_5_{mode.name}", Leerjaren.overstappers_vwo_5, mode)
+        for mode in ExportModes
+    ),
+    *(
+        (f"overstappers_vwo_6_{mode.name}", Leerjaren.overstappers_vwo_6, mode)
+        for mode in ExportModes
+    ),
+]
+
+
+class GoldenOutputTests(SimpleTestCase):
+    maxDiff = None
+
+    def test_renderers(self):
+        for name, leerjaar, export_mode in CASES:
+            with self.subTest(name=name):
+                document = initialize_document()
+                vak = make_vak(leerjaar, export_mode)
+
+                with translation.override("nl_NL"):
+                    add_vak(document, vak, YEAR, leerjaar, TOETSWEEK_PERIODES)
+
+                xml = get_document_xml(document)
+                golden_file = GOLDEN_DIR / f"{name}.xml"
+                if UPDATE_GOLDEN:
+                    golden_file.write_text(xml)
+
+                self.assertEqual(xml, golden_file.read_text())
+
+    def test_saved_document_matches_rendered_document(self):
+        document = initialize_document()
+        vak = make_vak(Leerjaren.havo_4)
+        with translation.override("nl_NL"):
+            add_vak(document, vak, YEAR, Leerjaren.havo_4, TOETSWEEK_PERIODES)
+
+        outfile = BytesIO()
+        document.save(outfile)
+
+        self.assertEqual(
+            get_document_xml(outfile.getvalue()), get_document_xml(document)
+        )
+
+
+class ExportBudgetTests(OCPTATablesMixin, TestCase):
+    """
+    Assert the number of queries, time and memory needed for an export.
+
+    The time and memory budgets are deliberately generous, they exist to catch
+    regressions of an order of magnitude rather than to benchmark.
+    """
+
+    # leerjaar, number of queries, seconds, megabytes
+    BUDGETS = [
+        (Leerjaren.havo_4, 10, 10, 50),
+        (Leerjaren.tl_4, 10, 10, 50),
+        (Leerjaren.overstappers_vwo_5, 10, 10, 50),
+        (Leerjaren.overstappers_vwo_6, 10, 10, 50),
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        generate_dataset(YEAR, SCALES["small"], seed=0)
+
+    def test_budgets(self):
+        for leerjaar, num_queries, seconds, megabytes in self.BUDGETS:
+            with self.subTest(leerjaar=leerjaar.label):
+                cache.clear()
+                tracemalloc.start()
+                start = time.perf_counter()
+                try:
+                    with self.assertNumQueries(num_queries, using="ocpta"):
+                        export(YEAR, leerjaar)
+                    duration = time.perf_counter() - start
+                    peak = tracemalloc.get_traced_memory()[1]
+                finally:
+                    tracemalloc.stop()
+
+                self.assertLess(duration, seconds)
+                self.assertLess(peak, megabytes * 1024 * 1024)
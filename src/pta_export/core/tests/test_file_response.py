@@ -0,0 +1,79 @@
+from io import BytesIO
+
+from django.http import FileResponse
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from pta_export.exports.models import ArchivedExport
+
+from ..benchmarks.dataset import SCALES, generate_dataset
+from ..constants import Leerjaren
+from ..views import get_export_response, get_file_response
+from .utils import YEAR, OCPTATablesMixin
+
+
+class FileResponseTests(OCPTATablesMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate_dataset(YEAR, SCALES["small"], seed=0)
+
+    @override_settings(PTA_EXPORT_ARCHIVE=False)
+    def test_small_export_is_sent_from_memory(self):
+        response = get_export_response(YEAR, Leerjaren.havo_4)
+
+        self.assertFalse(response.streaming)
+        self.assertTrue(response.content.startswith(b"PK"))
+        self.assertEqual(
+            response["Content-Disposition"], 'attachment; filename="2024-H4.docx"'
+        )
+
+    @override_settings(PTA_EXPORT_ARCHIVE=False, PTA_EXPORT_SPOOL_MAX_SIZE=1024)
+    def test_large_export_is_spooled_to_disk(self):
+        response = get_export_response(YEAR, Leerjaren.havo_4)
+
+        self.assertIsInstance(response, FileResponse)
+        self.assertTrue(b"".join(response.streaming_content).startswith(b"PK"))
+
+    @override_settings(PTA_EXPORT_ARCHIVE=True, PTA_EXPORT_SENDFILE_HEADER="X-Sendfile")
+    def test_archived_export_is_sent_by_the_server(self):
+        response = get_export_response(YEAR, Leerjaren.havo_4)
+
+        archived = ArchivedExport.objects.get()
+        self.assertEqual(response["X-Sendfile"], archived.file.path)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(
+            response["Content-Disposition"], 'attachment; filename="2024-H4.docx"'
+        )
+
+    @override_settings(
+        PTA_EXPORT_ARCHIVE=True,
+        PTA_EXPORT_SENDFILE_HEADER="X-Accel-Redirect",
+        PTA_EXPORT_SENDFILE_URL="/private/",
+    )
+    def test_archived_export_internal_redirect(self):
+        response = get_export_response(YEAR, Leerjaren.havo_4)
+
+        archived = ArchivedExport.objects.get()
+        self.assertEqual(response["X-Accel-Redirect"], f"/private/{archived.file.name}")
+
+
+class ContentDispositionTests(SimpleTestCase):
+    def test_filename_is_encoded_like_file_response(self):
+        for filename in ("2024-H4.docx", '2024-Ne"d.docx', '2024-Ne"d é.docx'):
+            with self.subTest(filename=filename):
+                expected = FileResponse(
+                    BytesIO(), as_attachment=True, filename=filename
+                )
+
+                response = get_file_response(BytesIO(b"PK"), filename)
+
+                self.assertEqual(
+                    response["Content-Disposition"], expected["Content-Disposition"]
+                )
+
+    def test_non_ascii_filename(self):
+        response = get_file_response(BytesIO(b"PK"), '2024-Ne"d é.docx')
+
+        self.assertEqual(
+            response["Content-Disposition"],
+            "attachment; filename*=utf-8''2024-Ne%22d%20%C3%A9.docx",
+        )
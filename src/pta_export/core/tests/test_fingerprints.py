@@ -0,0 +1,38 @@
+from django.test import TestCase
+
+from ..benchmarks.dataset import SCALES, generate_dataset
+from ..constants import Leerjaren
+from ..fingerprints import get_fingerprint, get_fingerprints
+from ..models import Overstap, Toets
+from .utils import YEAR, OCPTATablesMixin
+
+
+class FingerprintTests(OCPTATablesMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate_dataset(YEAR, SCALES["small"], seed=0)
+
+    def assertFingerprintsMatch(self):
+        fingerprints = get_fingerprints(YEAR)
+        self.assertTrue(fingerprints)
+        for klas, fingerprint in fingerprints.items():
+            with self.subTest(klas=klas):
+                self.assertEqual(fingerprint, get_fingerprint(YEAR, klas))
+
+    def test_fingerprints_match_single_fingerprint(self):
+        self.assertFingerprintsMatch()
+
+    def test_fingerprints_with_partial_data(self):
+        # overstappers vwo 6 also depend on the havo 5 toetsen
+        Toets.objects.filter(jaar=YEAR, klas=Leerjaren.overstappers_vwo_6).update(
+            klas=Leerjaren.havo_5
+        )
+        Overstap.objects.filter(jaar=YEAR, klas=Leerjaren.havo_4).delete()
+
+        self.assertFingerprintsMatch()
+
+    def test_klassen_without_data(self):
+        Toets.objects.filter(jaar=YEAR, klas=Leerjaren.vwo_4).delete()
+        Overstap.objects.filter(jaar=YEAR, klas=Leerjaren.vwo_4).delete()
+
+        self.assertNotIn(Leerjaren.vwo_4, get_fingerprints(YEAR))
@@ -0,0 +1,54 @@
+from io import StringIO
+
+from django.core.checks import run_checks
+from django.core.checks.registry import Tags
+from django.core.management import call_command
+from django.db import connections
+from django.test import TestCase
+
+from ..benchmarks.dataset import SCALES, generate_dataset
+from ..constants import Leerjaren
+from ..indexes import get_missing_indexes
+from ..models import Toets, Voetnoot
+from .utils import YEAR, OCPTATablesMixin
+
+
+class IndexAdvisorTests(OCPTATablesMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate_dataset(YEAR, SCALES["small"], seed=0)
+
+    def test_missing_indexes(self):
+        with connections["ocpta"].cursor() as cursor:
+            cursor.execute(
+                'CREATE INDEX "noten" ON "OC_voetnoot" ("OCVN_Vak", "OCVN_ID")'
+            )
+
+        missing = {(index.model, index.fields) for index in get_missing_indexes()}
+
+        self.assertIn((Toets, ("jaar", "klas", "vak")), missing)
+        # covered by the index that starts with the column
+        self.assertNotIn((Voetnoot, ("vak",)), missing)
+
+    def test_system_check(self):
+        messages = run_checks(tags=[Tags.database], databases=["ocpta"])
+        self.assertIn("core.W001", {message.id for message in messages})
+
+        messages = run_checks(tags=[Tags.database], databases=["default"])
+        self.assertNotIn("core.W001", {message.id for message in messages})
+
+    def test_command_applies_indexes(self):
+        stdout = StringIO()
+        call_command(
+            "advise_indexes",
+            "--klas",
+            str(Leerjaren.havo_4),
+            "--apply",
+            "--no-input",
+            stdout=stdout,
+        )
+
+        output = stdout.getvalue()
+        self.assertIn("full scan", output)
+        self.assertIn('CREATE INDEX "pta_oc_toetsen_jaar_klas_vak"', output)
+        self.assertEqual(get_missing_indexes(), [])
@@ -0,0 +1,77 @@
+from io import BytesIO
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
+
+from django.test import SimpleTestCase, override_settings
+
+from docx import Document
+
+from ..checks import check_compression
+from ..constants import Compression
+from ..document import initialize_document
+from ..packaging import save_document
+
+
+def save(document, compression: str = "") -> ZipFile:
+    outfile = BytesIO()
+    save_document(document, outfile, compression)
+    return ZipFile(outfile)
+
+
+class SaveDocumentTests(SimpleTestCase):
+    def test_profiles(self):
+        document = initialize_document()
+        document.add_paragraph("Toets " * 1000)
+        sizes = {}
+        for compression in Compression.values:
+            with self.subTest(compression=compression):
+                package = save(document, compression)
+
+                self.assertIsNone(package.testzip())
+                self.assertEqual(
+                    package.getinfo("word/document.xml").compress_type,
+                    ZIP_STORED if compression == Compression.stored else ZIP_DEFLATED,
+                )
+                reopened = Document(package.fp)
+                self.assertEqual(reopened.paragraphs[-1].text, "Toets " * 1000)
+                sizes[compression] = package.fp.getbuffer().nbytes
+
+        self.assertGreater(sizes[Compression.stored], sizes[Compression.fast])
+        self.assertGreater(sizes[Compression.fast], sizes[Compression.max])
+
+    @override_settings(PTA_EXPORT_COMPRESSION=Compression.stored)
+    def test_default_from_settings(self):
+        package = save(initialize_document())
+
+        self.assertEqual(package.getinfo("word/styles.xml").compress_type, ZIP_STORED)
+
+    def test_same_package_as_python_docx(self):
+        document = initialize_document()
+        document.add_paragraph("Toets")
+        expected = BytesIO()
+        document.save(expected)
+        expected = ZipFile(expected)
+
+        package = save(document, Compression.default)
+
+        self.assertEqual(package.namelist(), expected.namelist())
+        for name in expected.namelist():
+            with self.subTest(name=name):
+                self.assertEqual(package.read(name), expected.read(name))
+
+
+class CompressionCheckTests(SimpleTestCase):
+    @override_settings(
+        PTA_EXPORT_COMPRESSION="zip",
+        PTA_EXPORT_ENDPOINT_COMPRESSION={"view": "", "api": "fastest"},
+    )
+    def test_unknown_profiles(self):
+        errors = check_compression(None)
+
+        self.assertEqual(
+            [error.msg for error in errors],
+            [
+                "Unknown compression profile 'zip' in PTA_EXPORT_COMPRESSION",
+                "Unknown compression profile 'fastest' in "
+                "PTA_EXPORT_ENDPOINT_COMPRESSION['api']",
+            ],
+        )
@@ -0,0 +1,86 @@
+import gzip
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from ..performance_log import PRECISION, Histogram
+
+
+def make_line(duration: float, klas: str = "H4", when: str = "2024-11-04") -> str:
+    record = {
+        "event": "export",
+        "klas": klas,
+        "renderer": "legacy",
+        "duration": duration,
+        "size": 2048,
+        "phases": {
+            "fetch": {
+                "duration": duration / 2,
+                "queries": {"ocpta": {"count": 8, "time": 0.1}},
+            },
+            "render": {"duration": duration / 2, "queries": {}},
+        },
+    }
+    return f"{when} 10:00:00,000 123 | 456 | {json.dumps(record)}\n"
+
+
+class HistogramTests(SimpleTestCase):
+    def test_percentiles(self):
+        histogram = Histogram()
+        for value in range(1, 1001):
+            histogram.add(value)
+
+        for percentile in (50, 95, 99):
+            with self.subTest(percentile=percentile):
+                self.assertAlmostEqual(
+                    histogram.percentile(percentile),
+                    percentile * 10,
+                    delta=percentile * 10 * PRECISION,
+                )
+
+
+class AnalyzePerformanceLogTests(SimpleTestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.logdir = Path(tmpdir.name)
+
+        with (self.logdir / "performance.log").open("w") as logfile:
+            logfile.write(make_line(1.0))
+            logfile.write("2024-11-04 10:00:00,000 123 | 456 | not json\n")
+            logfile.write(make_line(0.5, klas="V6"))
+        with gzip.open(self.logdir / "performance.log.1.gz", "wt") as logfile:
+            logfile.write(make_line(3.0, when="2024-10-01"))
+
+    def analyze(self, *args) -> dict:
+        stdout = StringIO()
+        with self.settings(LOGGING_DIR=str(self.logdir)):
+            call_command("analyze_performance_log", "--json", *args, stdout=stdout)
+        return {
+            (row["klas"], row["phase"]): row
+            for row in json.loads(stdout.getvalue())["groups"]
+        }
+
+    def test_report(self):
+        groups = self.analyze()
+
+        total = groups["H4", "total"]
+        self.assertEqual(total["count"], 2)
+        self.assertAlmostEqual(total["duration"]["p50"], 1.0, delta=PRECISION)
+        self.assertEqual(total["duration"]["max"], 3.0)
+        self.assertEqual(total["queries"]["p95"], 8)
+        self.assertEqual(groups["H4", "fetch"]["queries"]["p50"], 8)
+        self.assertNotIn("size", groups["H4", "fetch"])
+        self.assertEqual(groups["V6", "render"]["count"], 1)
+
+    def test_filters(self):
+        groups = self.analyze("--since", "2024-11-01", "--klas", "H4")
+
+        self.assertEqual(
+            set(groups), {("H4", "fetch"), ("H4", "render"), ("H4", "total")}
+        )
+        self.assertEqual(groups["H4", "total"]["count"], 1)
@@ -0,0 +1,102 @@
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from pta_export.accounts.models import User
+from pta_export.utils import cache
+from pta_export.utils.query_budget import QueryBudgetExceeded, query_budget
+
+from ..api import ExportAPIView
+from ..benchmarks.dataset import SCALES, Scale, generate_dataset
+from ..constants import AccessModes, Leerjaren
+from ..export import EXPORT_QUERY_BUDGET, export, get_kalender, get_werken
+from ..models import Kalender, User as PtaUser
+from ..views import ExportView
+from .utils import YEAR, OCPTATablesMixin
+
+
+class ExportQueryCountMixin(OCPTATablesMixin):
+    """
+    Pin the number of queries of export() for every leerjaar.
+    """
+
+    scale: Scale
+
+    @classmethod
+    def setUpTestData(cls):
+        generate_dataset(YEAR, cls.scale, seed=0)
+
+    def test_export_query_count(self):
+        for leerjaar in Leerjaren:
+            if not leerjaar.value:
+                continue
+            with self.subTest(leerjaar=leerjaar.label):
+                cache.clear()
+                with self.assertNumQueries(EXPORT_QUERY_BUDGET, using="ocpta"):
+                    export(YEAR, leerjaar)
+
+    def test_cached_lookups(self):
+        get_kalender(YEAR)
+        get_werken()
+
+        # without the kalender and werken
+        with self.assertNumQueries(EXPORT_QUERY_BUDGET - 2, using="ocpta"):
+            export(YEAR, Leerjaren.havo_4)
+
+
+class SmallExportQueryCountTests(ExportQueryCountMixin, TestCase):
+    scale = SCALES["small"]
+
+
+class LargerExportQueryCountTests(ExportQueryCountMixin, TestCase):
+    scale = Scale(
+        vakken=8, toetsen_per_vak=8, overstappen_per_vak=4, voetnoten_per_vak=3
+    )
+
+
+class QueryBudgetTests(OCPTATablesMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate_dataset(YEAR, SCALES["small"], seed=0)
+        PtaUser.objects.update(access=AccessModes.export_any)
+        cls.user = User.objects.create_user("bench", email="bench@example.com")
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+
+    def test_views_within_budget(self):
+        data = {"jaar": YEAR, "klas": Leerjaren.havo_4}
+        for archive in (False, True, True):
+            for view, url in ((ExportView, "/"), (ExportAPIView, reverse("export"))):
+                with self.subTest(view=view.__name__, archive=archive):
+                    with self.settings(PTA_EXPORT_ARCHIVE=archive):
+                        response = self.client.post(url, data)
+
+                    self.assertEqual(response.status_code, 200)
+                    self.assertIn("attachment", response["Content-Disposition"])
+
+    @override_settings(QUERY_BUDGET_ENFORCE=True)
+    def test_enforced_budget(self):
+        with patch.object(ExportAPIView, "query_budget", {"ocpta": 1}):
+            with self.assertRaisesMessage(QueryBudgetExceeded, "POST /api/export"):
+                self.client.post(reverse("export"), {"jaar": YEAR, "klas": 1})
+
+    @override_settings(QUERY_BUDGET_ENFORCE=False)
+    def test_exceeded_budget_is_logged(self):
+        with self.assertLogs("performance") as logs:
+            with query_budget("kalenders", ocpta=1):
+                list(Kalender.objects.all())
+                list(Kalender.objects.all())
+
+        self.assertIn('"event": "query_budget_exceeded"', logs.output[0])
+
+    @override_settings(
+        QUERY_BUDGET_ENFORCE=True, QUERY_BUDGET_ALIASES={"default": "ocpta"}
+    )
+    def test_aliases_share_budget(self):
+        with self.assertRaisesMessage(QueryBudgetExceeded, "ocpta: 2 > 1"):
+            with query_budget("kalenders", ocpta=1):
+                list(Kalender.objects.all())
+                list(User.objects.all())
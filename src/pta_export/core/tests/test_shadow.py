@@ -0,0 +1,90 @@
+import json
+import threading
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from django.utils import translation
+
+from lxml import etree
+
+from ..benchmarks.dataset import SCALES, generate_dataset
+from ..constants import Leerjaren
+from ..export import create_document, export, fetch_vakken
+from ..shadow import compare_renderers, start_shadow_render
+from .utils import YEAR, OCPTATablesMixin
+
+
+def render_without_last_vak(year, leerjaar, vakken):
+    return create_document(year, leerjaar, vakken[:-1])
+
+
+@override_settings(
+    PTA_EXPORT_RENDERER="shadow",
+    PTA_EXPORT_CANDIDATE_RENDERER="pta_export.core.export.create_document",
+    PTA_EXPORT_SHADOW_SAMPLE_RATE=1.0,
+)
+class ShadowRenderTests(OCPTATablesMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate_dataset(YEAR, SCALES["small"], seed=0)
+
+    def compare(self):
+        vakken = fetch_vakken(YEAR, Leerjaren.havo_4)
+        with translation.override("nl_NL"):
+            legacy = create_document(YEAR, Leerjaren.havo_4, vakken)
+
+        with self.assertLogs("performance") as logs:
+            match = compare_renderers(
+                YEAR, Leerjaren.havo_4, vakken, etree.tostring(legacy.element), 0.1
+            )
+        return match, json.loads(logs.records[0].getMessage())
+
+    def test_identical_output(self):
+        match, record = self.compare()
+
+        self.assertTrue(match)
+        self.assertEqual(record["event"], "shadow_render")
+        self.assertTrue(record["match"])
+        self.assertNotIn("diff", record)
+
+    @override_settings(
+        PTA_EXPORT_CANDIDATE_RENDERER=(
+            "pta_export.core.tests.test_shadow.render_without_last_vak"
+        )
+    )
+    def test_mismatch_is_logged(self):
+        match, record = self.compare()
+
+        self.assertFalse(match)
+        self.assertFalse(record["match"])
+        self.assertIn("--- legacy", record["diff"])
+
+    def test_legacy_document_is_served(self):
+        with patch("pta_export.core.export.start_shadow_render") as mock_start:
+            document = export(YEAR, Leerjaren.havo_4)
+
+        mock_start.assert_called_once()
+        self.assertIs(mock_start.call_args.args[3], document)
+
+    def test_one_shadow_render_at_a_time(self):
+        vakken = fetch_vakken(YEAR, Leerjaren.havo_4)
+        legacy = create_document(YEAR, Leerjaren.havo_4, vakken)
+        started, release = threading.Event(), threading.Event()
+
+        def compare(*args):
+            started.set()
+            release.wait(5)
+
+        with patch("pta_export.core.shadow.compare_renderers", side_effect=compare):
+            thread = start_shadow_render(YEAR, Leerjaren.havo_4, vakken, legacy, 0.1)
+            started.wait(5)
+
+            self.assertIsNone(
+                start_shadow_render(YEAR, Leerjaren.havo_4, vakken, legacy, 0.1)
+            )
+
+            release.set()
+            thread.join(5)
+            thread = start_shadow_render(YEAR, Leerjaren.havo_4, vakken, legacy, 0.1)
+            self.assertIsNotNone(thread)
+            thread.join(5)
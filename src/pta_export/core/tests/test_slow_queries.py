@@ -0,0 +1,82 @@
+from types import SimpleNamespace
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from pta_export.accounts.models import User
+
+from ..models import Kalender
+from ..slow_queries import (
+    SlowQueryWrapper,
+    get_slow_queries,
+    install_slow_query_wrapper,
+    normalize_sql,
+)
+from .utils import OCPTATablesMixin
+
+
+class NormalizeSQLTests(SimpleTestCase):
+    def test_normalize(self):
+        sql = (
+            "SELECT `id`  FROM `toets`\n WHERE `jaar` = 2024 AND `code` = 'a''b' "
+            "AND `vak_id` IN (%s, %s, %s)"
+        )
+
+        self.assertEqual(
+            normalize_sql(sql),
+            "SELECT `id` FROM `toets` WHERE `jaar` = ? AND `code` = ? "
+            "AND `vak_id` IN (...)",
+        )
+
+
+class SlowQueryWrapperTests(SimpleTestCase):
+    def test_ocpta_connections(self):
+        for alias, installed in [
+            ("ocpta", True),
+            ("ocpta_stream", True),
+            ("default", False),
+        ]:
+            with self.subTest(alias=alias):
+                connection = SimpleNamespace(alias=alias, execute_wrappers=[])
+
+                install_slow_query_wrapper(None, connection)
+                # installed once, also when reconnecting
+                install_slow_query_wrapper(None, connection)
+
+                self.assertEqual(
+                    [type(wrapper) for wrapper in connection.execute_wrappers],
+                    [SlowQueryWrapper] if installed else [],
+                )
+
+
+class SlowQueryTests(OCPTATablesMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    @override_settings(PTA_EXPORT_SLOW_QUERY_THRESHOLD=0)
+    def test_queries_are_aggregated(self):
+        with self.assertLogs("performance"):
+            Kalender.objects.filter(jaar=2023).exists()
+            Kalender.objects.filter(jaar=2024).exists()
+
+        [query] = get_slow_queries()
+        self.assertEqual(query["count"], 2)
+        self.assertIn("kalender", query["sql"])
+        for call_site in query["call_sites"]:
+            self.assertIn("test_slow_queries.py", call_site)
+
+    @override_settings(PTA_EXPORT_SLOW_QUERY_THRESHOLD=0)
+    def test_admin_page(self):
+        with self.assertLogs("performance"):
+            Kalender.objects.exists()
+        self.client.force_login(User.objects.create_user("staff", is_staff=True))
+
+        response = self.client.get(reverse("slow-queries"))
+        self.assertContains(response, get_slow_queries()[0]["fingerprint"])
+
+        response = self.client.post(reverse("slow-queries"))
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(get_slow_queries(), [])
@@ -0,0 +1,182 @@
+import csv
+from io import BytesIO, StringIO
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from openpyxl import load_workbook
+
+from pta_export.accounts.models import User
+from pta_export.utils import cache
+
+from ..benchmarks.dataset import SCALES, generate_dataset
+from ..constants import AccessModes, ExportFormats, Leerjaren
+from ..export import (
+    EXPORT_QUERY_BUDGET,
+    VAK_EXPORT_LEERJAREN,
+    fetch_vak_leerjaren,
+    fetch_vakken,
+    get_kalender,
+)
+from ..models import Toets, User as PtaUser, Vak
+from ..spreadsheet import (
+    export_spreadsheet,
+    export_vak_spreadsheet,
+    get_sheet_title,
+    get_tables,
+)
+from .utils import YEAR, OCPTATablesMixin
+
+
+class SpreadsheetExportTests(OCPTATablesMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate_dataset(YEAR, SCALES["small"], seed=0)
+
+    def test_xlsx(self):
+        vakken = [vak for vak in fetch_vakken(YEAR, Leerjaren.havo_4) if vak.toetsen]
+        outfile = BytesIO()
+
+        cache.clear()
+        with self.assertNumQueries(EXPORT_QUERY_BUDGET, using="ocpta"):
+            export_spreadsheet(YEAR, Leerjaren.havo_4, outfile, ExportFormats.xlsx)
+
+        workbook = load_workbook(outfile, read_only=True)
+        self.assertEqual(len(workbook.sheetnames), len(vakken))
+        rows = list(workbook.worksheets[0].values)
+        self.assertEqual(rows[0], ("Toetsen",))
+        self.assertEqual(rows[1][0], "Code")
+        self.assertEqual(rows[1][-1], "Voetnoot")
+        self.assertEqual(
+            [row[0] for row in rows[2 : 2 + len(vakken[0].toetsen)]],
+            [toets.code for toets in vakken[0].toetsen],
+        )
+
+    def test_csv(self):
+        vakken = fetch_vakken(YEAR, Leerjaren.havo_4)
+        outfile = BytesIO()
+
+        export_spreadsheet(YEAR, Leerjaren.havo_4, outfile, ExportFormats.csv)
+
+        rows = list(csv.reader(StringIO(outfile.getvalue().decode())))
+        toetsen = [row for row in rows if row[2] == "Toetsen"]
+        self.assertEqual(len(toetsen), sum(len(vak.toetsen) for vak in vakken))
+        self.assertEqual(rows[0][:4], ["Vak", "Klas", "Tabel", "Code"])
+        self.assertEqual({row[1] for row in toetsen}, {"4 havo"})
+
+    def test_formulas_are_written_as_text(self):
+        toets = Toets.objects.filter(jaar=YEAR, klas=Leerjaren.havo_4).first()
+        Toets.objects.filter(pk=toets.pk).update(omschrijving="=1+1", code="@SUM(A1)")
+
+        outfile = BytesIO()
+        export_spreadsheet(YEAR, Leerjaren.havo_4, outfile, ExportFormats.xlsx)
+
+        cells = {
+            cell.value: cell.data_type
+            for worksheet in load_workbook(outfile).worksheets
+            for row in worksheet.iter_rows()
+            for cell in row
+            if cell.value is not None
+        }
+        self.assertEqual(cells["=1+1\ndatum: 31 oktober 2024"], "s")
+        self.assertEqual(cells["@SUM(A1)"], "s")
+        self.assertNotIn("f", cells.values())
+
+        outfile = BytesIO()
+        export_spreadsheet(YEAR, Leerjaren.havo_4, outfile, ExportFormats.csv)
+
+        values = {
+            value
+            for row in csv.reader(StringIO(outfile.getvalue().decode()))
+            for value in row
+        }
+        self.assertIn("'=1+1\ndatum: 31 oktober 2024", values)
+        self.assertIn("'@SUM(A1)", values)
+
+    @override_settings(PTA_EXPORT_STREAM_TOETSEN=True)
+    def test_streamed(self):
+        expected = BytesIO()
+        with override_settings(PTA_EXPORT_STREAM_TOETSEN=False):
+            export_spreadsheet(YEAR, Leerjaren.havo_4, expected, ExportFormats.csv)
+        outfile = BytesIO()
+
+        export_spreadsheet(YEAR, Leerjaren.havo_4, outfile, ExportFormats.csv)
+
+        self.assertEqual(outfile.getvalue(), expected.getvalue())
+
+    def test_vak(self):
+        vak = Vak.objects.order_by("id").first()
+        toetsweek_periodes = get_kalender(YEAR).toetsweek_periodes
+        leerjaren = [
+            Leerjaren(leerjaar).label.replace("/", "-")
+            for leerjaar, leerjaar_vak in fetch_vak_leerjaren(YEAR, vak.id).items()
+            if get_tables(leerjaar_vak, leerjaar, toetsweek_periodes)
+        ]
+        outfile = BytesIO()
+
+        export_vak_spreadsheet(YEAR, vak.id, outfile, ExportFormats.xlsx)
+
+        workbook = load_workbook(outfile, read_only=True)
+        self.assertEqual(workbook.sheetnames, leerjaren)
+        self.assertGreater(len(leerjaren), 1)
+
+    def test_overstappers_tables(self):
+        toetsweek_periodes = get_kalender(YEAR).toetsweek_periodes
+        tables = {
+            table.title: table
+            for leerjaar in VAK_EXPORT_LEERJAREN
+            if leerjaar in (Leerjaren.overstappers_vwo_5, Leerjaren.overstappers_vwo_6)
+            for vak in fetch_vakken(YEAR, leerjaar)
+            for table in get_tables(vak, leerjaar, toetsweek_periodes)
+        }
+
+        self.assertTrue(tables)
+        for table in tables.values():
+            with self.subTest(table=table.title):
+                self.assertTrue(table.rows)
+                self.assertTrue(
+                    all(len(row) == len(table.header) for row in table.rows)
+                )
+
+
+class SheetTitleTests(SimpleTestCase):
+    def test_titles(self):
+        used = set()
+
+        self.assertEqual(get_sheet_title("Wiskunde A/B", used), "Wiskunde A-B")
+        self.assertEqual(get_sheet_title("wiskunde a-b", used), "wiskunde a-b (2)")
+        self.assertEqual(get_sheet_title(" ", used), "PTA")
+        self.assertEqual(len(get_sheet_title("x" * 40, used)), 31)
+
+
+class SpreadsheetViewTests(OCPTATablesMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate_dataset(YEAR, SCALES["small"], seed=0)
+        PtaUser.objects.update(access=AccessModes.export_any)
+        cls.user = User.objects.create_user("bench", email="bench@example.com")
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+
+    def test_formats(self):
+        data = {"jaar": YEAR, "klas": Leerjaren.havo_4, "format": ExportFormats.xlsx}
+        for url in ("/", reverse("export")):
+            with self.subTest(url=url):
+                response = self.client.post(url, data)
+
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(
+                    response["Content-Disposition"],
+                    'attachment; filename="2024-H4.xlsx"',
+                )
+                self.assertTrue(response.content.startswith(b"PK"))
+
+        vak = Vak.objects.order_by("id").first()
+        response = self.client.post(
+            reverse("export-vak"),
+            {"jaar": YEAR, "vak": vak.id, "format": ExportFormats.csv},
+        )
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertTrue(response.content.startswith(b"Vak,Klas,Tabel"))
@@ -0,0 +1,41 @@
+import json
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase
+
+from ..management.commands.startup_profile import parse_importtime
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     docx.shared
+import time:       300 |        420 |   docx
+import time:        80 |         80 | pta_export.core
+"""
+
+
+class StartupProfileTests(SimpleTestCase):
+    def test_parse_importtime(self):
+        imports = parse_importtime(IMPORTTIME)
+
+        self.assertEqual(
+            [(i.module, i.self_us, i.cumulative_us) for i in imports],
+            [
+                ("docx.shared", 120, 120),
+                ("docx", 300, 420),
+                ("pta_export.core", 80, 80),
+            ],
+        )
+
+    def test_report(self):
+        stdout = StringIO()
+        call_command("startup_profile", "--json", "--limit", "5", stdout=stdout)
+
+        report = json.loads(stdout.getvalue())
+        self.assertEqual(set(report["timings"]), {"setup", "preload"})
+        self.assertEqual(len(report["modules"]), 5)
+        self.assertIn("django", report["packages"])
+
+    def test_budget(self):
+        with self.assertRaisesMessage(CommandError, "over the budget"):
+            call_command("startup_profile", "--budget", "0", stdout=StringIO())
@@ -0,0 +1,68 @@
+from django.test import TestCase, override_settings
+
+from pta_export.utils import cache
+
+from .. import timing
+from ..benchmarks.dataset import SCALES, generate_dataset
+from ..constants import Leerjaren
+from ..export import (
+    EXPORT_QUERY_BUDGET,
+    count_rows,
+    export,
+    fetch_vakken,
+    stream_vakken,
+)
+from ..normalize import get_document_xml
+from .utils import YEAR, OCPTATablesMixin
+
+
+@override_settings(PTA_EXPORT_STREAM_CHUNK_SIZE=3)
+class StreamVakkenTests(OCPTATablesMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate_dataset(YEAR, SCALES["small"], seed=0)
+
+    def test_same_document(self):
+        for leerjaar in Leerjaren:
+            if not leerjaar.value:
+                continue
+            with self.subTest(leerjaar=leerjaar.label):
+                expected = get_document_xml(export(YEAR, leerjaar, stream=False))
+
+                cache.clear()
+                with self.assertNumQueries(EXPORT_QUERY_BUDGET, using="ocpta"):
+                    document = export(YEAR, leerjaar, stream=True)
+
+                self.assertEqual(get_document_xml(document), expected)
+
+    def test_same_vakken(self):
+        expected = [
+            (vak.id, [(toets.id, toets.soortwerk) for toets in vak.toetsen])
+            for vak in fetch_vakken(YEAR, Leerjaren.havo_4)
+        ]
+
+        streamed = [
+            (vak.id, [(toets.id, toets.soortwerk) for toets in vak.toetsen])
+            for vak in stream_vakken(YEAR, Leerjaren.havo_4)
+        ]
+
+        self.assertEqual(streamed, expected)
+
+    def test_toetsen_are_released(self):
+        vakken = stream_vakken(YEAR, Leerjaren.havo_4)
+        first = next(vakken)
+        self.assertTrue(first.toetsen)
+
+        next(vakken)
+
+        self.assertEqual(first.toetsen, [])
+
+    @override_settings(PTA_EXPORT_STREAM_TOETSEN=True)
+    def test_timing(self):
+        vakken = fetch_vakken(YEAR, Leerjaren.havo_4)
+        with timing.track(YEAR, Leerjaren.havo_4) as export_timing:
+            export(YEAR, Leerjaren.havo_4)
+
+        self.assertEqual(export_timing.vakken, len(vakken))
+        self.assertEqual(export_timing.rows, count_rows(vakken))
+        self.assertNotIn("fetch", export_timing.phases)
@@ -0,0 +1,69 @@
+import json
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..benchmarks.dataset import SCALES, generate_dataset
+from ..constants import Leerjaren
+from ..views import get_export_response
+from .utils import YEAR, OCPTATablesMixin
+
+
+@override_settings(PTA_EXPORT_ARCHIVE=False, PTA_EXPORT_METRICS_TOKEN="secret")
+class ExportTimingTests(OCPTATablesMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate_dataset(YEAR, SCALES["small"], seed=0)
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_export_is_timed(self):
+        with self.assertLogs("performance") as logs:
+            response = get_export_response(YEAR, Leerjaren.havo_4)
+
+        server_timing = response["Server-Timing"]
+        for name in ("fetch", "render", "save", "db-ocpta", "total"):
+            with self.subTest(name=name):
+                self.assertIn(f"{name};dur=", server_timing)
+
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record["event"], "export")
+        self.assertEqual(record["klas"], "H4")
+        self.assertEqual(record["renderer"], "legacy")
+        self.assertGreater(record["vakken"], 0)
+        self.assertGreater(record["rows"], record["vakken"])
+        self.assertGreater(record["size"], 0)
+        self.assertEqual(record["phases"]["fetch"]["queries"]["ocpta"]["count"], 9)
+
+    def test_metrics(self):
+        with self.assertLogs("performance"):
+            get_export_response(YEAR, Leerjaren.havo_4)
+
+        response = self.client.get(
+            reverse("metrics"), HTTP_AUTHORIZATION="Bearer secret"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        metrics = response.content.decode()
+        self.assertIn(
+            'pta_export_phase_seconds_bucket{klas="H4",phase="render",le="+Inf"} 1',
+            metrics,
+        )
+        self.assertIn(
+            'pta_export_phase_seconds_count{klas="H4",phase="total"} 1', metrics
+        )
+        self.assertIn('pta_export_queries_total{klas="H4",alias="ocpta"} 10', metrics)
+        self.assertIn(
+            'pta_export_cache_requests_total{tier="shared",result="miss"} 2', metrics
+        )
+
+    def test_metrics_require_authorization(self):
+        for header in ({}, {"HTTP_AUTHORIZATION": "Bearer wrong"}):
+            with self.subTest(header=header):
+                response = self.client.get(reverse("metrics"), **header)
+
+                self.assertEqual(response.status_code, 403)
@@ -0,0 +1,91 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import translation
+
+from pta_export.accounts.models import User
+from pta_export.utils import cache
+
+from ..benchmarks.dataset import SCALES, generate_dataset
+from ..document import add_vak, initialize_document
+from ..export import (
+    EXPORT_VAK_QUERY_BUDGET,
+    PREFETCH_ATTRS,
+    VAK_EXPORT_LEERJAREN,
+    export_vak,
+    fetch_vak_leerjaren,
+    fetch_vakken,
+    get_kalender,
+)
+from ..models import Vak
+from ..normalize import get_document_xml
+from .utils import YEAR, OCPTATablesMixin
+
+
+def get_ids(vak: Vak) -> dict[str, list[int]]:
+    return {attr: [obj.id for obj in getattr(vak, attr)] for attr in PREFETCH_ATTRS}
+
+
+class VakCentricExportTests(OCPTATablesMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate_dataset(YEAR, SCALES["small"], seed=0)
+        cls.vak = Vak.objects.order_by("id").first()
+
+    def test_same_vakken_as_klas_export(self):
+        vakken = fetch_vak_leerjaren(YEAR, self.vak.id)
+
+        self.assertEqual(list(vakken), list(VAK_EXPORT_LEERJAREN))
+        for leerjaar, vak in vakken.items():
+            with self.subTest(leerjaar=leerjaar.label):
+                [expected] = fetch_vakken(YEAR, leerjaar, vak_ids=[self.vak.id])
+                self.assertEqual(get_ids(vak), get_ids(expected))
+                self.assertEqual(
+                    [toets.soortwerk for toets in vak.toetsen],
+                    [toets.soortwerk for toets in expected.toetsen],
+                )
+
+    def test_same_document(self):
+        translation.activate("nl_NL")
+        expected = initialize_document()
+        toetsweek_periodes = get_kalender(YEAR).toetsweek_periodes
+        for leerjaar in VAK_EXPORT_LEERJAREN:
+            [vak] = fetch_vakken(YEAR, leerjaar, vak_ids=[self.vak.id])
+            add_vak(expected, vak, YEAR, leerjaar, toetsweek_periodes)
+        translation.deactivate()
+
+        cache.clear()
+        with self.assertNumQueries(EXPORT_VAK_QUERY_BUDGET, using="ocpta"):
+            document = export_vak(YEAR, self.vak.id)
+
+        self.assertEqual(get_document_xml(document), get_document_xml(expected))
+
+
+@override_settings(PTA_EXPORT_ARCHIVE=True)
+class VakExportAPITests(OCPTATablesMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate_dataset(YEAR, SCALES["small"], seed=0)
+        cls.vak = Vak.objects.order_by("id").first()
+        cls.user = User.objects.create_user("bench", email="bench@example.com")
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+
+    def test_export(self):
+        response = self.client.post(
+            reverse("export-vak"), {"jaar": YEAR, "vak": self.vak.id}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response["Content-Disposition"],
+            f'attachment; filename="{YEAR}-{self.vak.afkorting}.docx"',
+        )
+        self.assertTrue(response.content.startswith(b"PK"))
+
+    def test_unknown_vak(self):
+        response = self.client.post(reverse("export-vak"), {"jaar": YEAR, "vak": 0})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("vak", response.json())
@@ -0,0 +1,136 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from pta_export.accounts.middleware import invalidate_pta_user
+from pta_export.accounts.models import User
+from pta_export.exports.models import ArchivedExport
+from pta_export.utils import cache
+
+from ..benchmarks.dataset import SCALES, generate_dataset
+from ..constants import AccessModes, Leerjaren
+from ..export import EXPORT_QUERY_BUDGET, export, fetch_vakken
+from ..models import User as PtaUser, Vak
+from ..normalize import get_document_xml
+from ..permissions import can_export, get_allowed_vakken
+from .utils import YEAR, OCPTATablesMixin
+
+
+class VakExportTests(OCPTATablesMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate_dataset(YEAR, SCALES["small"], seed=0)
+        cls.vak, cls.other_vak = Vak.objects.order_by("id")[:2]
+
+    def test_fetch_selected_vakken(self):
+        vakken = fetch_vakken(YEAR, Leerjaren.havo_4, vak_ids=[self.vak.id])
+
+        self.assertEqual([vak.id for vak in vakken], [self.vak.id])
+        self.assertTrue(vakken[0].toetsen)
+        self.assertTrue(all(toets.vak_id == self.vak.id for toets in vakken[0].toetsen))
+
+    def test_export_selected_vakken(self):
+        full = get_document_xml(export(YEAR, Leerjaren.havo_4))
+
+        for stream in (False, True):
+            with self.subTest(stream=stream):
+                cache.clear()
+                with self.assertNumQueries(EXPORT_QUERY_BUDGET, using="ocpta"):
+                    document = export(
+                        YEAR, Leerjaren.havo_4, stream=stream, vak_ids=[self.vak.id]
+                    )
+
+                xml = get_document_xml(document)
+                self.assertIn(self.vak.naam, xml)
+                self.assertNotIn(self.other_vak.naam, xml)
+                self.assertLess(len(xml), len(full))
+
+
+class VakPermissionTests(OCPTATablesMixin, TestCase):
+    def test_can_export(self):
+        pta_user = PtaUser(vak1=3, vak2=0, vak5=7)
+
+        self.assertEqual(get_allowed_vakken(pta_user), {3, 7})
+        self.assertTrue(can_export(pta_user, Leerjaren.havo_4, [3, 7]))
+        self.assertFalse(can_export(pta_user, Leerjaren.havo_4, [3, 8]))
+        self.assertFalse(can_export(pta_user, Leerjaren.havo_4))
+        self.assertFalse(can_export(None, Leerjaren.havo_4, [3]))
+
+    def test_access_mode_allows_any_vak(self):
+        pta_user = PtaUser(access=AccessModes.export_any)
+
+        self.assertTrue(can_export(pta_user, Leerjaren.havo_4, [3]))
+        self.assertTrue(can_export(pta_user, Leerjaren.havo_4))
+
+
+@override_settings(PTA_EXPORT_ARCHIVE=True)
+class VakExportViewTests(OCPTATablesMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate_dataset(YEAR, SCALES["small"], seed=0)
+        cls.vak, cls.other_vak = Vak.objects.order_by("id")[:2]
+        # a teacher without access to the klassen
+        PtaUser.objects.update(access=None, vak1=cls.vak.id)
+        cls.user = User.objects.create_user("bench", email="bench@example.com")
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+
+    def test_own_vak(self):
+        data = {"jaar": YEAR, "klas": Leerjaren.havo_4, "vakken": [self.vak.id]}
+        for url in ("/", reverse("export")):
+            with self.subTest(url=url):
+                response = self.client.post(url, data)
+
+                self.assertEqual(response.status_code, 200)
+                self.assertIn("attachment", response["Content-Disposition"])
+
+        self.assertFalse(ArchivedExport.objects.exists())
+
+    def test_other_vak(self):
+        data = {"jaar": YEAR, "klas": Leerjaren.havo_4, "vakken": [self.other_vak.id]}
+
+        response = self.client.post("/", data)
+        self.assertNotIn("Content-Disposition", response)
+        self.assertIn("vakken", response.context["form"].errors)
+
+        response = self.client.post(reverse("export"), data)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("vakken", response.json())
+
+    def test_index_page_without_queries(self):
+        response = self.client.get("/")
+        self.assertEqual(
+            list(response.context["form"].fields["vakken"].choices),
+            [(self.vak.id, self.vak.naam)],
+        )
+
+        # the OCPTA user and the vakken are cached
+        with self.assertNumQueries(0, using="ocpta"):
+            response = self.client.get("/")
+
+        self.assertContains(response, self.vak.naam)
+        self.assertNotContains(response, self.other_vak.naam)
+
+    def test_no_vakken_without_own_vakken(self):
+        PtaUser.objects.update(access=AccessModes.export_any, vak1=0)
+        invalidate_pta_user(self.user.email)
+        self.client.get("/")
+
+        with self.assertNumQueries(0, using="ocpta"):
+            response = self.client.get("/")
+
+        self.assertNotIn("vakken", response.context["form"].fields)
+
+    def test_whole_klas(self):
+        response = self.client.post("/", {"jaar": YEAR, "klas": Leerjaren.havo_4})
+
+        self.assertIn("vakken", response.context["form"].errors)
+
+    def test_unknown_vak(self):
+        data = {"jaar": YEAR, "klas": Leerjaren.havo_4, "vakken": [0]}
+
+        response = self.client.post(reverse("export"), data)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["vakken"], ["Onbekende vakken: 0."])
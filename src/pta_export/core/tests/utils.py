@@ -0,0 +1,157 @@
+"""
+Fixed, in-memory fixture data for the export renderers.
+
+The objects are never saved, the attributes normally populated by the prefetches
+in :func:`pta_export.core.export.get_vakken` are set directly.
+"""
+
+from datetime import date
+
+from pta_export.utils import cache
+
+from ..benchmarks.dataset import ocpta_tables
+from ..constants import ExportModes, Leerjaren, OverstapActies, Sorteringen, Types
+from ..models import Overstap, Toets, Vak, Voetnoot, Werk
+
+YEAR = 2024
+
+TOETSWEEK_PERIODES = {1: [44, 45], 2: [4, 5], 3: [14, 15], 4: [25, 26]}
+
+SCHRIFTELIJK = Werk(id=1, naam="schriftelijk")
+GEEN = Werk(id=12, naam="geen")
+
+
+def make_toets(vak: Vak, klas: int, index: int, **kwargs) -> Toets:
+    defaults = {
+        "id": klas * 100 + index,
+        "jaar": YEAR,
+        "klas": klas,
+        "vak": vak,
+        "type": (Types.T, Types.P, Types.R, Types.H)[index % 4],
+        "code": f"{vak.afkorting}{index:02d}",
+        "omschrijving": f"Hoofdstuk {index} &amp; herhaling\r\nmet verslag",
+        "herkansbaar": 1,
+        "domein": "B1, B2" if index % 2 else None,
+        "week": (44, 48, 4, 14)[index % 4],
+        "lesweek": index + 1,
+        "inleverdatum": date(2024, 11, 1) if index % 3 == 0 else None,
+        "datum": date(2024, 11, 28) if index % 3 == 1 else None,
+        "periode": index % 4 + 1,
+        "soortwerk": GEEN if index % 5 == 4 else SCHRIFTELIJK,
+        "tijd": (50, 100, None)[index % 3],
+        "weging_ed3": index,
+        "weging_ed4": index + 1,
+        "weging_ed5": index + 2,
+        "weging_ed6": index + 3,
+        "weging_r4": index % 3,
+        "se": "SE",
+        "voetnoot": "Inleveren via de ELO" if index % 3 == 2 else "",
+        "vbijt": 0,
+    }
+    return Toets(**{**defaults, **kwargs})
+
+
+def make_vak(leerjaar: int, export_mode: ExportModes = ExportModes.table) -> Vak:
+    """
+    Build a vak with toetsen, voetnoten and overstappen for the given leerjaar.
+    """
+    leerjaren = ["1"] * 40
+    leerjaren[leerjaar] = export_mode.value
+    vak = Vak(
+        id=1,
+        naam="wiskunde &amp; statistiek",
+        afkorting="WIS",
+        sortering=Sorteringen.chronological,
+        weergeven=1,
+        leerjaren="".join(leerjaren),
+    )
+
+    vak.toetsen = [make_toets(vak, leerjaar, index) for index in range(5)]
+    vak.voetnoten = [
+        Voetnoot(
+            id=1, vak=vak, noot="Zie ook het examenreglement.", leerjaren="1" * 40
+        ),
+        Voetnoot(id=2, vak=vak, noot="Wordt niet getoond.", leerjaren="0" * 40),
+    ]
+
+    oude_toetsen = [
+        make_toets(vak, Leerjaren.vwo_4, 0, jaar=YEAR - 2, domein="A"),
+        make_toets(vak, Leerjaren.vwo_5, 1, jaar=YEAR - 1, domein="B1"),
+        make_toets(vak, Leerjaren.havo_4, 2, jaar=YEAR - 1, domein="C"),
+    ]
+    vak.overnemen_herwaarderen = [
+        Overstap(
+            id=1,
+            vak=vak,
+            oude_toets=oude_toetsen[0],
+            actie=OverstapActies.overnemen,
+            weging_ed4=2,
+        ),
+        Overstap(id=2, vak=vak, oude_toets=None, actie=OverstapActies.herwaarderen),
+    ]
+    vak.inhalen = [
+        Overstap(
+            id=3,
+            vak=vak,
+            oude_toets=oude_toetsen[2],
+            actie=OverstapActies.inhalen,
+            weging_ed4=4,
+        ),
+    ]
+    vak.inhaalopdrachten = [
+        make_toets(vak, leerjaar, 9, type=Types.ED6, code="WISINH"),
+    ]
+    vak.h5_toetsen = [make_toets(vak, Leerjaren.havo_5, index) for index in range(4)]
+    vak.overstappen_vwo6 = [
+        Overstap(
+            id=4,
+            vak=vak,
+            oude_toets=oude_toetsen[0],
+            h5_toets=vak.h5_toetsen[0],
+            actie=OverstapActies.overnemen,
+        ),
+        Overstap(
+            id=5,
+            vak=vak,
+            oude_toets=oude_toetsen[1],
+            h5_toets=vak.h5_toetsen[1],
+            actie=OverstapActies.herwaarderen,
+        ),
+        Overstap(
+            id=6,
+            vak=vak,
+            oude_toets=None,
+            h5_toets=vak.h5_toetsen[2],
+            actie=OverstapActies.meemaken,
+        ),
+    ]
+    return vak
+
+
+class OCPTATablesMixin:
+    """
+    Create the unmanaged OCPTA tables for the duration of a test case.
+    """
+
+    databases = {"default", "ocpta"}
+
+    @classmethod
+    def setUpClass(cls):
+        # the tables must be created outside of the transaction of the test case
+        cls._tables = ocpta_tables()
+        cls._tables.__enter__()
+        try:
+            super().setUpClass()
+        except Exception:
+            cls._tables.__exit__(None, None, None)
+            raise
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls._tables.__exit__(None, None, None)
+
+    def setUp(self):
+        super().setUp()
+        # start without cached OCPTA lookups
+        cache.clear()
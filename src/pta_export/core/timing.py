@@ -0,0 +1,168 @@
+"""
+Per-phase timing of the exports.
+
+:func:`track` wraps a single export request. While it is active, the code paths
+of the export mark their phases with :func:`phase`, which records the wall time
+and the queries per database alias. Outside of :func:`track` (management
+commands, shadow renders in a background thread) the phases are no-ops.
+"""
+
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.db import connections
+
+from ..utils.performance import log_record
+from .constants import LEERJAREN_SHORT
+from .metrics import observe
+
+_local = threading.local()
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    time: float = 0.0
+
+
+@dataclass
+class Phase:
+    duration: float = 0.0
+    queries: dict[str, QueryStats] = field(
+        default_factory=lambda: defaultdict(QueryStats)
+    )
+
+
+@dataclass
+class ExportTiming:
+    jaar: int
+    klas: int
+    renderer: str
+    phases: dict[str, Phase] = field(default_factory=lambda: defaultdict(Phase))
+    duration: float = 0.0
+    vakken: int = 0
+    rows: int = 0
+    size: int = 0
+
+    @contextmanager
+    def phase(self, name: str):
+        phase = self.phases[name]
+        with ExitStack() as stack:
+            for alias in connections:
+                wrapper = QueryWrapper(phase.queries[alias])
+                stack.enter_context(connections[alias].execute_wrapper(wrapper))
+            start = time.perf_counter()
+            try:
+                yield phase
+            finally:
+                phase.duration += time.perf_counter() - start
+
+    def get_queries(self) -> dict[str, QueryStats]:
+        totals = defaultdict(QueryStats)
+        for phase in self.phases.values():
+            for alias, stats in phase.queries.items():
+                totals[alias].count += stats.count
+                totals[alias].time += stats.time
+        return totals
+
+    def as_record(self) -> dict:
+        return {
+            "jaar": self.jaar,
+            "klas": LEERJAREN_SHORT[self.klas],
+            "renderer": self.renderer,
+            "duration": round(self.duration, 6),
+            "vakken": self.vakken,
+            "rows": self.rows,
+            "size": self.size,
+            "phases": {
+                name: {
+                    "duration": round(phase.duration, 6),
+                    "queries": {
+                        alias: {"count": stats.count, "time": round(stats.time, 6)}
+                        for alias, stats in phase.queries.items()
+                        if stats.count
+                    },
+                }
+                for name, phase in self.phases.items()
+            },
+        }
+
+    def get_server_timing(self) -> str:
+        """
+        Format the timing as the value of a ``Server-Timing`` header.
+        """
+        metrics = [
+            f"{name};dur={phase.duration * 1000:.1f}"
+            for name, phase in self.phases.items()
+        ]
+        metrics += [
+            f'db-{alias};dur={stats.time * 1000:.1f};desc="{stats.count} queries"'
+            for alias, stats in self.get_queries().items()
+            if stats.count
+        ]
+        metrics.append(f"total;dur={self.duration * 1000:.1f}")
+        return ", ".join(metrics)
+
+
+class QueryWrapper:
+    def __init__(self, stats: QueryStats):
+        self.stats = stats
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.stats.count += 1
+            self.stats.time += time.perf_counter() - start
+
+
+def get_renderer() -> str:
+    if settings.PTA_EXPORT_RENDERER == "candidate":
+        return settings.PTA_EXPORT_CANDIDATE_RENDERER
+    return "legacy"
+
+
+def get_current() -> ExportTiming | None:
+    return getattr(_local, "timing", None)
+
+
+@contextmanager
+def track(jaar: int, klas: int):
+    """
+    Time an export and report it to the performance log and the metrics.
+    """
+    timing = ExportTiming(jaar=jaar, klas=klas, renderer=get_renderer())
+    _local.timing = timing
+    start = time.perf_counter()
+    try:
+        yield timing
+    finally:
+        timing.duration = time.perf_counter() - start
+        _local.timing = None
+
+    log_record("export", **timing.as_record())
+    observe(timing)
+
+
+@contextmanager
+def phase(name: str):
+    timing = get_current()
+    if timing is None:
+        yield None
+        return
+    with timing.phase(name) as _phase:
+        yield _phase
+
+
+def record(**values) -> None:
+    """
+    Add counts (vakken, rows, size) to the timing of the current export, if any.
+    """
+    if (timing := get_current()) is not None:
+        for name, value in values.items():
+            setattr(timing, name, getattr(timing, name) + value)
@@ -1,42 +1,350 @@
+import asyncio
+import os
+from collections.abc import Collection
+from functools import partial
 from io import BytesIO
+from tempfile import SpooledTemporaryFile
+from urllib.parse import quote
 
+from django.conf import settings
+from django.contrib import admin
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.http import FileResponse
-from django.views.generic import FormView
+from django.core.exceptions import PermissionDenied
+from django.http import FileResponse, HttpResponse
+from django.shortcuts import redirect
+from django.utils.crypto import constant_time_compare
+from django.views import View
+from django.views.generic import FormView, TemplateView
 
-from .constants import LEERJAREN_SHORT
-from .export import export
+from asgiref.sync import sync_to_async
+
+from pta_export.exports.archive import open_archived_export, write_export
+from pta_export.exports.models import ProfileSources
+from pta_export.exports.profiling import profile_export
+
+from . import timing
+from .constants import LEERJAREN_SHORT, ExportFormats
+from .executor import run_in_executor
+from .export import export, export_vak
+from .fingerprints import get_fingerprint
 from .forms import ExportForm
+from .metrics import render_metrics
+from .models import Vak
+from .packaging import save_document
+from .slow_queries import get_slow_queries, reset_slow_queries
+from .spreadsheet import export_spreadsheet, export_vak_spreadsheet
+
+DOCX_CONTENT_TYPE = (
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+)
+
+CONTENT_TYPES = {
+    ExportFormats.docx: DOCX_CONTENT_TYPE,
+    ExportFormats.xlsx: (
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    ),
+    ExportFormats.csv: "text/csv; charset=utf-8",
+}
+
+
+def get_export_response(
+    jaar: int, leerjaar: int, compression: str = "", vak_ids: list[int] | None = None
+):
+    """
+    Respond with the archived export, or render it with the given compression
+    profile when the archive is disabled.
+
+    Exports of a selection of vakken (``vak_ids``) are not archived.
+    """
+    with timing.track(jaar, leerjaar) as export_timing:
+        if settings.PTA_EXPORT_ARCHIVE and not vak_ids:
+            with timing.phase("fingerprint"):
+                fingerprint = get_fingerprint(jaar, leerjaar)
+            outfile, size = open_archived_export(jaar, leerjaar, fingerprint)
+            timing.record(size=size)
+        else:
+            outfile = get_spooled_file()
+            write_export(jaar, leerjaar, outfile, compression, vak_ids)
+            timing.record(size=outfile.tell())
+            outfile.seek(0)
+
+    response = get_file_response(outfile, get_filename(jaar, leerjaar))
+    response["Server-Timing"] = export_timing.get_server_timing()
+    return response
 
 
-def get_export_response(jaar: int, leerjaar: int):
-    _leerjaar = LEERJAREN_SHORT[leerjaar]
+def get_profiled_export_response(
+    jaar: int,
+    leerjaar: int,
+    source: str,
+    user,
+    compression: str = "",
+    vak_ids: list[int] | None = None,
+):
+    """
+    Render the export under the profiler, bypassing the archive.
+    """
+    with profile_export(jaar, leerjaar, source, user=user):
+        document = export(jaar, leerjaar, vak_ids=vak_ids)
+        outfile = get_spooled_file()
+        save_document(document, outfile, compression)
+    outfile.seek(0)
+    return get_file_response(outfile, get_filename(jaar, leerjaar))
 
-    document = export(jaar, leerjaar)
 
-    outfile = BytesIO()
-    document.save(outfile)
+def get_spreadsheet_response(
+    jaar: int, leerjaar: int, file_format: str, vak_ids: list[int] | None = None
+):
+    """
+    Write the table data of the export as spreadsheet, see
+    :mod:`pta_export.core.spreadsheet`. Spreadsheets are not archived.
+    """
+    outfile = get_spooled_file()
+    export_spreadsheet(jaar, leerjaar, outfile, file_format, vak_ids)
     outfile.seek(0)
+    return get_file_response(
+        outfile, get_filename(jaar, leerjaar, file_format), CONTENT_TYPES[file_format]
+    )
 
-    response = FileResponse(
+
+def get_vak_export_response(
+    jaar: int,
+    vak: Vak,
+    leerjaren: Collection[int],
+    compression: str = "",
+    file_format: str = ExportFormats.docx,
+):
+    """
+    Render the export of a vak for the given leerjaren, see
+    :func:`pta_export.core.export.export_vak`. These exports are not archived.
+    """
+    outfile = get_spooled_file()
+    if file_format == ExportFormats.docx:
+        document = export_vak(jaar, vak.id, leerjaren)
+        save_document(document, outfile, compression)
+    else:
+        export_vak_spreadsheet(jaar, vak.id, outfile, file_format, leerjaren)
+    outfile.seek(0)
+    return get_file_response(
         outfile,
-        as_attachment=True,
-        filename=f"{jaar}-{_leerjaar}.docx",
-        content_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        f"{jaar}-{vak.afkorting or vak.id}.{file_format}",
+        CONTENT_TYPES[file_format],
     )
+
+
+def get_spooled_file() -> SpooledTemporaryFile:
+    return SpooledTemporaryFile(max_size=settings.PTA_EXPORT_SPOOL_MAX_SIZE)
+
+
+def is_in_memory(outfile) -> bool:
+    if isinstance(outfile, SpooledTemporaryFile):
+        return not outfile._rolled
+    return isinstance(outfile, BytesIO)
+
+
+def get_sendfile_path(outfile) -> str | None:
+    """
+    Return the value of the sendfile header for files in the private media storage.
+    """
+    if not settings.PTA_EXPORT_SENDFILE_HEADER:
+        return None
+    try:
+        path = outfile.path
+    except (AttributeError, NotImplementedError):
+        return None
+
+    if not (url := settings.PTA_EXPORT_SENDFILE_URL):
+        return path
+    relative_path = os.path.relpath(path, settings.PRIVATE_MEDIA_ROOT)
+    return f"{url.rstrip('/')}/{quote(relative_path)}"
+
+
+def get_filename(
+    jaar: int, leerjaar: int, file_format: str = ExportFormats.docx
+) -> str:
+    return f"{jaar}-{LEERJAREN_SHORT[leerjaar]}.{file_format}"
+
+
+def get_content_disposition(filename: str) -> str:
+    """
+    Return the attachment header for the filename, encoded like ``FileResponse``.
+    """
+    try:
+        filename.encode("ascii")
+    except UnicodeEncodeError:
+        return f"attachment; filename*=utf-8''{quote(filename)}"
+    escaped = filename.replace("\\", "\\\\").replace('"', r"\"")
+    return f'attachment; filename="{escaped}"'
+
+
+def get_file_response(
+    outfile, filename: str, content_type: str = DOCX_CONTENT_TYPE
+) -> HttpResponse:
+    """
+    Hand the export to the web server as directly as possible.
+
+    Archived exports are sent by the web server with ``PTA_EXPORT_SENDFILE_HEADER``,
+    and files on disk are streamed with ``FileResponse`` (through the
+    ``wsgi.file_wrapper`` where the server enables it). Exports still in memory are
+    returned as a whole, the file wrapper would first write them to disk.
+    """
+    if path := get_sendfile_path(outfile):
+        outfile.close()
+        response = HttpResponse(content_type=content_type)
+        response[settings.PTA_EXPORT_SENDFILE_HEADER] = path
+    elif is_in_memory(outfile):
+        with outfile:
+            response = HttpResponse(outfile.read(), content_type=content_type)
+    else:
+        return FileResponse(
+            outfile,
+            as_attachment=True,
+            filename=filename,
+            content_type=content_type,
+        )
+    response["Content-Disposition"] = get_content_disposition(filename)
     return response
 
 
-class ExportView(LoginRequiredMixin, FormView):
+class ExportResponseMixin:
+    # key of the compression profile in PTA_EXPORT_ENDPOINT_COMPRESSION
+    endpoint = ""
+
+    def get_compression(self) -> str:
+        return settings.PTA_EXPORT_ENDPOINT_COMPRESSION.get(self.endpoint, "")
+
+    def get_export_response(self, func, *args):
+        return func(*args)
+
+
+class AsyncExportMixin:
+    """
+    Validate the request in a thread like the sync view, but render the export in
+    the render executor, see :mod:`pta_export.core.executor`.
+
+    The HTTP handlers are coroutines, so Django serves the view as async view. A
+    subclass that adds a sync handler is rejected with ``ImproperlyConfigured``.
+
+    The queries of the export itself are not part of the ``query_budget`` of the
+    view, :func:`pta_export.core.export.export` has its own budget.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        # the checks before the handler (e.g. the login) query the database
+        response = await sync_to_async(super().dispatch)(request, *args, **kwargs)
+        if asyncio.iscoroutine(response):
+            response = await response
+        return response
+
+    def get_export_response(self, func, *args):
+        # called by the sync view code, the export is rendered by run_handler
+        return partial(func, *args)
+
+    async def run_handler(self, handler, request, *args, **kwargs):
+        """
+        Run the sync ``handler`` in a thread, and render the export it returned.
+        """
+        response = await sync_to_async(handler)(request, *args, **kwargs)
+        if isinstance(response, partial):
+            response = await run_in_executor(response)
+        return response
+
+    async def post(self, request, *args, **kwargs):
+        return await self.run_handler(super().post, request, *args, **kwargs)
+
+
+class ExportView(ExportResponseMixin, LoginRequiredMixin, FormView):
     form_class = ExportForm
     template_name = "export.html"
+    endpoint = "view"
+    # includes rendering and archiving the export on a fingerprint change
+    query_budget = {"default": 10, "ocpta": 16}
 
     def get_form_kwargs(self):
         kwargs = super().get_form_kwargs()
         kwargs["pta_user"] = self.request.pta_user
+        kwargs["user"] = self.request.user
         return kwargs
 
     def form_valid(self, form: ExportForm):
         jaar = form.cleaned_data["jaar"]
         leerjaar = form.cleaned_data["klas"]
-        return get_export_response(jaar, leerjaar)
+        vak_ids = form.cleaned_data.get("vakken") or None
+        file_format = form.cleaned_data["format"]
+        if file_format != ExportFormats.docx:
+            return self.get_export_response(
+                get_spreadsheet_response, jaar, leerjaar, file_format, vak_ids
+            )
+        if form.cleaned_data.get("profile"):
+            return self.get_export_response(
+                get_profiled_export_response,
+                jaar,
+                leerjaar,
+                ProfileSources.view,
+                self.request.user,
+                self.get_compression(),
+                vak_ids,
+            )
+        return self.get_export_response(
+            get_export_response, jaar, leerjaar, self.get_compression(), vak_ids
+        )
+
+
+class AsyncExportView(AsyncExportMixin, ExportView):
+    # PUT is handled by the sync post of ProcessFormView
+    http_method_names = ["get", "post", "head", "options"]
+
+    async def get(self, request, *args, **kwargs):
+        return await self.run_handler(super().get, request, *args, **kwargs)
+
+
+class MetricsView(View):
+    """
+    Expose the export metrics to Prometheus.
+
+    Access requires a staff user or the ``PTA_EXPORT_METRICS_TOKEN`` as bearer
+    token.
+    """
+
+    def has_access(self) -> bool:
+        if self.request.user.is_staff:
+            return True
+        token = settings.PTA_EXPORT_METRICS_TOKEN
+        header = self.request.headers.get("Authorization", "")
+        return bool(token) and constant_time_compare(header, f"Bearer {token}")
+
+    def get(self, request, *args, **kwargs):
+        if not self.has_access():
+            raise PermissionDenied
+        return HttpResponse(
+            render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8"
+        )
+
+
+class SlowQueriesView(TemplateView):
+    """
+    List the slow OCPTA queries. Wrap this in ``AdminSite.admin_view``.
+    """
+
+    template_name = "admin/slow_queries.html"
+
+    def dispatch(self, request, *args, **kwargs):
+        if not request.user.is_staff:
+            raise PermissionDenied
+        return super().dispatch(request, *args, **kwargs)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update(
+            {
+                **admin.site.each_context(self.request),
+                "title": "Slow queries",
+                "threshold": settings.PTA_EXPORT_SLOW_QUERY_THRESHOLD,
+                "queries": get_slow_queries(),
+            }
+        )
+        return context
+
+    def post(self, request, *args, **kwargs):
+        reset_slow_queries()
+        return redirect(request.path)
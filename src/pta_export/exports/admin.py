@@ -0,0 +1,134 @@
+from django.contrib import admin
+from django.core.exceptions import PermissionDenied
+from django.http import FileResponse
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html
+
+from .models import ArchivedExport, ExportProfile, PrerenderStatus
+
+
+class DownloadMixin:
+    """
+    Add a permission-checked download view for the private ``file`` of an object.
+    """
+
+    def get_download_url_name(self) -> str:
+        opts = self.model._meta
+        return f"{opts.app_label}_{opts.model_name}_download"
+
+    @admin.display(description="download")
+    def download_link(self, obj) -> str:
+        url = reverse(f"admin:{self.get_download_url_name()}", args=(obj.pk,))
+        return format_html('<a href="{}">{}</a>', url, obj.filename)
+
+    def get_urls(self):
+        urls = [
+            path(
+                "<int:pk>/download/",
+                self.admin_site.admin_view(self.download_view),
+                name=self.get_download_url_name(),
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def download_view(self, request, pk: int):
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        obj = get_object_or_404(self.model, pk=pk)
+        return FileResponse(
+            obj.file.open("rb"), as_attachment=True, filename=obj.filename
+        )
+
+
+@admin.register(ArchivedExport)
+class ArchivedExportAdmin(DownloadMixin, admin.ModelAdmin):
+    list_display = (
+        "jaar",
+        "klas",
+        "short_fingerprint",
+        "source",
+        "size",
+        "render_time",
+        "rendered",
+        "download_link",
+    )
+    list_filter = ("source", "jaar", "klas")
+    ordering = ("-rendered",)
+    readonly_fields = (
+        "jaar",
+        "klas",
+        "fingerprint",
+        "size",
+        "render_time",
+        "source",
+        "rendered",
+        "download_link",
+    )
+    fields = readonly_fields
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description="fingerprint")
+    def short_fingerprint(self, obj: ArchivedExport) -> str:
+        return obj.fingerprint[:12]
+
+
+@admin.register(ExportProfile)
+class ExportProfileAdmin(DownloadMixin, admin.ModelAdmin):
+    list_display = (
+        "jaar",
+        "klas",
+        "source",
+        "user",
+        "duration",
+        "peak_memory",
+        "num_queries",
+        "query_time",
+        "created",
+        "download_link",
+    )
+    list_filter = ("source", "jaar", "klas")
+    ordering = ("-created",)
+    readonly_fields = (
+        "jaar",
+        "klas",
+        "source",
+        "user",
+        "duration",
+        "peak_memory",
+        "num_queries",
+        "query_time",
+        "created",
+        "download_link",
+    )
+    fields = readonly_fields
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(PrerenderStatus)
+class PrerenderStatusAdmin(admin.ModelAdmin):
+    list_display = (
+        "worker",
+        "last_poll",
+        "last_poll_duration",
+        "backoff",
+        "num_rendered",
+        "last_error",
+    )
+    ordering = ("-last_poll",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
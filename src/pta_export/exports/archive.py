@@ -0,0 +1,190 @@
+import logging
+import time
+from functools import partial
+from io import BytesIO
+from typing import IO
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.files.base import ContentFile
+from django.db import transaction
+
+from pta_export.core import timing
+from pta_export.core.constants import LEERJAREN_SHORT
+from pta_export.core.export import export, invalidate_lookups
+from pta_export.core.packaging import save_document
+from pta_export.utils.cache import count
+
+from . import render_pool
+from .models import ArchivedExport, ExportSources
+
+logger = logging.getLogger(__name__)
+
+
+def get_artifact_key(jaar: int, leerjaar: int, fingerprint: str) -> str:
+    return f"export:{jaar}:{leerjaar}:{fingerprint}"
+
+
+def get_cached_export(jaar: int, leerjaar: int, fingerprint: str) -> bytes | None:
+    """
+    Get the content of an archived export from the shared artifact cache.
+
+    This saves the database lookup and reading the file from storage, which does not
+    need to be shared between the nodes.
+    """
+    if not (alias := settings.PTA_EXPORT_ARTIFACT_CACHE):
+        return None
+    with timing.phase("lookup"):
+        content = caches[alias].get(get_artifact_key(jaar, leerjaar, fingerprint))
+    count("exports", content is not None)
+    return content
+
+
+def cache_export(jaar: int, leerjaar: int, fingerprint: str, content: bytes) -> None:
+    alias = settings.PTA_EXPORT_ARTIFACT_CACHE
+    if not alias or len(content) > settings.PTA_EXPORT_ARTIFACT_CACHE_MAX_SIZE:
+        return
+    with timing.phase("store"):
+        caches[alias].set(get_artifact_key(jaar, leerjaar, fingerprint), content)
+
+
+def write_export(
+    jaar: int,
+    leerjaar: int,
+    outfile: IO[bytes],
+    compression: str = "",
+    vak_ids: list[int] | None = None,
+    invalidate: bool = False,
+) -> None:
+    """
+    Render the export into ``outfile``, in the render pool when it's configured.
+
+    The export is rendered locally when the connection to the pool fails: it is not
+    running, or the worker is recycled or killed during the render. These are raised
+    instead:
+
+    - :class:`~pta_export.exports.render_pool.RenderError`: the render itself
+      failed, and would fail the same way locally.
+    - :class:`TimeoutError`: the render took ``PTA_EXPORT_RENDER_TIMEOUT`` seconds
+      already, rendering it again locally would double the wait.
+
+    With ``invalidate``, the cached kalender and werken are dropped before
+    rendering, in this process as well as in the render pool worker.
+    """
+    if invalidate:
+        invalidate_lookups(jaar)
+    if settings.PTA_EXPORT_RENDER_SOCKET:
+        try:
+            with timing.phase("render"):
+                content = render_pool.render(
+                    jaar, leerjaar, compression, vak_ids, invalidate=invalidate
+                )
+        except TimeoutError:
+            raise
+        except OSError as exc:
+            logger.warning(
+                "Render pool at %s failed (%r), rendering locally",
+                settings.PTA_EXPORT_RENDER_SOCKET,
+                exc,
+            )
+        else:
+            outfile.write(content)
+            return
+
+    document = export(jaar, leerjaar, vak_ids=vak_ids)
+    with timing.phase("save"):
+        save_document(document, outfile, compression)
+
+
+def render_export(
+    jaar: int, leerjaar: int, compression: str = "", invalidate: bool = False
+) -> bytes:
+    outfile = BytesIO()
+    write_export(jaar, leerjaar, outfile, compression, invalidate=invalidate)
+    return outfile.getvalue()
+
+
+def get_archived_export(
+    jaar: int, leerjaar: int, fingerprint: str
+) -> ArchivedExport | None:
+    with timing.phase("lookup"):
+        return ArchivedExport.objects.filter(
+            jaar=jaar, klas=leerjaar, fingerprint=fingerprint
+        ).first()
+
+
+def archive_export(
+    jaar: int,
+    leerjaar: int,
+    fingerprint: str,
+    source: str = ExportSources.request,
+) -> ArchivedExport:
+    """
+    Render the export and store it, replacing any previously archived version.
+
+    The export is rendered while holding the lock on the archive row, so concurrent
+    calls for the same fingerprint render it once: the others wait for the lock and
+    return the stored export. The replaced file is deleted after the commit.
+    """
+    with transaction.atomic():
+        with timing.phase("lookup"):
+            archived, _ = ArchivedExport.objects.select_for_update().get_or_create(
+                jaar=jaar,
+                klas=leerjaar,
+                defaults={"size": 0, "render_time": 0},
+            )
+        if archived.fingerprint == fingerprint and archived.file:
+            return archived
+
+        start = time.monotonic()
+        # a new fingerprint means the OCPTA data changed, don't use cached lookups
+        content = render_export(jaar, leerjaar, invalidate=True)
+        render_time = time.monotonic() - start
+
+        with timing.phase("store"):
+            if old_name := archived.file.name:
+                # requests may still be reading it until the new version is committed
+                transaction.on_commit(partial(archived.file.storage.delete, old_name))
+            archived.fingerprint = fingerprint
+            archived.size = len(content)
+            archived.render_time = render_time
+            archived.source = source
+            archived.file.save(
+                f"{jaar}-{LEERJAREN_SHORT[leerjaar]}-{fingerprint[:12]}.docx",
+                ContentFile(content),
+                save=False,
+            )
+            try:
+                archived.save()
+            except Exception:
+                archived.file.storage.delete(archived.file.name)
+                raise
+
+    cache_export(jaar, leerjaar, fingerprint, content)
+    logger.info(
+        "Archived export %s-%s (%s) in %.2fs",
+        jaar,
+        LEERJAREN_SHORT[leerjaar],
+        source,
+        render_time,
+    )
+    return archived
+
+
+def open_archived_export(jaar: int, leerjaar: int, fingerprint: str) -> tuple[IO, int]:
+    """
+    Open the up to date export, from the artifact cache or the archive, rendering
+    and archiving it when needed. Return the file and its size.
+    """
+    if (content := get_cached_export(jaar, leerjaar, fingerprint)) is not None:
+        return BytesIO(content), len(content)
+
+    if archived := get_archived_export(jaar, leerjaar, fingerprint):
+        if settings.PTA_EXPORT_ARTIFACT_CACHE:
+            with archived.file.open("rb") as infile:
+                content = infile.read()
+            cache_export(jaar, leerjaar, fingerprint, content)
+            return BytesIO(content), len(content)
+    else:
+        archived = archive_export(jaar, leerjaar, fingerprint)
+    return archived.file.open("rb"), archived.size
@@ -0,0 +1,198 @@
+import logging
+import os
+import random
+import socket
+import time
+
+from django.core.management import BaseCommand
+from django.db import DatabaseError, close_old_connections
+from django.utils import timezone
+
+from pta_export.core.constants import LEERJAREN_SHORT
+from pta_export.core.fingerprints import get_fingerprints
+from pta_export.core.models import Kalender
+
+from ...archive import archive_export
+from ...models import ArchivedExport, ExportSources, PrerenderStatus
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Watch the OCPTA data for changes and pre-render the affected exports, so "
+        "that users don't have to wait for them."
+    )
+
+    @staticmethod
+    def add_arguments(parser):
+        parser.add_argument(
+            "--jaar",
+            type=int,
+            action="append",
+            dest="jaren",
+            help=(
+                "Year to watch, can be specified multiple times. Defaults to the "
+                "calendar years starting from the current school year."
+            ),
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=60,
+            help="Seconds between two polls (default: %(default)s).",
+        )
+        parser.add_argument(
+            "--jitter",
+            type=float,
+            default=0.2,
+            help="Random fraction of the interval added to it (default: %(default)s).",
+        )
+        parser.add_argument(
+            "--slow-poll",
+            type=float,
+            default=5,
+            help=(
+                "Polls taking longer than this many seconds are considered a sign "
+                "of a busy database and increase the backoff (default: %(default)s)."
+            ),
+        )
+        parser.add_argument(
+            "--max-backoff",
+            type=float,
+            default=16,
+            help="Maximum multiplier applied to the interval (default: %(default)s).",
+        )
+        parser.add_argument(
+            "--max-load",
+            type=float,
+            default=os.cpu_count() or 1,
+            help=(
+                "Skip rendering while the 1 minute load average is above this value "
+                "(default: %(default)s)."
+            ),
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Poll and render a single time and then exit.",
+        )
+
+    def handle(self, **options):
+        self.options = options
+        self.status, _ = PrerenderStatus.objects.get_or_create(
+            worker=f"{socket.gethostname()}:{os.getpid()}"
+        )
+        try:
+            while True:
+                self.poll()
+                if options["once"]:
+                    break
+                interval = options["interval"] * self.status.backoff
+                interval += random.uniform(0, options["jitter"] * interval)
+                time.sleep(interval)
+        finally:
+            # the connection may have been broken by the error that ended the loop
+            close_old_connections()
+            try:
+                PrerenderStatus.objects.filter(pk=self.status.pk).delete()
+            except DatabaseError:
+                logger.warning(
+                    "Could not delete the status of %s",
+                    self.status.worker,
+                    exc_info=True,
+                )
+
+    def get_jaren(self) -> list[int]:
+        if self.options["jaren"]:
+            return self.options["jaren"]
+        now = timezone.now()
+        # the school year starts in the summer
+        current = now.year if now.month >= 8 else now.year - 1
+        return list(
+            Kalender.objects.filter(jaar__gte=current)
+            .order_by("jaar")
+            .values_list("jaar", flat=True)
+        )
+
+    def poll(self) -> None:
+        close_old_connections()
+        status = self.status
+
+        start = time.monotonic()
+        try:
+            fingerprints = {
+                (jaar, klas): fingerprint
+                for jaar in self.get_jaren()
+                for klas, fingerprint in get_fingerprints(jaar).items()
+            }
+        except Exception as exc:
+            logger.warning("Could not fingerprint the OCPTA data", exc_info=True)
+            self.update_status(
+                backoff=min(status.backoff * 2, self.options["max_backoff"]),
+                last_error=str(exc),
+            )
+            return
+
+        duration = time.monotonic() - start
+        if duration > self.options["slow_poll"]:
+            logger.info("Fingerprinting took %.2fs, backing off", duration)
+            backoff = min(status.backoff * 2, self.options["max_backoff"])
+        else:
+            backoff = 1
+        self.update_status(
+            last_poll=timezone.now(),
+            last_poll_duration=duration,
+            backoff=backoff,
+            last_error="",
+        )
+
+        archived = {
+            (jaar, klas): fingerprint
+            for jaar, klas, fingerprint in ArchivedExport.objects.values_list(
+                "jaar", "klas", "fingerprint"
+            )
+        }
+        stale = [
+            key for key, value in fingerprints.items() if archived.get(key) != value
+        ]
+        for jaar, klas in stale:
+            if os.getloadavg()[0] > self.options["max_load"]:
+                logger.info("System is busy, postponing %d exports", len(stale))
+                return
+
+            try:
+                archive_export(
+                    jaar, klas, fingerprints[jaar, klas], ExportSources.prerender
+                )
+            except DatabaseError as exc:
+                # the database is likely busy, try again after the backoff
+                logger.warning(
+                    "Could not render export %s-%s",
+                    jaar,
+                    LEERJAREN_SHORT[klas],
+                    exc_info=True,
+                )
+                self.update_status(
+                    backoff=min(status.backoff * 2, self.options["max_backoff"]),
+                    last_error=str(exc),
+                )
+                return
+            except Exception as exc:
+                # e.g. a missing Kalender, which only affects this export
+                logger.exception(
+                    "Could not render export %s-%s", jaar, LEERJAREN_SHORT[klas]
+                )
+                self.update_status(
+                    last_error=f"{jaar}-{LEERJAREN_SHORT[klas]}: {exc!r}"
+                )
+                continue
+
+            self.update_status(num_rendered=status.num_rendered + 1)
+            if self.options["verbosity"] >= 2:
+                self.stdout.write(f"Rendered {jaar}-{LEERJAREN_SHORT[klas]}")
+
+    def update_status(self, **fields) -> None:
+        for field, value in fields.items():
+            setattr(self.status, field, value)
+        self.status.save(update_fields=list(fields))
@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from ...render_pool import RenderPool
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the pool of render workers for the web server processes, see "
+        "PTA_EXPORT_RENDER_SOCKET."
+    )
+
+    @staticmethod
+    def add_arguments(parser):
+        parser.add_argument(
+            "--socket",
+            default=settings.PTA_EXPORT_RENDER_SOCKET,
+            help="Path of the Unix socket (default: PTA_EXPORT_RENDER_SOCKET).",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.PTA_EXPORT_RENDER_WORKERS,
+            help="Number of worker processes (default: %(default)s).",
+        )
+        parser.add_argument(
+            "--max-exports",
+            type=int,
+            default=settings.PTA_EXPORT_RENDER_MAX_EXPORTS,
+            help="Replace a worker after this many exports (default: %(default)s).",
+        )
+        parser.add_argument(
+            "--max-rss",
+            type=int,
+            default=settings.PTA_EXPORT_RENDER_MAX_RSS,
+            help=(
+                "Replace a worker when its memory exceeds this many MB "
+                "(default: %(default)s)."
+            ),
+        )
+
+    def handle(self, **options):
+        if not options["socket"]:
+            raise CommandError("No socket given, set PTA_EXPORT_RENDER_SOCKET.")
+        if options["workers"] < 1 or options["max_exports"] < 1:
+            raise CommandError("At least one worker and one export are required.")
+
+        pool = RenderPool(
+            options["socket"],
+            workers=options["workers"],
+            max_exports=options["max_exports"],
+            max_rss=options["max_rss"] * 1024 * 1024,
+        )
+        self.stdout.write(
+            f"Rendering with {pool.workers} workers on {pool.path}, quit with CONTROL-C."
+        )
+        pool.serve_forever()
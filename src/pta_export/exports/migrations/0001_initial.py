@@ -0,0 +1,171 @@
+# Generated by Django 4.1.13 on 2026-10-19 13:30
+
+from django.db import migrations, models
+import pta_export.exports.models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedExport",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("jaar", models.PositiveIntegerField(verbose_name="jaar")),
+                (
+                    "klas",
+                    models.PositiveSmallIntegerField(
+                        choices=[
+                            (0, ""),
+                            (1, "4 havo"),
+                            (2, "5 havo"),
+                            (3, "4 vwo"),
+                            (4, "5 vwo"),
+                            (5, "6 vwo"),
+                            (6, "overstappers vwo 5"),
+                            (7, "overstappers vwo 6"),
+                            (11, "1 havo/vwo"),
+                            (12, "1 gynmasium/atheneum"),
+                            (13, "2 havo/vwo"),
+                            (14, "2 gynmasium/atheneum"),
+                            (15, "3 havo"),
+                            (16, "3 gymnasium/atheneum"),
+                            (21, "1 leerwegondersteunend"),
+                            (22, "1 basis/kader"),
+                            (23, "1 TL/havo"),
+                            (24, "2 leerwegondersteunend"),
+                            (25, "2 basis/kader"),
+                            (26, "2 TL/havo"),
+                            (27, "3 leerwerktraject"),
+                            (28, "3 basis"),
+                            (29, "3 kader"),
+                            (30, "3 theoretisch"),
+                            (32, "4 basis"),
+                            (33, "4 kader"),
+                            (34, "4 theoretisch"),
+                        ],
+                        verbose_name="klas",
+                    ),
+                ),
+                (
+                    "fingerprint",
+                    models.CharField(
+                        help_text="Fingerprint of the OCPTA data the export was rendered from.",
+                        max_length=64,
+                        verbose_name="fingerprint",
+                    ),
+                ),
+                (
+                    "file",
+                    models.FileField(
+                        storage=pta_export.exports.models.get_private_media_storage,
+                        upload_to=pta_export.exports.models.get_export_upload_to,
+                        verbose_name="file",
+                    ),
+                ),
+                (
+                    "size",
+                    models.PositiveIntegerField(
+                        help_text="Size in bytes.", verbose_name="size"
+                    ),
+                ),
+                (
+                    "render_time",
+                    models.FloatField(
+                        help_text="Time taken to render, in seconds.",
+                        verbose_name="render time",
+                    ),
+                ),
+                (
+                    "source",
+                    models.CharField(
+                        choices=[("request", "request"), ("prerender", "prerender")],
+                        max_length=20,
+                        verbose_name="source",
+                    ),
+                ),
+                (
+                    "rendered",
+                    models.DateTimeField(auto_now=True, verbose_name="rendered"),
+                ),
+            ],
+            options={
+                "verbose_name": "archived export",
+                "verbose_name_plural": "archived exports",
+            },
+        ),
+        migrations.CreateModel(
+            name="PrerenderStatus",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "worker",
+                    models.CharField(
+                        help_text="Hostname and process ID of the prerender process.",
+                        max_length=255,
+                        unique=True,
+                        verbose_name="worker",
+                    ),
+                ),
+                (
+                    "last_poll",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="last poll"
+                    ),
+                ),
+                (
+                    "last_poll_duration",
+                    models.FloatField(
+                        default=0,
+                        help_text="Time taken to fingerprint the OCPTA data, in seconds.",
+                        verbose_name="last poll duration",
+                    ),
+                ),
+                (
+                    "backoff",
+                    models.FloatField(
+                        default=1,
+                        help_text="Multiplier applied to the poll interval.",
+                        verbose_name="backoff",
+                    ),
+                ),
+                (
+                    "num_rendered",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="exports rendered"
+                    ),
+                ),
+                ("last_error", models.TextField(blank=True, verbose_name="last error")),
+            ],
+            options={
+                "verbose_name": "prerender status",
+                "verbose_name_plural": "prerender statuses",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="archivedexport",
+            constraint=models.UniqueConstraint(
+                fields=("jaar", "klas"), name="unique_archived_export"
+            ),
+        ),
+    ]
@@ -0,0 +1,130 @@
+# Generated by Django 4.1.13 on 2026-10-19 13:55
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import pta_export.exports.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("exports", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExportProfile",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("jaar", models.PositiveIntegerField(verbose_name="jaar")),
+                (
+                    "klas",
+                    models.PositiveSmallIntegerField(
+                        choices=[
+                            (0, ""),
+                            (1, "4 havo"),
+                            (2, "5 havo"),
+                            (3, "4 vwo"),
+                            (4, "5 vwo"),
+                            (5, "6 vwo"),
+                            (6, "overstappers vwo 5"),
+                            (7, "overstappers vwo 6"),
+                            (11, "1 havo/vwo"),
+                            (12, "1 gynmasium/atheneum"),
+                            (13, "2 havo/vwo"),
+                            (14, "2 gynmasium/atheneum"),
+                            (15, "3 havo"),
+                            (16, "3 gymnasium/atheneum"),
+                            (21, "1 leerwegondersteunend"),
+                            (22, "1 basis/kader"),
+                            (23, "1 TL/havo"),
+                            (24, "2 leerwegondersteunend"),
+                            (25, "2 basis/kader"),
+                            (26, "2 TL/havo"),
+                            (27, "3 leerwerktraject"),
+                            (28, "3 basis"),
+                            (29, "3 kader"),
+                            (30, "3 theoretisch"),
+                            (32, "4 basis"),
+                            (33, "4 kader"),
+                            (34, "4 theoretisch"),
+                        ],
+                        verbose_name="klas",
+                    ),
+                ),
+                (
+                    "source",
+                    models.CharField(
+                        choices=[
+                            ("view", "export page"),
+                            ("api", "API"),
+                            ("command", "management command"),
+                        ],
+                        max_length=20,
+                        verbose_name="source",
+                    ),
+                ),
+                (
+                    "duration",
+                    models.FloatField(
+                        help_text="Time taken by the profiled export, in seconds.",
+                        verbose_name="duration",
+                    ),
+                ),
+                (
+                    "peak_memory",
+                    models.PositiveBigIntegerField(
+                        help_text="Peak of the traced allocations, in bytes.",
+                        verbose_name="peak memory",
+                    ),
+                ),
+                (
+                    "num_queries",
+                    models.PositiveIntegerField(verbose_name="number of queries"),
+                ),
+                (
+                    "query_time",
+                    models.FloatField(
+                        help_text="Total time of the queries, in seconds.",
+                        verbose_name="query time",
+                    ),
+                ),
+                (
+                    "file",
+                    models.FileField(
+                        storage=pta_export.exports.models.get_private_media_storage,
+                        upload_to=pta_export.exports.models.get_profile_upload_to,
+                        verbose_name="file",
+                    ),
+                ),
+                (
+                    "created",
+                    models.DateTimeField(auto_now_add=True, verbose_name="created"),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="user",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "export profile",
+                "verbose_name_plural": "export profiles",
+            },
+        ),
+    ]
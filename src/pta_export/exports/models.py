@@ -0,0 +1,150 @@
+import os
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from pta_export.core.constants import LEERJAREN_SHORT, Leerjaren
+
+
+def get_private_media_storage() -> FileSystemStorage:
+    """
+    Storage for files that may not be served publicly through ``MEDIA_URL``.
+    """
+    return FileSystemStorage(location=settings.PRIVATE_MEDIA_ROOT)
+
+
+class ExportSources(models.TextChoices):
+    request = "request", _("request")
+    prerender = "prerender", _("prerender")
+
+
+def get_export_upload_to(instance: "ArchivedExport", filename: str) -> str:
+    return f"exports/{instance.jaar}/{filename}"
+
+
+class ArchivedExport(models.Model):
+    """
+    A rendered export, valid for as long as the OCPTA data fingerprint matches.
+    """
+
+    jaar = models.PositiveIntegerField(_("jaar"))
+    klas = models.PositiveSmallIntegerField(_("klas"), choices=Leerjaren.choices)
+    fingerprint = models.CharField(
+        _("fingerprint"),
+        max_length=64,
+        help_text=_("Fingerprint of the OCPTA data the export was rendered from."),
+    )
+    file = models.FileField(
+        _("file"), storage=get_private_media_storage, upload_to=get_export_upload_to
+    )
+    size = models.PositiveIntegerField(_("size"), help_text=_("Size in bytes."))
+    render_time = models.FloatField(
+        _("render time"), help_text=_("Time taken to render, in seconds.")
+    )
+    source = models.CharField(_("source"), max_length=20, choices=ExportSources.choices)
+    rendered = models.DateTimeField(_("rendered"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("archived export")
+        verbose_name_plural = _("archived exports")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["jaar", "klas"], name="unique_archived_export"
+            ),
+        ]
+
+    def __str__(self):
+        return self.filename
+
+    @property
+    def filename(self) -> str:
+        return f"{self.jaar}-{LEERJAREN_SHORT[self.klas]}.docx"
+
+
+class PrerenderStatus(models.Model):
+    """
+    Heartbeat of a running ``prerender_exports`` process.
+    """
+
+    worker = models.CharField(
+        _("worker"),
+        max_length=255,
+        unique=True,
+        help_text=_("Hostname and process ID of the prerender process."),
+    )
+    last_poll = models.DateTimeField(_("last poll"), null=True, blank=True)
+    last_poll_duration = models.FloatField(
+        _("last poll duration"),
+        default=0,
+        help_text=_("Time taken to fingerprint the OCPTA data, in seconds."),
+    )
+    backoff = models.FloatField(
+        _("backoff"),
+        default=1,
+        help_text=_("Multiplier applied to the poll interval."),
+    )
+    num_rendered = models.PositiveIntegerField(_("exports rendered"), default=0)
+    last_error = models.TextField(_("last error"), blank=True)
+
+    class Meta:
+        verbose_name = _("prerender status")
+        verbose_name_plural = _("prerender statuses")
+
+    def __str__(self):
+        return self.worker
+
+
+class ProfileSources(models.TextChoices):
+    view = "view", _("export page")
+    api = "api", _("API")
+    command = "command", _("management command")
+
+
+def get_profile_upload_to(instance: "ExportProfile", filename: str) -> str:
+    return f"profiles/{instance.jaar}/{filename}"
+
+
+class ExportProfile(models.Model):
+    """
+    cProfile, tracemalloc and query log of a single export run.
+    """
+
+    jaar = models.PositiveIntegerField(_("jaar"))
+    klas = models.PositiveSmallIntegerField(_("klas"), choices=Leerjaren.choices)
+    source = models.CharField(
+        _("source"), max_length=20, choices=ProfileSources.choices
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name=_("user"),
+    )
+    duration = models.FloatField(
+        _("duration"), help_text=_("Time taken by the profiled export, in seconds.")
+    )
+    peak_memory = models.PositiveBigIntegerField(
+        _("peak memory"), help_text=_("Peak of the traced allocations, in bytes.")
+    )
+    num_queries = models.PositiveIntegerField(_("number of queries"))
+    query_time = models.FloatField(
+        _("query time"), help_text=_("Total time of the queries, in seconds.")
+    )
+    file = models.FileField(
+        _("file"), storage=get_private_media_storage, upload_to=get_profile_upload_to
+    )
+    created = models.DateTimeField(_("created"), auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("export profile")
+        verbose_name_plural = _("export profiles")
+
+    def __str__(self):
+        return self.filename
+
+    @property
+    def filename(self) -> str:
+        return os.path.basename(self.file.name)
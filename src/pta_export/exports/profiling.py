@@ -0,0 +1,160 @@
+"""
+Profile a single export run.
+
+The profile is stored as a zip file with:
+
+* ``profile.pstats`` - the cProfile data, to be loaded with :mod:`pstats` or
+  visualization tools like snakeviz
+* ``profile.txt`` - the functions sorted on cumulative time
+* ``allocations.txt`` - the top allocation sites according to tracemalloc
+* ``queries.json`` - the executed queries with their database alias and timing
+"""
+
+import cProfile
+import io
+import json
+import logging
+import marshal
+import pstats
+import threading
+import time
+import tracemalloc
+import zipfile
+from contextlib import ExitStack, contextmanager
+
+from django.core.files.base import ContentFile
+from django.db import connections
+from django.utils import timezone
+
+from pta_export.core.constants import LEERJAREN_SHORT
+
+from .models import ExportProfile
+
+logger = logging.getLogger(__name__)
+
+# number of frames stored per allocation, and number of entries in the reports
+TRACEBACK_LIMIT = 10
+TOP_LIMIT = 50
+
+# tracemalloc and the profiler hooks are process wide, so profiles in concurrent
+# requests would stop or replace each other's tracing - they run one at a time
+_profiling = threading.Lock()
+
+
+class QueryLogger:
+    def __init__(self, alias: str, queries: list[dict]):
+        self.alias = alias
+        self.queries = queries
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append(
+                {
+                    "alias": self.alias,
+                    "sql": sql,
+                    "params": repr(params),
+                    "many": many,
+                    "time": round(time.perf_counter() - start, 6),
+                }
+            )
+
+
+class ExportProfiler:
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+        self.queries: list[dict] = []
+        self.duration = 0.0
+        self.peak_memory = 0
+        self.snapshot: tracemalloc.Snapshot | None = None
+        self.export_profile: ExportProfile | None = None
+
+    @contextmanager
+    def profile(self):
+        with _profiling:
+            with self._profile():
+                yield self
+
+    @contextmanager
+    def _profile(self):
+        was_tracing = tracemalloc.is_tracing()
+        if not was_tracing:
+            tracemalloc.start(TRACEBACK_LIMIT)
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(
+                    connections[alias].execute_wrapper(QueryLogger(alias, self.queries))
+                )
+            start = time.perf_counter()
+            self.profiler.enable()
+            try:
+                yield self
+            finally:
+                self.profiler.disable()
+                self.duration = time.perf_counter() - start
+                self.peak_memory = max(tracemalloc.get_traced_memory()[1] - baseline, 0)
+                self.snapshot = tracemalloc.take_snapshot()
+                if not was_tracing:
+                    tracemalloc.stop()
+
+    def get_artifact(self) -> bytes:
+        stats = pstats.Stats(self.profiler)
+        report = io.StringIO()
+        stats.stream = report
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(TOP_LIMIT)
+
+        allocations = "\n".join(
+            str(stat) for stat in self.snapshot.statistics("lineno")[:TOP_LIMIT]
+        )
+
+        outfile = io.BytesIO()
+        with zipfile.ZipFile(outfile, "w", zipfile.ZIP_DEFLATED) as artifact:
+            # the format written by pstats.Stats.dump_stats
+            artifact.writestr("profile.pstats", marshal.dumps(stats.stats))
+            artifact.writestr("profile.txt", report.getvalue())
+            artifact.writestr("allocations.txt", allocations)
+            artifact.writestr("queries.json", json.dumps(self.queries, indent=2))
+        return outfile.getvalue()
+
+
+@contextmanager
+def profile_export(jaar: int, leerjaar: int, source: str, user=None):
+    """
+    Profile the code in the block and store the result as :class:`ExportProfile`.
+
+    The stored instance is set as ``export_profile`` on the yielded profiler once
+    the block exits.
+    """
+    profiler = ExportProfiler()
+    with profiler.profile():
+        yield profiler
+
+    export_profile = ExportProfile(
+        jaar=jaar,
+        klas=leerjaar,
+        source=source,
+        user=user if user and user.is_authenticated else None,
+        duration=profiler.duration,
+        peak_memory=profiler.peak_memory,
+        num_queries=len(profiler.queries),
+        query_time=sum(query["time"] for query in profiler.queries),
+    )
+    filename = (
+        f"{jaar}-{LEERJAREN_SHORT[leerjaar]}-"
+        f"{timezone.now():%Y%m%d-%H%M%S}-profile.zip"
+    )
+    export_profile.file.save(filename, ContentFile(profiler.get_artifact()))
+    profiler.export_profile = export_profile
+
+    logger.info(
+        "Profiled export %s-%s (%s) in %.2fs",
+        jaar,
+        LEERJAREN_SHORT[leerjaar],
+        source,
+        profiler.duration,
+    )
@@ -0,0 +1,289 @@
+"""
+Render exports in a pool of pre-forked worker processes.
+
+python-docx and lxml inflate the memory of a process rendering an export, and that
+memory is not returned to the OS. With ``PTA_EXPORT_RENDER_SOCKET`` set, the web
+workers send the renders over a Unix socket to the pool started by the
+``run_render_pool`` management command instead, and stay small.
+
+The pool loads Django, python-docx and the document template once, and then forks
+the workers, which accept connections on the shared socket. A worker exits after
+``PTA_EXPORT_RENDER_MAX_EXPORTS`` exports, or when its memory grows over
+``PTA_EXPORT_RENDER_MAX_RSS`` MB, and is replaced by a fresh fork.
+
+Like the web workers, the render workers keep the kalender and the werken in their
+local cache. With ``invalidate``, the worker drops them before rendering.
+
+The protocol is a line of JSON in both directions, the response line is followed
+by the content of the document::
+
+    -> {"jaar": 2024, "klas": 1, "compression": "fast", "vakken": null,
+        "invalidate": false}
+    <- {"status": "ok", "size": 38464}
+    <- <38464 bytes>
+
+A request that can't be read within ``REQUEST_TIMEOUT`` seconds is dropped, and an
+invalid request is answered with an error like a failed render.
+"""
+
+import json
+import logging
+import os
+import resource
+import signal
+import socket
+from io import BytesIO
+from typing import Callable
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+
+from pta_export.core.document import initialize_document
+from pta_export.core.export import export, invalidate_lookups
+from pta_export.core.packaging import save_document
+
+logger = logging.getLogger(__name__)
+
+Renderer = Callable[[int, int, str, list[int] | None], bytes]
+
+# seconds to wait for the request line of a connection
+REQUEST_TIMEOUT = 10
+
+
+class RenderError(Exception):
+    pass
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def parse_request(line: bytes) -> dict:
+    try:
+        request = json.loads(line)
+    except ValueError as exc:
+        raise BadRequest(f"Invalid request: {exc}") from exc
+    if not isinstance(request, dict):
+        raise BadRequest("Invalid request: not an object")
+    for field in ("jaar", "klas"):
+        if not isinstance(request.get(field), int):
+            raise BadRequest(f"Invalid request: {field} must be an integer")
+    return request
+
+
+def render_local(
+    jaar: int, leerjaar: int, compression: str = "", vak_ids: list[int] | None = None
+) -> bytes:
+    outfile = BytesIO()
+    save_document(export(jaar, leerjaar, vak_ids=vak_ids), outfile, compression)
+    return outfile.getvalue()
+
+
+def get_rss() -> int:
+    """
+    Return the resident memory of the process in bytes.
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # the peak, in kilobytes on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def render(
+    jaar: int,
+    leerjaar: int,
+    compression: str = "",
+    vak_ids: list[int] | None = None,
+    path: str = "",
+    invalidate: bool = False,
+) -> bytes:
+    """
+    Render an export in the pool, with fresh lookups if ``invalidate`` is set.
+
+    Raise :class:`OSError` if the pool cannot be reached, times out or the worker
+    goes away before the whole response is sent, and :class:`RenderError` if the
+    render itself failed in the worker.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(settings.PTA_EXPORT_RENDER_TIMEOUT)
+        sock.connect(path or settings.PTA_EXPORT_RENDER_SOCKET)
+        request = {
+            "jaar": jaar,
+            "klas": leerjaar,
+            "compression": compression,
+            "vakken": vak_ids,
+            "invalidate": invalidate,
+        }
+        sock.sendall(json.dumps(request).encode() + b"\n")
+        with sock.makefile("rb") as rfile:
+            if not (line := rfile.readline()):
+                raise ConnectionAbortedError("The render worker closed the connection")
+            response = json.loads(line)
+            if response.get("status") != "ok":
+                raise RenderError(response.get("message", "unknown error"))
+            content = rfile.read(response["size"])
+    if len(content) != response["size"]:
+        raise ConnectionAbortedError(
+            f"Expected {response['size']} bytes, got {len(content)}"
+        )
+    return content
+
+
+class RenderWorker:
+    def __init__(
+        self,
+        sock: socket.socket,
+        max_exports: int,
+        max_rss: int,
+        renderer: Renderer = render_local,
+    ):
+        self.sock = sock
+        self.max_exports = max_exports
+        self.max_rss = max_rss
+        self.renderer = renderer
+        self.exports = 0
+
+    def send_error(self, conn: socket.socket, message: str) -> None:
+        conn.sendall(
+            json.dumps({"status": "error", "message": message}).encode() + b"\n"
+        )
+
+    def handle(self, conn: socket.socket) -> None:
+        conn.settimeout(REQUEST_TIMEOUT)
+        with conn.makefile("rb") as rfile:
+            line = rfile.readline()
+        # the client waits for the render with the same timeout
+        conn.settimeout(settings.PTA_EXPORT_RENDER_TIMEOUT)
+        try:
+            request = parse_request(line)
+        except BadRequest as exc:
+            logger.warning("Bad render request %r: %s", line[:200], exc)
+            self.send_error(conn, str(exc))
+            return
+
+        try:
+            if request.get("invalidate"):
+                invalidate_lookups(request["jaar"])
+            content = self.renderer(
+                request["jaar"],
+                request["klas"],
+                request.get("compression", ""),
+                request.get("vakken"),
+            )
+        except Exception as exc:
+            logger.exception("Rendering export %r failed", request)
+            self.send_error(conn, str(exc))
+        else:
+            response = {"status": "ok", "size": len(content)}
+            conn.sendall(json.dumps(response).encode() + b"\n" + content)
+        finally:
+            close_old_connections()
+
+    def run(self) -> str:
+        """
+        Handle requests until the worker should be recycled, return the reason.
+        """
+        while True:
+            conn, _ = self.sock.accept()
+            with conn:
+                try:
+                    self.handle(conn)
+                except OSError as exc:
+                    # e.g. the request timed out, or the client went away
+                    logger.warning("Render connection failed: %r", exc)
+            self.exports += 1
+            if self.exports >= self.max_exports:
+                return f"{self.exports} exports"
+            if (rss := get_rss()) > self.max_rss:
+                return f"{rss // 1024 // 1024} MB RSS"
+
+
+class RenderPool:
+    def __init__(
+        self,
+        path: str,
+        workers: int,
+        max_exports: int,
+        max_rss: int,
+        renderer: Renderer = render_local,
+    ):
+        self.path = path
+        self.workers = workers
+        self.max_exports = max_exports
+        self.max_rss = max_rss
+        self.renderer = renderer
+        self.children: set[int] = set()
+        self.sock: socket.socket | None = None
+
+    def preload(self) -> None:
+        # load python-docx and the document template before forking
+        save_document(initialize_document(), BytesIO())
+
+    def bind(self) -> None:
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.bind(self.path)
+        self.sock.listen(self.workers * 4)
+
+    def spawn(self) -> None:
+        pid = os.fork()
+        if pid:
+            self.children.add(pid)
+            return
+
+        exit_code = 0
+        try:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            worker = RenderWorker(
+                self.sock, self.max_exports, self.max_rss, renderer=self.renderer
+            )
+            reason = worker.run()
+            logger.info("Recycling render worker %s after %s", os.getpid(), reason)
+        except BaseException:
+            logger.exception("Render worker %s crashed", os.getpid())
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+
+    def serve_forever(self) -> None:
+        self.preload()
+        self.bind()
+        # the database connections must not be shared with the workers
+        connections.close_all()
+
+        def stop(signum, frame):
+            raise KeyboardInterrupt
+
+        signal.signal(signal.SIGTERM, stop)
+        try:
+            while True:
+                while len(self.children) < self.workers:
+                    self.spawn()
+                pid, status = os.wait()
+                self.children.discard(pid)
+                if os.waitstatus_to_exitcode(status):
+                    logger.warning("Render worker %s exited with %s", pid, status)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self) -> None:
+        for pid in self.children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in self.children:
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+        self.children.clear()
+        if self.sock:
+            self.sock.close()
+            os.unlink(self.path)
@@ -0,0 +1,111 @@
+from unittest.mock import patch
+
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+
+from pta_export.core.benchmarks.dataset import SCALES, generate_dataset
+from pta_export.core.constants import Leerjaren
+from pta_export.core.export import get_kalender, get_kalender_key
+from pta_export.core.fingerprints import get_fingerprint
+from pta_export.core.tests.utils import YEAR, OCPTATablesMixin
+from pta_export.utils import cache
+
+from ..archive import archive_export, get_artifact_key, open_archived_export
+from ..models import ArchivedExport
+
+
+@override_settings(PTA_EXPORT_ARTIFACT_CACHE="default")
+class ArtifactCacheTests(OCPTATablesMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate_dataset(YEAR, SCALES["small"], seed=0)
+
+    def test_archived_export_is_cached(self):
+        fingerprint = get_fingerprint(YEAR, Leerjaren.havo_4)
+        outfile, size = open_archived_export(YEAR, Leerjaren.havo_4, fingerprint)
+        content = outfile.read()
+        outfile.close()
+
+        key = get_artifact_key(YEAR, Leerjaren.havo_4, fingerprint)
+        self.assertEqual(caches["default"].get(key), content)
+
+        with self.assertNumQueries(0, using="default"):
+            outfile, cached_size = open_archived_export(
+                YEAR, Leerjaren.havo_4, fingerprint
+            )
+        self.assertEqual(outfile.read(), content)
+        self.assertEqual(cached_size, size)
+        self.assertEqual(cache.pop_stats()[("exports", "hit")], 1)
+
+    @override_settings(PTA_EXPORT_ARTIFACT_CACHE_MAX_SIZE=10)
+    def test_large_exports_are_not_cached(self):
+        fingerprint = get_fingerprint(YEAR, Leerjaren.havo_4)
+        open_archived_export(YEAR, Leerjaren.havo_4, fingerprint)[0].close()
+
+        key = get_artifact_key(YEAR, Leerjaren.havo_4, fingerprint)
+        self.assertIsNone(caches["default"].get(key))
+        self.assertTrue(ArchivedExport.objects.filter(fingerprint=fingerprint).exists())
+
+    def test_archiving_drops_cached_lookups(self):
+        kalender = get_kalender(YEAR)
+        kalender.tw11 = 1
+        cache.local_cache.set(get_kalender_key(YEAR), kalender, timeout=60)
+
+        fingerprint = get_fingerprint(YEAR, Leerjaren.havo_4)
+        open_archived_export(YEAR, Leerjaren.havo_4, fingerprint)[0].close()
+
+        self.assertNotEqual(get_kalender(YEAR).tw11, 1)
+
+
+class ArchiveExportTests(OCPTATablesMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate_dataset(YEAR, SCALES["small"], seed=0)
+
+    def archive(self, fingerprint: str) -> ArchivedExport:
+        with self.captureOnCommitCallbacks(execute=True):
+            archived = archive_export(YEAR, Leerjaren.havo_4, fingerprint)
+        self.addCleanup(archived.file.storage.delete, archived.file.name)
+        return archived
+
+    def test_old_file_is_deleted_after_commit(self):
+        old = self.archive("a" * 40)
+        storage = old.file.storage
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            new = archive_export(YEAR, Leerjaren.havo_4, "b" * 40)
+        self.addCleanup(storage.delete, new.file.name)
+
+        self.assertTrue(storage.exists(old.file.name))
+        for callback in callbacks:
+            callback()
+        self.assertFalse(storage.exists(old.file.name))
+        self.assertTrue(storage.exists(new.file.name))
+
+    def test_failed_save_keeps_old_file(self):
+        old = self.archive("a" * 40)
+
+        with patch.object(ArchivedExport, "save", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.archive("b" * 40)
+
+        archived = ArchivedExport.objects.get()
+        self.assertEqual(archived.fingerprint, "a" * 40)
+        self.assertEqual(archived.file.name, old.file.name)
+        # without the file of the failed save
+        self.assertFalse(
+            [
+                name
+                for name in archived.file.storage.listdir(f"exports/{YEAR}")[1]
+                if name.startswith(f"{YEAR}-H4-{'b' * 12}")
+            ]
+        )
+
+    def test_archived_fingerprint_is_not_rendered_again(self):
+        old = self.archive("a" * 40)
+
+        with patch("pta_export.exports.archive.render_export") as render_export:
+            archived = self.archive("a" * 40)
+
+        render_export.assert_not_called()
+        self.assertEqual(archived.file.name, old.file.name)
@@ -0,0 +1,118 @@
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.db import OperationalError
+from django.test import TestCase
+
+from pta_export.core.benchmarks.dataset import SCALES, generate_dataset
+from pta_export.core.constants import Leerjaren
+from pta_export.core.fingerprints import get_fingerprints
+from pta_export.core.models import Kalender
+from pta_export.core.tests.utils import YEAR, OCPTATablesMixin
+
+from ..management.commands.prerender_exports import Command
+from ..models import ArchivedExport, ExportSources, PrerenderStatus
+
+COMMAND = "pta_export.exports.management.commands.prerender_exports"
+
+
+class PrerenderExportsTests(OCPTATablesMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate_dataset(YEAR, SCALES["small"], seed=0)
+
+    def setUp(self):
+        super().setUp()
+        self.command = Command()
+        self.command.options = {
+            "jaren": [YEAR],
+            "slow_poll": 5,
+            "max_backoff": 16,
+            "max_load": float("inf"),
+            "verbosity": 0,
+        }
+        self.command.status = PrerenderStatus.objects.create(worker="test:1")
+
+    def poll(self, **kwargs):
+        with patch(f"{COMMAND}.archive_export", **kwargs) as mock:
+            self.command.poll()
+        return {call.args[:2] for call in mock.call_args_list}
+
+    def test_stale_exports_are_rendered(self):
+        fingerprints = get_fingerprints(YEAR)
+        for klas, fingerprint in fingerprints.items():
+            if klas == Leerjaren.havo_4:
+                continue
+            ArchivedExport.objects.create(
+                jaar=YEAR,
+                klas=klas,
+                fingerprint="outdated" if klas == Leerjaren.vwo_4 else fingerprint,
+                size=0,
+                render_time=0,
+                source=ExportSources.prerender,
+            )
+
+        rendered = self.poll()
+
+        self.assertEqual(rendered, {(YEAR, Leerjaren.havo_4), (YEAR, Leerjaren.vwo_4)})
+        self.command.status.refresh_from_db()
+        self.assertEqual(self.command.status.num_rendered, 2)
+        self.assertEqual(self.command.status.backoff, 1)
+        self.assertIsNotNone(self.command.status.last_poll)
+
+    def test_backoff_on_database_errors(self):
+        with (
+            patch(f"{COMMAND}.get_fingerprints", side_effect=OperationalError("busy")),
+            self.assertLogs(COMMAND, "WARNING"),
+        ):
+            for expected in (2, 4, 8, 16, 16):
+                self.assertEqual(self.poll(), set())
+                self.assertEqual(self.command.status.backoff, expected)
+
+        self.assertEqual(self.command.status.last_error, "busy")
+
+        self.poll()
+
+        self.command.status.refresh_from_db()
+        self.assertEqual(self.command.status.backoff, 1)
+        self.assertEqual(self.command.status.last_error, "")
+
+    def test_backoff_on_slow_polls(self):
+        self.command.options["slow_poll"] = -1
+
+        with self.assertLogs(COMMAND, "INFO"):
+            self.poll()
+            self.poll()
+
+        self.assertEqual(self.command.status.backoff, 4)
+
+    def test_backoff_on_render_database_errors(self):
+        with self.assertLogs(COMMAND, "WARNING"):
+            rendered = self.poll(side_effect=OperationalError("busy"))
+
+        # the remaining exports are postponed
+        self.assertEqual(len(rendered), 1)
+        self.assertEqual(self.command.status.backoff, 2)
+        self.assertEqual(self.command.status.num_rendered, 0)
+
+    def test_export_errors_do_not_stop_polling(self):
+        def archive_export(jaar, klas, fingerprint, source):
+            if klas == Leerjaren.havo_4:
+                raise Kalender.DoesNotExist("Kalender matching query does not exist.")
+
+        with self.assertLogs(COMMAND, "ERROR"):
+            rendered = self.poll(side_effect=archive_export)
+
+        self.assertEqual(rendered, {(YEAR, klas) for klas in get_fingerprints(YEAR)})
+        self.assertEqual(self.command.status.num_rendered, len(rendered) - 1)
+        self.assertEqual(self.command.status.backoff, 1)
+        self.assertIn("DoesNotExist", self.command.status.last_error)
+
+    def test_status_is_deleted(self):
+        self.command.status.delete()
+
+        with patch.object(Command, "poll", side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                call_command("prerender_exports", jaren=[YEAR], once=True)
+
+        self.assertFalse(PrerenderStatus.objects.exists())
@@ -0,0 +1,82 @@
+import json
+import threading
+from io import BytesIO
+from zipfile import ZipFile
+
+from django.test import TestCase
+from django.urls import reverse
+
+from pta_export.accounts.models import User
+from pta_export.core.benchmarks.dataset import SCALES, generate_dataset
+from pta_export.core.constants import Leerjaren
+from pta_export.core.tests.utils import YEAR, OCPTATablesMixin
+
+from ..models import ExportProfile, ProfileSources
+from ..profiling import ExportProfiler
+
+
+class ExportProfilingTests(OCPTATablesMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate_dataset(YEAR, SCALES["small"], seed=0)
+        cls.staff_user = User.objects.create_user("staff", is_staff=True)
+        cls.user = User.objects.create_user("teacher")
+
+    def export(self, user, **data):
+        self.client.force_login(user)
+        return self.client.post(
+            reverse("export"), {"jaar": YEAR, "klas": Leerjaren.havo_4, **data}
+        )
+
+    def test_profiled_export(self):
+        response = self.export(self.staff_user, profile=True)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content.startswith(b"PK"))
+
+        export_profile = ExportProfile.objects.get()
+        self.addCleanup(export_profile.file.delete, save=False)
+        self.assertEqual(export_profile.source, ProfileSources.api)
+        self.assertEqual(export_profile.user, self.staff_user)
+        self.assertGreater(export_profile.peak_memory, 0)
+
+        with ZipFile(BytesIO(export_profile.file.read())) as artifact:
+            self.assertEqual(
+                set(artifact.namelist()),
+                {"profile.pstats", "profile.txt", "allocations.txt", "queries.json"},
+            )
+            queries = json.loads(artifact.read("queries.json"))
+        self.assertEqual(len(queries), export_profile.num_queries)
+        self.assertIn("ocpta", {query["alias"] for query in queries})
+
+    def test_profiling_requires_staff(self):
+        response = self.export(self.user, profile=True)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(ExportProfile.objects.exists())
+
+    def test_overlapping_profiles(self):
+        results = []
+        started = threading.Event()
+
+        def profile():
+            started.set()
+            profiler = ExportProfiler()
+            with profiler.profile():
+                results.append(sum(range(1000)))
+            results.append(profiler.snapshot)
+
+        thread = threading.Thread(target=profile)
+        first = ExportProfiler()
+        with first.profile():
+            thread.start()
+            started.wait()
+            thread.join(timeout=0.2)
+            # the second profile waits for the first one
+            self.assertTrue(thread.is_alive())
+            self.assertEqual(results, [])
+        thread.join()
+
+        self.assertIsNotNone(first.snapshot)
+        self.assertEqual(len(results), 2)
+        self.assertIsNotNone(results[1])
@@ -0,0 +1,195 @@
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from pta_export.core.benchmarks.dataset import SCALES, generate_dataset
+from pta_export.core.constants import Leerjaren
+from pta_export.core.export import get_kalender_key
+from pta_export.core.tests.utils import YEAR, OCPTATablesMixin
+from pta_export.utils.cache import local_cache
+
+from ..archive import archive_export, render_export
+from ..render_pool import RenderError, RenderWorker, render
+
+
+def fake_renderer(jaar: int, leerjaar: int, compression: str, vak_ids) -> bytes:
+    if leerjaar == 0:
+        raise ValueError("Invalid leerjaar")
+    return f"{jaar}-{leerjaar}".encode() * 1000
+
+
+class RenderWorkerTests(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, "render.sock")
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.bind(self.path)
+        self.sock.listen()
+        self.addCleanup(self.sock.close)
+
+    def start_worker(self, max_exports: int, max_rss: int = 2**40):
+        worker = RenderWorker(self.sock, max_exports, max_rss, renderer=fake_renderer)
+        result = {}
+        thread = threading.Thread(
+            target=lambda: result.setdefault("reason", worker.run())
+        )
+        thread.start()
+        self.addCleanup(thread.join, 5)
+        return thread, result
+
+    def test_render(self):
+        thread, result = self.start_worker(max_exports=2)
+
+        self.assertEqual(render(YEAR, 1, path=self.path), b"2024-1" * 1000)
+        self.assertEqual(render(YEAR, 2, path=self.path), b"2024-2" * 1000)
+
+        thread.join(5)
+        self.assertEqual(result["reason"], "2 exports")
+
+    def test_recycle_on_memory(self):
+        thread, result = self.start_worker(max_exports=10, max_rss=1)
+
+        render(YEAR, 1, path=self.path)
+
+        thread.join(5)
+        self.assertIn("MB RSS", result["reason"])
+
+    def test_render_error(self):
+        self.start_worker(max_exports=1)
+
+        with self.assertLogs("pta_export.exports.render_pool", "ERROR"):
+            with self.assertRaisesMessage(RenderError, "Invalid leerjaar"):
+                render(YEAR, 0, path=self.path)
+
+    def test_invalidate_lookups(self):
+        self.start_worker(max_exports=2)
+        key = get_kalender_key(YEAR)
+        self.addCleanup(local_cache.delete, key)
+
+        local_cache.set(key, "stale", timeout=60)
+        render(YEAR, 1, path=self.path)
+        self.assertEqual(local_cache.get(key), "stale")
+
+        render(YEAR, 1, path=self.path, invalidate=True)
+        self.assertIsNone(local_cache.get(key))
+
+    def send_raw(self, data: bytes) -> dict:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(5)
+            sock.connect(self.path)
+            sock.sendall(data)
+            with sock.makefile("rb") as rfile:
+                return json.loads(rfile.readline())
+
+    def test_bad_requests(self):
+        thread, result = self.start_worker(max_exports=5)
+        requests = [b"\n", b"not json\n", b"[2024, 1]\n", b'{"jaar": 2024}\n']
+
+        with self.assertLogs("pta_export.exports.render_pool", "WARNING"):
+            for request in requests:
+                with self.subTest(request=request):
+                    response = self.send_raw(request)
+
+                    self.assertEqual(response["status"], "error")
+                    self.assertIn("Invalid request", response["message"])
+
+        # the worker is still running
+        self.assertEqual(render(YEAR, 1, path=self.path), b"2024-1" * 1000)
+        thread.join(5)
+        self.assertEqual(result["reason"], "5 exports")
+
+    @patch("pta_export.exports.render_pool.REQUEST_TIMEOUT", 0.1)
+    def test_request_timeout(self):
+        thread, result = self.start_worker(max_exports=2)
+
+        with self.assertLogs("pta_export.exports.render_pool", "WARNING"):
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.connect(self.path)
+                sock.sendall(b'{"jaar": 2024')
+                sock.settimeout(5)
+                # the worker gives up on the request and closes the connection
+                self.assertEqual(sock.recv(1), b"")
+
+        self.assertEqual(render(YEAR, 1, path=self.path), b"2024-1" * 1000)
+        thread.join(5)
+        self.assertEqual(result["reason"], "2 exports")
+
+    def test_worker_gone(self):
+        def accept_and_close():
+            conn, _ = self.sock.accept()
+            with conn, conn.makefile("rb") as rfile:
+                rfile.readline()
+
+        thread = threading.Thread(target=accept_and_close)
+        thread.start()
+        self.addCleanup(thread.join, 5)
+
+        with self.assertRaises(ConnectionAbortedError):
+            render(YEAR, 1, path=self.path)
+
+    def test_pool_not_running(self):
+        with self.assertRaises(FileNotFoundError):
+            render(YEAR, 1, path=f"{self.path}.missing")
+
+
+class RenderFallbackTests(OCPTATablesMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate_dataset(YEAR, SCALES["small"], seed=0)
+
+    @override_settings(PTA_EXPORT_RENDER_SOCKET="/nonexistent/render.sock")
+    def test_render_locally_without_pool(self):
+        with self.assertLogs("pta_export.exports.archive", "WARNING"):
+            content = render_export(YEAR, Leerjaren.havo_4)
+
+        self.assertTrue(content.startswith(b"PK"))
+
+    @override_settings(PTA_EXPORT_RENDER_SOCKET="/run/render.sock")
+    def test_render_locally_on_pool_errors(self):
+        errors = [
+            ConnectionResetError(),
+            BrokenPipeError(),
+            ConnectionAbortedError("The render worker closed the connection"),
+        ]
+        for error in errors:
+            with self.subTest(error=error):
+                with patch(
+                    "pta_export.exports.render_pool.render", side_effect=error
+                ), self.assertLogs("pta_export.exports.archive", "WARNING"):
+                    content = render_export(YEAR, Leerjaren.havo_4)
+
+                self.assertTrue(content.startswith(b"PK"))
+
+    @override_settings(PTA_EXPORT_RENDER_SOCKET="/run/render.sock")
+    def test_timeout_is_not_retried(self):
+        with patch(
+            "pta_export.exports.render_pool.render",
+            side_effect=TimeoutError("timed out"),
+        ), patch("pta_export.exports.archive.export") as export:
+            with self.assertRaises(TimeoutError):
+                render_export(YEAR, Leerjaren.havo_4)
+
+        export.assert_not_called()
+
+    @override_settings(PTA_EXPORT_RENDER_SOCKET="/run/render.sock")
+    def test_render_error_is_not_retried(self):
+        with patch(
+            "pta_export.exports.render_pool.render", side_effect=RenderError("boom")
+        ):
+            with self.assertRaisesMessage(RenderError, "boom"):
+                render_export(YEAR, Leerjaren.havo_4)
+
+    @override_settings(PTA_EXPORT_RENDER_SOCKET="/run/render.sock")
+    def test_archive_renders_with_fresh_lookups(self):
+        with patch("pta_export.exports.render_pool.render", return_value=b"PK") as mock:
+            archive_export(YEAR, Leerjaren.havo_4, "fingerprint")
+
+        self.assertTrue(mock.call_args.kwargs["invalidate"])
@@ -6,7 +6,12 @@ from django.contrib.auth import views as auth_views
 from django.contrib.staticfiles.urls import staticfiles_urlpatterns
 from django.urls import include, path
 
-from pta_export.core.views import ExportView
+from pta_export.core.views import (
+    AsyncExportView,
+    ExportView,
+    MetricsView,
+    SlowQueriesView,
+)
 
 handler500 = "pta_export.utils.views.server_error"
 admin.site.site_header = "pta_export admin"
@@ -24,6 +29,11 @@ urlpatterns = [
         auth_views.PasswordResetDoneView.as_view(),
         name="password_reset_done",
     ),
+    path(
+        "admin/slow-queries/",
+        admin.site.admin_view(SlowQueriesView.as_view()),
+        name="slow-queries",
+    ),
     path("admin/", admin.site.urls),
     path(
         "reset/<uidb64>/<token>/",
@@ -36,8 +46,12 @@ urlpatterns = [
         name="password_reset_complete",
     ),
     # Simply show the master template.
-    path("", ExportView.as_view()),
+    path(
+        "",
+        (AsyncExportView if settings.PTA_EXPORT_ASYNC_VIEWS else ExportView).as_view(),
+    ),
     path("api/", include("pta_export.core.api")),
+    path("metrics/", MetricsView.as_view(), name="metrics"),
 ]
 
 # NOTE: The staticfiles_urlpatterns also discovers static files (ie. no need to run collectstatic). Both the static
@@ -0,0 +1,116 @@
+"""
+Two tier caching of small, hot lookups.
+
+The first tier (L1) is a dictionary in the memory of the process: free to read, but
+not shared between the web server processes and without invalidation across them,
+so its timeout is short (``PTA_EXPORT_L1_TIMEOUT``). The second tier is the shared
+cache ``PTA_EXPORT_SHARED_CACHE`` (redis in docker and production).
+
+Hits and misses are counted per tier in process memory, and added to the shared
+export metrics by :func:`pta_export.core.metrics.flush_cache_stats`.
+"""
+
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable
+
+from django.conf import settings
+from django.core.cache import caches
+
+_MISSING = object()
+
+_lock = threading.Lock()
+_stats: Counter[tuple[str, str]] = Counter()
+
+
+def count(tier: str, hit: bool) -> None:
+    with _lock:
+        _stats[(tier, "hit" if hit else "miss")] += 1
+
+
+def pop_stats() -> Counter[tuple[str, str]]:
+    """
+    Return the hits and misses counted since the previous call.
+    """
+    global _stats
+    with _lock:
+        stats, _stats = _stats, Counter()
+    return stats
+
+
+class LocalCache:
+    """
+    A thread safe dictionary with expiring entries.
+    """
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._data: dict[str, tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default=None):
+        with self._lock:
+            expires, value = self._data.get(key, (0, default))
+            if expires and expires < time.monotonic():
+                del self._data[key]
+                return default
+            return value
+
+    def set(self, key: str, value, timeout: float) -> None:
+        with self._lock:
+            if len(self._data) >= self.max_entries:
+                self._data.clear()
+            self._data[key] = (time.monotonic() + timeout, value)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+local_cache = LocalCache()
+
+
+def get_shared_cache():
+    return caches[settings.PTA_EXPORT_SHARED_CACHE]
+
+
+def get_or_set(key: str, default: Callable[[], Any]):
+    """
+    Look up ``key`` in the local and the shared cache, calling ``default`` to
+    populate both on a miss.
+    """
+    value = local_cache.get(key, _MISSING)
+    count("l1", value is not _MISSING)
+    if value is not _MISSING:
+        return value
+
+    shared_cache = get_shared_cache()
+    value = shared_cache.get(key, _MISSING)
+    count("shared", value is not _MISSING)
+    if value is _MISSING:
+        value = default()
+        shared_cache.set(key, value, timeout=settings.PTA_EXPORT_SHARED_CACHE_TIMEOUT)
+
+    local_cache.set(key, value, timeout=settings.PTA_EXPORT_L1_TIMEOUT)
+    return value
+
+
+def invalidate(*keys: str) -> None:
+    """
+    Drop the keys from both tiers. Other processes keep their local copy until it
+    expires.
+    """
+    for key in keys:
+        local_cache.delete(key)
+    get_shared_cache().delete_many(keys)
+
+
+def clear() -> None:
+    local_cache.clear()
+    get_shared_cache().clear()
+    pop_stats()
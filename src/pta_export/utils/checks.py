@@ -52,7 +52,12 @@ def check_missing_init_files(app_configs, **kwargs):
 
     If they don't, the code will still run, but tests aren't picked up by the
     test runner, for example.
+
+    This walks the whole project directory, so it only runs in development.
     """
+    if not settings.DEBUG:
+        return []
+
     errors = []
 
     for dirpath, dirnames, filenames in os.walk(settings.DJANGO_PROJECT_DIR):
@@ -69,7 +74,7 @@ def check_missing_init_files(app_configs, **kwargs):
 
         errors.append(
             Warning(
-                "Directory %s does not contain an `__init__.py` file",
+                "Directory %s does not contain an `__init__.py` file" % dirpath,
                 hint="Consider adding this module to make sure tests are picked up",
                 id="utils.W001",
             )
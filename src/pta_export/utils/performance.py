@@ -0,0 +1,15 @@
+"""
+Structured records for the ``performance`` logger.
+
+Every record is a single line of JSON, so that the rotated ``performance.log``
+files can be analyzed without an external APM.
+"""
+
+import json
+import logging
+
+logger = logging.getLogger("performance")
+
+
+def log_record(event: str, **data) -> None:
+    logger.info(json.dumps({"event": event, **data}, default=str))
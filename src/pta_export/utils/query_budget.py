@@ -0,0 +1,138 @@
+"""
+Declare and enforce the number of queries a code path may execute.
+
+A budget is a maximum number of queries per database alias, the queries on the
+aliases in ``QUERY_BUDGET_ALIASES`` are counted as queries on the alias they
+map to (e.g. a second connection to the same database). Going over budget
+raises :class:`QueryBudgetExceeded` when ``QUERY_BUDGET_ENFORCE`` is set (dev and
+CI), and is logged to the performance log otherwise.
+
+Use :class:`query_budget` as context manager or decorator, or set a
+``query_budget`` attribute on a view (function or class) for
+:class:`QueryBudgetMiddleware`.
+"""
+
+import logging
+from collections import Counter
+from contextlib import ContextDecorator, ExitStack
+from typing import Callable
+
+from django.conf import settings
+from django.db import connections
+
+from .performance import log_record
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryCounter:
+    """
+    Count the executed queries per database alias.
+    """
+
+    def __init__(self):
+        self.counts: Counter[str] = Counter()
+        self._stack: ExitStack | None = None
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for alias in connections:
+            self._stack.enter_context(
+                connections[alias].execute_wrapper(self._wrapper(alias))
+            )
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+        self._stack = None
+
+    def _wrapper(self, alias: str):
+        alias = settings.QUERY_BUDGET_ALIASES.get(alias, alias)
+
+        def count_query(execute, sql, params, many, context):
+            self.counts[alias] += 1
+            return execute(sql, params, many, context)
+
+        return count_query
+
+
+def check_budget(label: str, budgets: dict[str, int], counts: Counter) -> None:
+    exceeded = {
+        alias: (counts[alias], budget)
+        for alias, budget in budgets.items()
+        if counts[alias] > budget
+    }
+    if not exceeded:
+        return
+
+    details = ", ".join(
+        f"{alias}: {count} > {budget}" for alias, (count, budget) in exceeded.items()
+    )
+    if settings.QUERY_BUDGET_ENFORCE:
+        raise QueryBudgetExceeded(f"{label} exceeded its query budget ({details})")
+    logger.warning("%s exceeded its query budget (%s)", label, details)
+    log_record(
+        "query_budget_exceeded",
+        label=label,
+        budgets=budgets,
+        counts={alias: counts[alias] for alias in budgets},
+    )
+
+
+class query_budget(ContextDecorator):
+    """
+    Limit the queries of a block of code, e.g. ``query_budget("export", ocpta=9)``.
+    """
+
+    def __init__(self, label: str, **budgets: int):
+        self.label = label
+        self.budgets = budgets
+        self.counter: QueryCounter | None = None
+
+    def _recreate_cm(self):
+        # every call of a decorated function needs its own counter
+        return self.__class__(self.label, **self.budgets)
+
+    def __enter__(self):
+        self.counter = QueryCounter().__enter__()
+        return self.counter
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.counter.__exit__(exc_type, exc_value, traceback)
+        if exc_type is None:
+            check_budget(self.label, self.budgets, self.counter.counts)
+        return False
+
+
+def get_view_budget(view_func: Callable) -> dict[str, int] | None:
+    if (budget := getattr(view_func, "query_budget", None)) is not None:
+        return budget
+    view_class = getattr(view_func, "view_class", None)
+    return getattr(view_class, "query_budget", None)
+
+
+class QueryBudgetMiddleware:
+    """
+    Enforce the ``query_budget`` declared on a view.
+
+    The count covers the complete request, including the queries of the other
+    middleware (sessions, authentication).
+    """
+
+    def __init__(self, get_response: Callable):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with QueryCounter() as counter:
+            response = self.get_response(request)
+
+        if budget := getattr(request, "_query_budget", None):
+            check_budget(f"{request.method} {request.path}", budget, counter.counts)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._query_budget = get_view_budget(view_func)
@@ -0,0 +1,16 @@
+"""
+Prepare a process to serve requests.
+
+Django imports the URLconf, and with it the views, DRF and the export machinery
+(python-docx, lxml), on the first request of a process. :func:`preload` does that up
+front, so that uwsgi runs it once in the master process and forks the workers with
+the modules already loaded, instead of every worker importing them again on its
+first request.
+"""
+
+from django.urls import get_resolver
+
+
+def preload() -> None:
+    # importing the URLconf imports all the views
+    get_resolver().url_patterns
@@ -12,7 +12,9 @@ import os
 from django.core.wsgi import get_wsgi_application
 
 from pta_export.setup import setup_env
+from pta_export.utils.startup import preload
 
 setup_env()
 
 application = get_wsgi_application()
+preload()